@@ -1,224 +1,689 @@
 import os
+import re
 import json
-import requests
-import random
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
-from openai import OpenAI
+
+from http_client import pexels_get, pexels_get_async
+from itinerary_cache import create_itinerary_cache, create_precomputed_itineraries, itinerary_key
+from itinerary_stream import ItineraryStreamParser, itinerary_events
+from jobs import QueueFull, create_job_queue
+from llm import get_async_llm_client, get_llm_client, is_timeout_error, is_transient_error
+from media_cache import create_media_cache, normalize_query
+from media_pool import create_media_pool
+from suggest import DEFAULT_LIMIT as DEFAULT_SUGGEST_LIMIT
+from prompts import (
+    CONCIERGE_PROMPT_VERSION, PLANNER_PROMPT_VERSION, concierge_messages, cost_usd, count_message_tokens,
+    count_tokens, llm_route, planner_messages, trip_days,
+)
+from tracing import observe_upstream, record_fallback, record_llm_call, stage, submit
+from upstream import UpstreamBusy, fair_flow, get_limiter
 
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI Client
-openai_api_key = os.getenv("OPENAI_API_KEY")
-grok_api_key = os.getenv("GROK_API_KEY")
+# The LLM client, the Pexels clients and the catalogue indexes (numpy) are
+# built on first use, so importing the app doesn't pay for openai, requests,
+# httpx or numpy (benchmarks/importtime.py enforces this).
+PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
+
+media_cache = create_media_cache()
+
+itinerary_cache = create_itinerary_cache()
+# Default plans for the head destinations, shipped in data/ by warm_itineraries.py.
+precomputed_itineraries = create_precomputed_itineraries()
+itinerary_jobs = create_job_queue()
+
+# Outbound media lookups run on a bounded pool so a search fans out its image
+# and video calls concurrently instead of one after another.
+MEDIA_MAX_WORKERS = int(os.getenv("PEXELS_MAX_WORKERS", "12"))
+MEDIA_DEADLINE = float(os.getenv("MEDIA_DEADLINE", "3.0"))
+
+_media_pool = ThreadPoolExecutor(max_workers=MEDIA_MAX_WORKERS, thread_name_prefix="pexels")
+_llm_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm")
 
-client = None
-MODEL_NAME = None # Initialize MODEL_NAME
+def _pexels_enabled() -> bool:
+    return bool(PEXELS_API_KEY) and PEXELS_API_KEY != "your_pexels_api_key_here"
 
-if openai_api_key:
+def _image_params(query: str) -> dict:
+    return {"query": query, "per_page": 1, "orientation": "landscape"}
+
+def _video_params(query: str) -> dict:
+    return {"query": query, "per_page": 1, "orientation": "landscape", "min_width": 1280}
+
+def _parse_image(response) -> tuple:
+    media = {"image_url": None}
+    if response.status_code != 200:
+        return media, False
+    data = response.json()
+    if data.get("photos"):
+        media["image_url"] = data["photos"][0]["src"]["landscape"]
+    return media, True
+
+def _parse_video(response) -> tuple:
+    media = {"video_url": None}
+    if response.status_code != 200:
+        return media, False
+    data = response.json()
+    if data.get("videos"):
+        # Get the best quality video file
+        video_files = data["videos"][0]["video_files"]
+        # Prefer HD
+        video = next((v for v in video_files if v["quality"] == "hd" or v["width"] >= 1280), video_files[0])
+        media["video_url"] = video["link"]
+    return media, True
+
+def _fetch_pexels_image(query: str) -> tuple:
+    """
+    Fetch a landscape photo from Pexels, uncached.
+    Returns (media, cacheable); cacheable is False if the call failed.
+    """
     try:
-        # Standard OpenAI
-        client = OpenAI(api_key=openai_api_key)
-        MODEL_NAME = "gpt-3.5-turbo" # Default model for OpenAI
-        print("Using OpenAI API")
+        return _parse_image(pexels_get("/v1/search", params=_image_params(query), api_key=PEXELS_API_KEY))
     except Exception as e:
-        print(f"Failed to init OpenAI: {e}")
-elif grok_api_key:
+        print(f"Error fetching Pexels image: {e}")
+        return {"image_url": None}, False
+
+def _fetch_pexels_video(query: str) -> tuple:
+    """
+    Fetch an HD landscape video from Pexels, uncached.
+    Returns (media, cacheable); cacheable is False if the call failed.
+    """
     try:
-        # Fallback to Grok
-        client = OpenAI(
-            api_key=os.getenv("GROK_API_KEY"),
-            base_url="https://api.x.ai/v1"
-        )
-        MODEL_NAME = "grok-2-latest"
-        print("Using Grok API")
+        return _parse_video(pexels_get("/videos/search", params=_video_params(query), api_key=PEXELS_API_KEY))
     except Exception as e:
-        print(f"Failed to init Grok: {e}")
+        print(f"Error fetching Pexels video: {e}")
+        return {"video_url": None}, False
 
-PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
+async def _fetch_pexels_image_async(query: str) -> tuple:
+    try:
+        response = await pexels_get_async("/v1/search", params=_image_params(query), api_key=PEXELS_API_KEY)
+        return _parse_image(response)
+    except Exception as e:
+        print(f"Error fetching Pexels image: {e!r}")
+        return {"image_url": None}, False
+
+async def _fetch_pexels_video_async(query: str) -> tuple:
+    try:
+        response = await pexels_get_async("/videos/search", params=_video_params(query), api_key=PEXELS_API_KEY)
+        return _parse_video(response)
+    except Exception as e:
+        print(f"Error fetching Pexels video: {e!r}")
+        return {"video_url": None}, False
+
+def fetch_pexels_image(query: str) -> dict:
+    """Fetch a relevant image from Pexels (cached by normalized query)."""
+    if not _pexels_enabled():
+        return {"image_url": None}
+    return media_cache.get_or_fetch(query, _fetch_pexels_image, namespace="image")
+
+def fetch_pexels_video(query: str) -> dict:
+    """Fetch a relevant video from Pexels (cached by normalized query)."""
+    if not _pexels_enabled():
+        return {"video_url": None}
+    return media_cache.get_or_fetch(query, _fetch_pexels_video, namespace="video")
+
+def fetch_pexels_media_batch(queries: list, deadline: float = MEDIA_DEADLINE) -> list:
+    """
+    Fetch image and video for every query concurrently.
+
+    Returns one media dict per query. Lookups still running after `deadline`
+    seconds are left as None; they keep running in the background and land
+    in the cache for the next request.
+    """
+    results = [{"image_url": None, "video_url": None} for _ in queries]
+    if not queries or not _pexels_enabled():
+        return results
+
+    futures = {}
+    for i, query in enumerate(queries):
+        futures[_media_pool.submit(fetch_pexels_image, query)] = i
+        futures[_media_pool.submit(fetch_pexels_video, query)] = i
+
+    done, not_done = wait(futures, timeout=deadline)
+    if not_done:
+        print(f"Pexels media deadline hit: {len(not_done)} of {len(futures)} lookups still pending")
+    for future in done:
+        try:
+            results[futures[future]].update(future.result())
+        except Exception as e:
+            print(f"Error fetching Pexels media: {e}")
+    return results
 
 def fetch_pexels_media(query: str) -> dict:
     """Fetch relevant image and video from Pexels."""
-    if not PEXELS_API_KEY or PEXELS_API_KEY == "your_pexels_api_key_here":
-        return {"image_url": None, "video_url": None}
+    return fetch_pexels_media_batch([query])[0]
 
-    headers = {"Authorization": PEXELS_API_KEY}
-    media = {"image_url": None, "video_url": None}
+# Lookups left running past a deadline; referenced here so they aren't collected mid-flight.
+_background_tasks = set()
 
-    try:
-        # Fetch Image
-        url_img = "https://api.pexels.com/v1/search"
-        params_img = {"query": query, "per_page": 1, "orientation": "landscape"}
-        response_img = requests.get(url_img, headers=headers, params=params_img, timeout=5)
-        
-        if response_img.status_code == 200:
-            data = response_img.json()
-            if data.get("photos"):
-                media["image_url"] = data["photos"][0]["src"]["landscape"]
-
-        # Fetch Video
-        url_vid = "https://api.pexels.com/videos/search"
-        params_vid = {"query": query, "per_page": 1, "orientation": "landscape", "min_width": 1280}
-        response_vid = requests.get(url_vid, headers=headers, params=params_vid, timeout=5)
-
-        if response_vid.status_code == 200:
-            data = response_vid.json()
-            if data.get("videos"):
-                # Get the best quality video file
-                video_files = data["videos"][0]["video_files"]
-                # Prefer HD
-                video = next((v for v in video_files if v["quality"] == "hd" or v["width"] >= 1280), video_files[0])
-                media["video_url"] = video["link"]
+def _spawn(coro) -> "asyncio.Task":
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
 
-    except Exception as e:
-        print(f"Error fetching Pexels media: {e}")
+async def fetch_pexels_media_batch_async(queries: list, deadline: float = MEDIA_DEADLINE) -> list:
+    """
+    fetch_pexels_media_batch on the event loop: every lookup is a task that
+    waits for a "pexels" limiter slot. Same deadline semantics.
+    """
+    return (await fetch_pexels_media_batch_status_async(queries, deadline))[0]
 
-    return media
+async def fetch_pexels_media_batch_status_async(queries: list, deadline: float = MEDIA_DEADLINE) -> tuple:
+    """
+    (media per query, complete per query). A query is complete when its
+    lookups all answered in time, so empty media there means Pexels has
+    nothing rather than that a lookup failed or is still running.
+    """
+    results = [{"image_url": None, "video_url": None} for _ in queries]
+    complete = [True] * len(queries)
+    if not queries or not _pexels_enabled():
+        return results, complete
 
-class TripAI:
-    def __init__(self):
-        self.destinations = []
+    def tracked(fetch, i):
+        async def run(query):
+            media, cacheable = await fetch(query)
+            complete[i] = complete[i] and cacheable
+            return media, cacheable
+        return run
+
+    tasks = {}
+    for i, query in enumerate(queries):
+        image = tracked(_fetch_pexels_image_async, i)
+        video = tracked(_fetch_pexels_video_async, i)
+        tasks[_spawn(media_cache.get_or_fetch_async(query, image, namespace="image"))] = i
+        tasks[_spawn(media_cache.get_or_fetch_async(query, video, namespace="video"))] = i
+
+    done, not_done = await asyncio.wait(tasks, timeout=deadline)
+    if not_done:
+        print(f"Pexels media deadline hit: {len(not_done)} of {len(tasks)} lookups still pending")
+    for task in not_done:
+        complete[tasks[task]] = False
+    for task in done:
         try:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            json_path = os.path.join(base_dir, "data", "destinations.json")
-            with open(json_path, "r") as f:
-                data = json.load(f)
-                self.destinations = data.get("destinations", [])
-            print(f"Loaded {len(self.destinations)} destinations from JSON.")
+            results[tasks[task]].update(task.result())
         except Exception as e:
-            print(f"Error loading destinations.json: {e}")
-            self.destinations = []
-
-    def _match_with_openai(self, query: str) -> list:
-        """Use OpenAI to semantically match destinations from the Excel list."""
-        if not client or not self.destinations:
-            return []
-            
-        # Create a condensed list for the prompt
-        dest_summary = [f"{d['Destination']} ({d['Type']}, {d['State / UT']})" for d in self.destinations]
-        
-        prompt = f"""
-        You are a smart travel assistant.
-        User Query: "{query}"
-        
-        Available Destinations:
-        {json.dumps(dest_summary)}
-        
-        Select the top 3-5 destinations from the list that semantically match the query.
-        Return ONLY a JSON list of the exact destination names (e.g. "Goa"). 
-        Example: ["Goa", "Manali"]
-        """
-        
+            print(f"Error fetching Pexels media: {e}")
+            complete[tasks[task]] = False
+    return results, complete
+
+# Itinerary calls ask for a JSON object; the prompts (prompts.py) describe its shape.
+JSON_COMPLETION = {"temperature": 0.7, "response_format": {"type": "json_object"}}
+
+def _attempt_options(route, attempt: int, deadline: float = None) -> dict:
+    # Fail fast to the next model; the last one keeps the client's own retries
+    # unless a deadline bounds the whole call.
+    options = {"timeout": route.timeout}
+    if attempt < len(route.models) - 1:
+        options["max_retries"] = 0
+    if deadline is not None:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutError(f"deadline passed before trying {route.models[attempt]}")
+        options.update(timeout=min(route.timeout, remaining), max_retries=0)
+    return options
+
+def _failed_attempt(route, attempt: int, error: Exception, upstream: str, seconds: float) -> bool:
+    """Account a failed attempt; True if the next model in the route should be tried."""
+    model = route.models[attempt]
+    observe_upstream(upstream, seconds, "error")
+    record_llm_call(model, route.purpose, seconds, "timeout" if is_timeout_error(error) else "error")
+    if attempt == len(route.models) - 1 or not is_transient_error(error):
+        return False
+    print(f"LLM {model} failed ({type(error).__name__}), falling back to {route.models[attempt + 1]}")
+    record_fallback(model, route.models[attempt + 1])
+    return True
+
+def _account_completion(route, model: str, seconds: float, messages: list, usage=None,
+                        completion_text: str = "", finish_reason: str = None):
+    """Record tokens, cost and budget use of a call; token counts are estimated locally when usage is missing."""
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or count_message_tokens(messages)
+    completion_tokens = getattr(usage, "completion_tokens", None) or count_tokens(completion_text)
+    record_llm_call(
+        model, route.purpose, seconds, "truncated" if finish_reason == "length" else "ok",
+        prompt_tokens, completion_tokens, route.max_tokens, cost_usd(model, prompt_tokens, completion_tokens),
+    )
+
+def _account_response(route, model: str, seconds: float, messages: list, response):
+    choice = response.choices[0] if response.choices else None
+    _account_completion(
+        route, model, seconds, messages, getattr(response, "usage", None),
+        (choice.message.content or "") if choice else "", choice.finish_reason if choice else None,
+    )
+
+def _chat_completion(client, route, messages: list, deadline: float = None, **kwargs) -> tuple:
+    """
+    Chat completion over `route` (see prompts.llm_route): a timeout or
+    transient upstream error moves on to the next model. Returns
+    (response, model). Every attempt is timed and accounted; streams are
+    accounted by the caller once read (see _account_completion). With a
+    `deadline` (time.time() value) no attempt runs past it; TimeoutError
+    once it has passed.
+    """
+    upstream = "llm_stream" if kwargs.get("stream") else "llm"
+    for attempt, model in enumerate(route.models):
+        options = _attempt_options(route, attempt, deadline)
+        started = time.perf_counter()
         try:
-            response = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=150,
-                temperature=0.3
-            )
-            content = response.choices[0].message.content.strip()
-            if content.startswith("```json"):
-                content = content.replace("```json", "").replace("```", "")
-            
-            matched_names = json.loads(content)
-            matches = [d for d in self.destinations if d['Destination'] in matched_names]
-            return matches
+            response = client.with_options(**options).chat.completions.create(
+                model=model, messages=messages, max_tokens=route.max_tokens, **kwargs)
         except Exception as e:
-            print(f"OpenAI semantic search error: {e}")
-            return []
+            if _failed_attempt(route, attempt, e, upstream, time.perf_counter() - started):
+                continue
+            raise
+        # For streams this is the time to the response headers.
+        seconds = time.perf_counter() - started
+        observe_upstream(upstream, seconds, "ok")
+        if not kwargs.get("stream"):
+            _account_response(route, model, seconds, messages, response)
+        return response, model
+    raise RuntimeError(f"No LLM model configured for {route.purpose}")
 
-    def get_destination_by_slug(self, slug: str) -> dict:
-        """Find a destination by slug."""
-        dest = next((d for d in self.destinations if d.get("slug") == slug), None)
-        if dest:
-            # Enrich with Pexels
+async def _chat_completion_async(client, route, messages: list, **kwargs) -> tuple:
+    """
+    _chat_completion for AsyncOpenAI. Non-streaming attempts hold an "llm"
+    limiter slot; a stream's slot must outlive this call, so its caller
+    holds one while reading it.
+    """
+    stream = kwargs.get("stream", False)
+    upstream = "llm_stream" if stream else "llm"
+    for attempt, model in enumerate(route.models):
+        started = time.perf_counter()
+        try:
+            create = client.with_options(**_attempt_options(route, attempt)).chat.completions.create
+            if stream:
+                response = await create(model=model, messages=messages, max_tokens=route.max_tokens, **kwargs)
+            else:
+                async with get_limiter("llm"):
+                    started = time.perf_counter()
+                    response = await create(model=model, messages=messages, max_tokens=route.max_tokens, **kwargs)
+        except UpstreamBusy:
+            raise
+        except Exception as e:
+            if _failed_attempt(route, attempt, e, upstream, time.perf_counter() - started):
+                continue
+            raise
+        seconds = time.perf_counter() - started
+        observe_upstream(upstream, seconds, "ok")
+        if not stream:
+            _account_response(route, model, seconds, messages, response)
+        return response, model
+    raise RuntimeError(f"No LLM model configured for {route.purpose}")
+
+# Words that don't make a trip search personalized: a search made only of
+# these and the top destination's name, state and type gets its default plan.
+GENERIC_QUERY_WORDS = frozenset("""
+    a an the to in at of for from near me my and or best top popular famous
+    trip trips travel holiday holidays vacation getaway getaways weekend weekends
+    tour tours visit plan plans itinerary itineraries place places destination destinations
+    day days night nights week short long
+""".split()) | frozenset(str(n) for n in range(1, 15))
+_WORDS = re.compile(r"[a-z0-9]+")
+# itinerary_job of a deferred search whose precomputed plan is served inline.
+PRECOMPUTED_JOB = {"id": None, "status": "done"}
+
+# Seconds between checks for a rebuilt catalogue snapshot (0 disables hot reload).
+CATALOGUE_RELOAD_INTERVAL = float(os.getenv("CATALOGUE_RELOAD_INTERVAL", 10))
+
+def _background_candidate(video: dict):
+    """Player-ready fields for a landscape HD video, or None if it doesn't qualify."""
+    files = [f for f in video.get("video_files") or [] if str(f.get("link", "")).startswith("https://")]
+    if not files or (video.get("height") and video.get("width", 0) < video["height"]):
+        return None
+    video_file = next((f for f in files if f.get("width") in (1920, 1280)), None)
+    if video_file is None:
+        video_file = max(files, key=lambda f: f.get("width") or 0)
+        if (video_file.get("width") or 0) < 1280:
+            return None
+    user = video.get("user") or {}
+    return {
+        "video_url": video_file["link"],
+        "photographer_name": user.get("name"),
+        "photographer_url": user.get("url"),
+        "duration": video.get("duration"),
+    }
+
+def _fetch_background_videos(query: str, count: int) -> list:
+    """Up to `count` validated background-video candidates for `query`."""
+    params = {
+        "query": query,
+        "per_page": count,
+        "orientation": "landscape",
+        "min_width": 1280
+    }
+    response = pexels_get("/videos/search", params=params, api_key=PEXELS_API_KEY)
+    if response.status_code != 200:
+        print(f"Pexels Video Search failed with status {response.status_code} for '{query}'")
+        return []
+    candidates, seen = [], set()
+    for video in response.json().get("videos", []):
+        candidate = _background_candidate(video)
+        if candidate and candidate["video_url"] not in seen:
+            seen.add(candidate["video_url"])
+            candidates.append(candidate)
+    print(f"Pexels Video Search: {len(candidates)} usable videos for query '{query}'")
+    return candidates
+
+# Landing-page background videos, prefetched and refreshed off the request path.
+background_videos = create_media_pool(_fetch_background_videos)
+
+def cache_stats() -> dict:
+    """Stats of the module-level caches, by name (for /metrics)."""
+    return {
+        "media": media_cache.stats(),
+        "itinerary": itinerary_cache.stats(),
+        "precomputed_itinerary": precomputed_itineraries.stats(),
+        "background_video": background_videos.stats(),
+    }
+
+class TripAI:
+    # Built on first use (from the binary snapshot when available), so importing
+    # the app and answering health checks never pays for loading the catalogue.
+    _LAZY_ATTRS = ("catalogue", "search_index", "suggest_index", "semantic_index", "facet_index", "geo_index", "top_rated")
+
+    def __init__(self):
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        self.json_path = os.path.join(base_dir, "data", "destinations.json")
+        self.snapshot_path = os.path.join(base_dir, "data", "catalogue.snapshot")
+        # Copy-on-write: a reload builds a new dict and swaps the reference;
+        # the dict a request is reading from is never mutated.
+        self._indexes = None
+        self._version = None
+        self._load_lock = threading.Lock()
+        self._watcher = None
+
+    def __getattr__(self, name):
+        if name in TripAI._LAZY_ATTRS:
+            return self.indexes[name]
+        raise AttributeError(name)
+
+    @property
+    def indexes(self) -> dict:
+        """
+        The current catalogue and its indexes. Read this once per request and
+        use that dict throughout, so row ids always match the catalogue.
+        """
+        indexes = self._indexes
+        if indexes is None:
+            indexes = self._load()
+        return indexes
+
+    async def load_async(self) -> dict:
+        """`indexes` for async routes: a cold load (JSON parse, index builds) runs on a worker thread."""
+        indexes = self._indexes
+        if indexes is None:
+            indexes = await asyncio.to_thread(self._load)
+        return indexes
+
+    @property
+    def catalogue_version(self) -> dict:
+        """{"sha1", "modified"} of the catalogue currently being served."""
+        return self.indexes.get("version") or {"sha1": None, "modified": None}
+
+    def _snapshot_version(self):
+        try:
+            st = os.stat(self.snapshot_path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _read_indexes(self) -> dict:
+        # Deferred: snapshot/catalogue pull in numpy.
+        from snapshot import load_indexes
+        version = self._snapshot_version()
+        indexes = load_indexes(self.json_path, self.snapshot_path)
+        self._version = version
+        return indexes
+
+    def _load(self) -> dict:
+        with self._load_lock:
+            if self._indexes is None:
+                try:
+                    self._indexes = self._read_indexes()
+                except Exception as e:
+                    print(f"Error loading destinations.json: {e}")
+                    from catalogue import Catalogue
+                    from snapshot import build_indexes
+                    self._indexes = build_indexes(Catalogue([]))
+                self._start_watcher()
+            return self._indexes
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Swap in the catalogue from a rebuilt snapshot. Requests in flight keep
+        the indexes they started with. Returns True if a new catalogue is live.
+        """
+        if self._indexes is None:
+            self._load()
+            return True
+        if not force and self._snapshot_version() == self._version:
+            return False
+        with self._load_lock:
+            if not force and self._snapshot_version() == self._version:
+                return False
             try:
-                query = dest.get("Destination", "") + " " + dest.get("Type", "travel")
-                media = fetch_pexels_media(query)
-                dest["image_url"] = media["image_url"]
-                dest["video_url"] = media["video_url"]
+                indexes = self._read_indexes()
             except Exception as e:
-                print(f"Error fetching media for {slug}: {e}")
-                # Fallbacks or keep existing if any
-                if "image_url" not in dest: dest["image_url"] = None
-                if "video_url" not in dest: dest["video_url"] = None
+                print(f"Catalogue reload failed, keeping the current one: {e}")
+                return False
+            self._indexes = indexes
+        print(f"Catalogue reloaded: {len(indexes['catalogue'])} destinations.")
+        return True
+
+    def _start_watcher(self):
+        if self._watcher is not None or CATALOGUE_RELOAD_INTERVAL <= 0:
+            return
+
+        def watch():
+            while True:
+                time.sleep(CATALOGUE_RELOAD_INTERVAL)
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"Catalogue watcher error: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="catalogue-reload", daemon=True)
+        self._watcher.start()
+
+    def _destination_record(self, slug: str) -> dict:
+        with stage("match"):
+            catalogue = self.indexes["catalogue"]
+            row = catalogue.by_slug.get(slug)
+            # record() builds a fresh dict, so enrichment never touches the catalogue.
+            return catalogue.record(row) if row is not None else None
+
+    @staticmethod
+    def _media_query(dest: dict) -> str:
+        return (dest.get("Destination") or "") + " " + (dest.get("Type") or "travel")
+
+    def get_destination_by_slug(self, slug: str) -> dict:
+        """Find a destination by slug and return an enriched copy."""
+        dest = self._destination_record(slug)
+        if dest is None:
+            return None
+        try:
+            with stage("enrich"):
+                media = fetch_pexels_media(self._media_query(dest))
+            dest.update(media)
+        except Exception as e:
+            print(f"Error fetching media for {slug}: {e}")
+            dest.setdefault("image_url", None)
+            dest.setdefault("video_url", None)
         return dest
 
+    async def get_destination_by_slug_async(self, slug: str) -> tuple:
+        """
+        (destination, media complete): get_destination_by_slug with media
+        fetched on the event loop. Media is incomplete when a lookup failed
+        or missed the deadline; (None, True) if there is no such slug.
+        """
+        dest = self._destination_record(slug)
+        if dest is None:
+            return None, True
+        with fair_flow(), stage("enrich"):
+            media, complete = await fetch_pexels_media_batch_status_async([self._media_query(dest)])
+        dest.update(media[0])
+        return dest, complete[0]
+
+    def get_destination_by_id(self, dest_id: int) -> dict:
+        """Find a destination record by id."""
+        catalogue = self.indexes["catalogue"]
+        row = catalogue.by_id.get(dest_id)
+        return catalogue.record(row) if row is not None else None
+
+    @staticmethod
+    def _planner_request(destination: str, query_context: str) -> tuple:
+        """(route, cache key, messages) for the 3-day planner behind /api/generate-itinerary."""
+        route = llm_route("planner")
+        key = itinerary_key(destination, "", "", 3, query_context, route.model, PLANNER_PROMPT_VERSION)
+        return route, key, planner_messages(destination, query_context)
+
     def generate_itinerary(self, destination: str, query_context: str) -> dict:
         """
         Generate a 3-day itinerary using Grok/OpenAI.
         """
+        client = get_llm_client()
         if not client:
             return {"error": "AI Client not initialized"}
 
-        prompt = f"""
-        Act as a luxury travel planner.
-        Create a 3-day itinerary for a trip to {destination}.
-        User Query Context: "{query_context}"
-        
-        Style: "Leaving with..." poetic footer, highly detailed.
-        
-        Return STRICT JSON format ONLY:
-        {{
-            "header": "A warm, engaging header about {destination}",
-            "days": [
-                {{
-                    "day": 1,
-                    "title": "Theme of Day 1",
-                    "activities": ["Activity 1", "Activity 2", "Dinner at..."]
-                }},
-                ... (Day 2, Day 3)
-            ],
-            "packing_list": ["Item 1", "Item 2", "Item 3", "Item 4"],
-            "weather_note": "A brief note about expected weather",
-            "waypoints": ["Stop 1", "Stop 2", "Stop 3", "Stop 4"]
-        }}
+        route, key, messages = self._planner_request(destination, query_context)
+
+        def generate():
+            try:
+                response, _ = _chat_completion(client, route, messages, **JSON_COMPLETION)
+                return self._parse_itinerary(response), True
+            except Exception as e:
+                print(f"AI Generation Error: {e}")
+                return {"error": str(e)}, False
+
+        with stage("llm"):
+            return itinerary_cache.get_or_generate(key, generate)
+
+    async def generate_itinerary_async(self, destination: str, query_context: str) -> dict:
+        """generate_itinerary through AsyncOpenAI and the "llm" limiter."""
+        client = get_async_llm_client()
+        if not client:
+            return {"error": "AI Client not initialized"}
+
+        route, key, messages = self._planner_request(destination, query_context)
+
+        async def generate():
+            try:
+                response, _ = await _chat_completion_async(client, route, messages, **JSON_COMPLETION)
+                return self._parse_itinerary(response), True
+            except UpstreamBusy as e:
+                print(f"AI Generation skipped: {e}")
+                return {"error": "AI service busy, try again shortly"}, False
+            except Exception as e:
+                print(f"AI Generation Error: {e}")
+                return {"error": str(e)}, False
+
+        with fair_flow(), stage("llm"):
+            return await itinerary_cache.get_or_generate_async(key, generate)
+
+    def stream_itinerary(self, destination: str, query_context: str):
         """
+        Streaming variant of generate_itinerary.
+
+        Yields (event, data) pairs as soon as each part of the JSON completes:
+        "header", one "day" per days[i], then "packing_list", "weather_note",
+        "waypoints", and finally "done" with the full itinerary. Cached plans
+        are replayed immediately.
+        """
+        client = get_llm_client()
+        if not client:
+            yield "error", {"error": "AI Client not initialized"}
+            return
 
+        route, key, messages = self._planner_request(destination, query_context)
+        cached = itinerary_cache.lookup(key)
+        if cached is not None:
+            yield from itinerary_events(cached)
+            yield "done", cached
+            return
+
+        parser = ItineraryStreamParser()
+        text, finish_reason = [], None
+        started = time.perf_counter()
         try:
-            model_name = "gpt-4o" if os.getenv("OPENAI_API_KEY") else "grok-2-latest"
-            response = client.chat.completions.create(
-                model=model_name,
-                messages=[
-                    {"role": "system", "content": "You are a helpful travel assistant that outputs strict JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                response_format={"type": "json_object"}
-            )
-            content = response.choices[0].message.content
-            return json.loads(content)
+            stream, model = _chat_completion(client, route, messages, stream=True, **JSON_COMPLETION)
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content or ""
+                text.append(piece)
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                yield from parser.feed(piece)
         except Exception as e:
-            print(f"AI Generation Error: {e}")
-            return {"error": str(e)}
-
-    def get_suggestions(self, query: str) -> list:
-        """Get a list of destination names matching the query."""
-        if not query:
-            return []
-        
-        query_lower = query.lower()
-        suggestions = []
-        
-        # Fast prefix/substring match
-        for dest in self.destinations:
-            name = dest.get("Destination", "")
-            if query_lower in name.lower():
-                suggestions.append(name)
-        
-        return suggestions[:5]
-
-    def _generate_itinerary(self, destination: str, state: str, type_of_trip: str, query: str, duration: str = "3 Days") -> dict:
-        """Generate a custom itinerary using AI."""
-        # Parse duration
+            print(f"AI Streaming Error: {e}")
+            yield "error", {"error": str(e)}
+            return
+        _account_completion(route, model, time.perf_counter() - started, messages,
+                            completion_text="".join(text), finish_reason=finish_reason)
+
+        if not parser.done:
+            yield "error", {"error": "Incomplete itinerary from model"}
+            return
+        itinerary_cache.set(key, parser.result)
+        yield "done", parser.result
+
+    async def stream_itinerary_async(self, destination: str, query_context: str):
+        """
+        Async stream_itinerary. The "llm" limiter slot is held until the
+        model's stream has been read to the end.
+        """
+        client = get_async_llm_client()
+        if not client:
+            yield "error", {"error": "AI Client not initialized"}
+            return
+
+        route, key, messages = self._planner_request(destination, query_context)
+        cached = itinerary_cache.lookup(key)
+        if cached is not None:
+            for event in itinerary_events(cached):
+                yield event
+            yield "done", cached
+            return
+
+        parser = ItineraryStreamParser()
+        text, finish_reason = [], None
         try:
-            num_days = int(''.join(filter(str.isdigit, str(duration))))
-            if num_days < 1: num_days = 2
-            if num_days > 5: num_days = 5 # Cap at 5 to avoid token limits
-        except:
-            num_days = 2
+            async with get_limiter("llm"):
+                started = time.perf_counter()
+                stream, model = await _chat_completion_async(
+                    client, route, messages, stream=True, **JSON_COMPLETION)
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    piece = chunk.choices[0].delta.content or ""
+                    text.append(piece)
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    for event in parser.feed(piece):
+                        yield event
+        except UpstreamBusy as e:
+            print(f"AI Streaming skipped: {e}")
+            yield "error", {"error": "AI service busy, try again shortly"}
+            return
+        except Exception as e:
+            print(f"AI Streaming Error: {e}")
+            yield "error", {"error": str(e)}
+            return
+        _account_completion(route, model, time.perf_counter() - started, messages,
+                            completion_text="".join(text), finish_reason=finish_reason)
 
-        # Default fallback
+        if not parser.done:
+            yield "error", {"error": "Incomplete itinerary from model"}
+            return
+        itinerary_cache.set(key, parser.result)
+        yield "done", parser.result
+
+    @staticmethod
+    def _default_itinerary(destination: str, query: str, num_days: int) -> dict:
+        """Served when no LLM is configured or the call fails."""
         default_header = f"Here's a thoughtfully paced {num_days}-day itinerary for your trip to {destination}."
         if " to " in query.lower():
              default_header = f"Here's a thoughtfully paced {num_days}-day itinerary for your trip: {query.title()}."
@@ -235,225 +700,381 @@ class TripAI:
                 "evening": ["Sunset views.", "Dinner at a top-rated restaurant."]
             })
 
-        default_itinerary = {
+        return {
             "header": default_header,
             "days": default_days,
             "footer": "Ready to finalize this? I can adjust the pace, upgrade your stay, or secure your dinner reservations for you.",
             "waypoints": ["City Center", "Local Market"]
         }
 
+    def _concierge_request(self, destination: str, state: str, type_of_trip: str, query: str, duration: str) -> tuple:
+        """(default itinerary, route, cache key, messages) for a concierge itinerary."""
+        num_days = trip_days(duration)
+        # Short trips get a cheaper model; max_tokens scales with the day count.
+        route = llm_route("concierge", num_days)
+        key = itinerary_key(destination, state, type_of_trip, num_days, query, route.model, CONCIERGE_PROMPT_VERSION)
+        messages = concierge_messages(destination, state, type_of_trip, query, num_days)
+        return self._default_itinerary(destination, query, num_days), route, key, messages
+
+    @staticmethod
+    def _plan_cache(query: str):
+        """Default plans (empty query) live in the precomputed store, personalized ones in the cache."""
+        return itinerary_cache if query else precomputed_itineraries
+
+    @staticmethod
+    def _parse_itinerary(response) -> dict:
+        content = response.choices[0].message.content.strip()
+        # Clean up potential markdown
+        if content.startswith("```json"):
+            content = content.replace("```json", "").replace("```", "")
+        if content.startswith("```"):
+            content = content.replace("```", "")
+        return json.loads(content)
+
+    def _generate_itinerary(self, destination: str, state: str, type_of_trip: str, query: str, duration: str = "3 Days",
+                            deadline: float = None) -> dict:
+        """Generate a custom itinerary using AI; by `deadline` (time.time() value) when given."""
+        default_itinerary, route, key, messages = self._concierge_request(
+            destination, state, type_of_trip, query, duration)
+        cache = self._plan_cache(query)
+        client = get_llm_client()
         if not client:
             return default_itinerary
-        
-        prompt = f"""
-        Act as a **Luxury Travel Concierge** planning a trip to {destination}, {state} (Type: {type_of_trip}).
-        User's Search Query: "{query}" (Context: {query}).
-        Duration: {num_days} Days.
-        
-        **Style & Tone**:
-        - Curated, exclusive, and "in-the-know".
-        - "Thoughtfully paced" and "Verified".
-        - Include **specific details**: Signature dishes at restaurants, best photo spots, entry fees (approx), and exact travel times.
-        
-        Return strictly valid JSON with this structure:
-        {{
-            "header": "A warm, professional opening. E.g., 'I’ve curated a bespoke {num_days}-day itinerary for your journey from [Origin] to {destination}...' ",
-            "days": [
-                {{
-                    "day_label": "Day 1",
-                    "title": "A captivating title",
-                    "subtitle": "Brief vibe summary.",
-                    "morning": ["Time - Activity: Detail", "Lunch tip"],
-                    "afternoon": ["Activity 1", "Activity 2"],
-                    "evening": ["Sunset spot", "Dinner tip"]
-                }},
-                ... (Repeat for ALL {num_days} days)
-            ],
-            "footer": "Concierge closing.",
-            "waypoints": ["List of 3-4 specific real locations"]
-        }}
-        
-        IMPORTANT: Generate detailed plans for ALL {num_days} DAYS. Use REAL businesses.
-        Do not include markdown formatting. Just the pure JSON string.
-        """
-        
-        try:
-            response = client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1500, # Increased for longer plans
-                temperature=0.7
-            )
-            content = response.choices[0].message.content.strip()
-            # Clean up potential markdown
-            if content.startswith("```json"):
-                content = content.replace("```json", "").replace("```", "")
-            if content.startswith("```"):
-                content = content.replace("```", "")
-            
-            return json.loads(content)
-        except Exception as e:
-            print(f"Error generating AI itinerary: {e}")
+
+        def generate():
+            try:
+                response, _ = _chat_completion(client, route, messages, deadline=deadline, **JSON_COMPLETION)
+                return self._parse_itinerary(response), True
+            except Exception as e:
+                print(f"Error generating AI itinerary: {e}")
+                return default_itinerary, False
+
+        with stage("llm"):
+            return cache.get_or_generate(key, generate)
+
+    async def _generate_itinerary_async(self, destination: str, state: str, type_of_trip: str, query: str,
+                                        duration: str = "3 Days") -> dict:
+        """_generate_itinerary through AsyncOpenAI; the default plan when the "llm" queue is full."""
+        default_itinerary, route, key, messages = self._concierge_request(
+            destination, state, type_of_trip, query, duration)
+        cache = self._plan_cache(query)
+        client = get_async_llm_client()
+        if not client:
             return default_itinerary
 
-    def generate_trips(self, query: str) -> dict:
+        async def generate():
+            try:
+                response, _ = await _chat_completion_async(client, route, messages, **JSON_COMPLETION)
+                return self._parse_itinerary(response), True
+            except Exception as e:
+                print(f"Error generating AI itinerary: {e!r}")
+                return default_itinerary, False
+
+        with stage("llm"):
+            return await cache.get_or_generate_async(key, generate)
+
+    def _match(self, indexes: dict, query: str, filters: dict = None, limit: int = None) -> tuple:
         """
-        Search for trips within the loaded JSON data.
+        (ranked rows, applied filters, facet counts or None). Filters written
+        in the query ("within 500 km", "score > 7", "in November") are merged
+        with `filters`; with any filter, matching is restricted to the
+        filtered rows and facet counts are computed over every match. If
+        filters found only in the text match nothing, they are dropped.
         """
-        if not self.destinations:
-            return {"trips": []}
-
-        query_lower = query.lower()
-        matches = []
-        
-        # 1. Smarter Keyword Search
-        tokens = query_lower.split()
-        stopwords = {"trip", "travel", "days", "day", "night", "nights", "to", "in", "for", "a", "an", "the", "near", "weekend", "holiday", "vacation"}
-        filtered_tokens = [t for t in tokens if t not in stopwords and len(t) > 2]
-
-        for dest in self.destinations:
-            dest_name = dest.get('Destination', '').lower()
-            dest_state = dest.get('State / UT', '').lower()
-            
-            # Priority 1: Exact Destination Name in Query (e.g. "Jaipur" in "Jaipur trip")
-            if dest_name and dest_name in query_lower:
-                matches.append(dest)
-                continue
+        from facets import merge_filters, parse_query
 
-            # Priority 2: Destination Name contains a significant token (fuzzy) working? 
-            # Risk: "Goa" matches "Goat"? No, token matching is safer.
-            # Let's check if any filtered token is the destination name
-            if any(token == dest_name for token in filtered_tokens):
-                matches.append(dest)
-                continue
-                
-            # Priority 3: Search text (fallback)
-            search_text = (
-                f"{dest.get('Destination')} {dest.get('State / UT')} "
-                f"{dest.get('Type')} {dest.get('Famous For')}"
-            ).lower()
-            
-            # Check if all significant tokens vary? No, let's keep it simple.
-            # If the user asks "Beaches in India", we want matching tags.
-            if any(token in search_text for token in filtered_tokens):
-                # Only add if not already added? 
-                # matches.append(dest) - this might be too broad (returns many).
-                # better to rely on priority 1 & 2 for explicit cities.
-                pass
-
-        # If no explicit city matches found, try broader tag/description search
-        if not matches:
-             for dest in self.destinations:
-                search_text = (
-                    f"{dest.get('Destination')} {dest.get('State / UT')} "
-                    f"{dest.get('Type')} {dest.get('Famous For')}"
-                ).lower()
-                
-                # Require at least one matching token
-                if any(t in search_text for t in filtered_tokens):
-                     matches.append(dest)
-
-        # 2. Semantic Search (Disabled/Optional)
-        if len(matches) < 1 and client:
-             # ... existing semantic search logic ...
-             pass
-        
-        # 3. Fallback (Random) ONLY if absolutely nothing found
-        if not matches:
-             matches = random.sample(self.destinations, min(3, len(self.destinations)))
-        
-        # Limit results
-        results = matches[:6]
-        
-        # Transform & Enrich
-        trips = []
-        for i, dest in enumerate(results):
-            image_query = dest.get("Destination") + " " + dest.get("Type", "travel")
-            media = fetch_pexels_media(image_query)
-            
-            # Generate detailed itinerary ONLY for the top result (to save latency/tokens)
-            itinerary = None
-            if i == 0:
-                itinerary = self._generate_itinerary(
-                    dest.get("Destination"), 
-                    dest.get("State / UT"), 
-                    dest.get("Type", "Travel"),
-                    query, # Pass the original query
-                    str(dest.get("Ideal Duration", "3 Days")) # Pass duration
-                )
+        text, parsed = parse_query(query)
+        explicit = merge_filters(filters)
+        filters = merge_filters(parsed, explicit)
+        if filters:
+            mask = indexes["facet_index"].mask(filters)
+            rows = indexes["search_index"].match(text, mask=mask)
+            if not rows and text:
+                rows = [i for i, _ in indexes["semantic_index"].search(text, limit or 6, mask=mask)]
+            if not rows and text:
+                # Nothing matches the words within the filters: rank the filtered rows.
+                rows = indexes["search_index"].match("", mask=mask)
+            if rows or explicit:
+                facets = indexes["facet_index"].counts(rows)
+                return rows[:limit] if limit else rows, filters, facets
+            # Filters read from the text alone match nothing; treat it as plain text.
+
+        # 1. Keyword Search (precomputed inverted index)
+        rows = indexes["search_index"].match(query, limit=limit)
+        # 2. Semantic Search (local vector index, no LLM call)
+        if not rows:
+            rows = [i for i, _ in indexes["semantic_index"].search(query, limit or 6)]
+        return rows, {}, None
+
+    def search_destinations(self, query: str = "", filters: dict = None, limit: int = 20, offset: int = 0) -> dict:
+        """
+        Structured catalogue search: free text plus facet filters, one page of
+        destination records (no media) and facet counts over all matches.
+        """
+        from facets import merge_filters
 
+        indexes = self.indexes
+        catalogue = indexes["catalogue"]
+        filters = merge_filters(filters)
+        with stage("match"):
+            if query.strip() or filters:
+                rows, filters, facets = self._match(indexes, query, filters)
+            else:
+                rows, filters, facets = indexes["top_rated"], {}, None
+            if facets is None:
+                facets = indexes["facet_index"].counts(rows)
+            page = [catalogue.record(i) for i in rows[offset:offset + limit]]
+        return {"total": len(rows), "results": page, "filters": filters, "facets": facets}
+
+    def resolve_origin(self, origin: str) -> dict:
+        """Coordinates of an origin city: the gazetteer first, then catalogue destinations."""
+        from gazetteer import get_gazetteer, place_key
+
+        place = get_gazetteer().lookup(origin)
+        if place is not None:
+            return place
+        catalogue = self.indexes["catalogue"]
+        row = catalogue.by_slug.get(place_key(origin).replace(" ", "-"))
+        if row is None or catalogue.get(row, "lat") is None or catalogue.get(row, "lon") is None:
+            return None
+        return {"name": catalogue.names[row], "state": catalogue.states[row],
+                "lat": catalogue.get(row, "lat"), "lon": catalogue.get(row, "lon")}
+
+    def nearby_destinations(self, lat: float, lon: float, k: int = 10, radius_km: float = None,
+                            sort: str = "score") -> list:
+        """
+        The k nearest destinations (or all within radius_km, up to k) from a
+        point, each with "distance_km". sort="score" ranks them by proximity
+        blended with weekend_score; sort="distance" keeps nearest first.
+        """
+        from geo_index import rank_nearby
+
+        indexes = self.indexes
+        catalogue = indexes["catalogue"]
+        with stage("match"):
+            if radius_km is not None:
+                rows, distances = indexes["geo_index"].within(lat, lon, radius_km)
+            else:
+                rows, distances = indexes["geo_index"].nearest(lat, lon, k)
+            if sort == "score":
+                order = rank_nearby(distances, catalogue.weekend_scores[rows])
+                rows, distances = rows[order], distances[order]
+            results = []
+            for row, distance in zip(rows[:k].tolist(), distances[:k].tolist()):
+                record = catalogue.record(row)
+                record["distance_km"] = round(distance, 1)
+                results.append(record)
+        return results
+
+    def _trip_candidates(self, query: str, filters: dict) -> tuple:
+        """(top destination records, applied filters, facet counts) for a trip search."""
+        indexes = self.indexes
+        catalogue = indexes["catalogue"]
+        if not len(catalogue):
+            return [], {}, None
+
+        with stage("match"):
+            rows, filters, facets = self._match(indexes, query, filters, limit=6)
+
+            # 3. Fallback ONLY if absolutely nothing found: best-rated weekend picks
+            # (a filtered search that matches nothing stays empty)
+            if not rows and not filters:
+                rows = indexes["top_rated"][:3]
+
+            # Limit results; only these rows are materialized as dicts
+            return [catalogue.record(i) for i in rows[:6]], filters, facets
+
+    @staticmethod
+    def _is_personalized(query: str, top: dict) -> bool:
+        """
+        True if the query asks for more than `top` itself: words other than
+        its name, state and type, filter phrases and generic trip words.
+        """
+        from facets import parse_query
+
+        text, _ = parse_query(query)
+        known = set(GENERIC_QUERY_WORDS)
+        for field in ("Destination", "State / UT", "Type"):
+            known.update(_WORDS.findall(str(top.get(field) or "").lower()))
+        return any(word not in known for word in _WORDS.findall(text.lower()))
+
+    @classmethod
+    def _itinerary_args(cls, query: str, top: dict) -> tuple:
+        # Non-personalized searches share the destination's default plan
+        # (empty query), which warm_itineraries.py precomputes.
+        return (
+            top.get("Destination"),
+            top.get("State / UT"),
+            top.get("Type", "Travel"),
+            query if cls._is_personalized(query, top) else "",
+            str(top.get("Ideal Duration", "3 Days")) # Pass duration
+        )
+
+    def _precomputed_itinerary(self, itinerary_args: tuple):
+        """
+        The stored default plan for these args, or None (personalized query,
+        or not warmed). Lets a deferred search answer inline instead of
+        queueing a job; otherwise _generate_itinerary finds it in the store.
+        """
+        if itinerary_args[3]:
+            return None
+        _, _, key, _ = self._concierge_request(*itinerary_args)
+        return precomputed_itineraries.get(key)
+
+    def precompute_itinerary(self, top: dict, num_days: int, force: bool = False, throttle=None) -> tuple:
+        """
+        Generate and store the default plan for one destination and day
+        count (see warm_itineraries.py). Returns (status, key): "stored" if
+        a plan was already there (and not `force`), "generated", or "failed".
+        `throttle()` is called right before the LLM request.
+        """
+        destination, state, trip_type, _, _ = self._itinerary_args("", top)
+        _, route, key, messages = self._concierge_request(destination, state, trip_type, "", f"{num_days} Days")
+        if not force and precomputed_itineraries.get(key) is not None:
+            return "stored", key
+        client = get_llm_client()
+        if not client:
+            return "failed", key
+        if throttle is not None:
+            throttle()
+        try:
+            response, _ = _chat_completion(client, route, messages, **JSON_COMPLETION)
+            itinerary = self._parse_itinerary(response)
+        except Exception as e:
+            print(f"Precomputing {destination} ({num_days} days) failed: {e}")
+            return "failed", key
+        precomputed_itineraries.set(key, itinerary)
+        return "generated", key
+
+    @staticmethod
+    def _trips_response(results: list, media_list: list, itinerary: dict, filters: dict, facets: dict) -> dict:
+        trips = []
+        for i, (dest, media) in enumerate(zip(results, media_list)):
             trips.append({
                 "id": dest.get("id"),
                 "slug": dest.get("slug"),
                 "title": dest.get("Destination"),
                 "location": f"{dest.get('Destination')}, {dest.get('State / UT')}",
                 "description": dest.get("Short Description", f"Explore {dest.get('Destination')}"),
-                "price": "₹5,000 - ₹15,000", 
+                "price": dest.get("Price") or "₹5,000 - ₹15,000",
                 "duration": f"{dest.get('Ideal Duration')} Days",
                 "rating": 4.5,
                 "attractions": [t.strip() for t in dest.get("Famous For", "").split(",")],
                 "image_url": media["image_url"] or "/images/default_trip.png",
                 "video_url": media["video_url"],
                 "tags": [dest.get("Type"), dest.get("Best Time to Visit")],
-                "itinerary": itinerary # Add existing or None
+                "itinerary": itinerary if i == 0 else None
             })
 
-        return {"trips": trips}
+        response = {"trips": trips}
+        if filters:
+            response["filters"] = filters
+            response["facets"] = facets
+        return response
 
-    def get_random_background_image(self, query: str = "nature,travel,india") -> dict:
-        return fetch_pexels_media(query).get("image_url")
+    def generate_trips(self, query: str, defer_itinerary: bool = False, filters: dict = None) -> dict:
+        """
+        Search for trips within the loaded JSON data.
+        With defer_itinerary, the top itinerary is generated by a background
+        job and the response carries its id instead of waiting on the LLM.
+        Searches that only name the destination get its default plan,
+        precomputed by warm_itineraries.py (inline even when deferred).
+        Filtered searches (explicit `filters` or ones written in the query)
+        also return the applied filters and facet counts.
+        """
+        results, filters, facets = self._trip_candidates(query, filters)
+        if not results:
+            return {"trips": [], "filters": filters, "facets": facets} if filters else {"trips": []}
 
-    def get_random_background_video(self, query: str = "timelapse,hyperlapse,city traffic,clouds moving") -> dict:
-        """Fetch a random background video (timelapse) from Pexels."""
-        if not PEXELS_API_KEY or PEXELS_API_KEY == "your_pexels_api_key_here":
-            return None
+        # Generate detailed itinerary ONLY for the top result (to save latency/tokens),
+        # in parallel with media enrichment or as a background job.
+        itinerary_args = self._itinerary_args(query, results[0])
+        itinerary = None
+        itinerary_future = None
+        itinerary_job = None
+        if defer_itinerary:
+            itinerary = self._precomputed_itinerary(itinerary_args)
+            if itinerary is None:
+                itinerary_job = self._submit_itinerary_job(itinerary_args)
+            else:
+                itinerary_job = dict(PRECOMPUTED_JOB)
+        else:
+            itinerary_future = submit(_llm_pool, self._generate_itinerary, *itinerary_args)
+
+        # Transform & Enrich
+        with stage("enrich"):
+            media_list = fetch_pexels_media_batch([self._media_query(dest) for dest in results])
+        if itinerary_future:
+            itinerary = itinerary_future.result()
+
+        response = self._trips_response(results, media_list, itinerary, filters, facets)
+        if defer_itinerary:
+            response["itinerary_job"] = itinerary_job
+        return response
+
+    async def generate_trips_async(self, query: str, defer_itinerary: bool = False, filters: dict = None) -> dict:
+        """
+        generate_trips on the event loop: media lookups and the itinerary run
+        as tasks behind the per-upstream limiters instead of on thread pools.
+        """
+        results, filters, facets = self._trip_candidates(query, filters)
+        if not results:
+            return {"trips": [], "filters": filters, "facets": facets} if filters else {"trips": []}
 
-        headers = {"Authorization": PEXELS_API_KEY}
+        with fair_flow():
+            itinerary_args = self._itinerary_args(query, results[0])
+            itinerary = None
+            itinerary_task = None
+            itinerary_job = None
+            if defer_itinerary:
+                itinerary = self._precomputed_itinerary(itinerary_args)
+                if itinerary is None:
+                    itinerary_job = self._submit_itinerary_job(itinerary_args)
+                else:
+                    itinerary_job = dict(PRECOMPUTED_JOB)
+            else:
+                itinerary_task = asyncio.ensure_future(self._generate_itinerary_async(*itinerary_args))
+
+            with stage("enrich"):
+                media_list = await fetch_pexels_media_batch_async([self._media_query(dest) for dest in results])
+            if itinerary_task:
+                itinerary = await itinerary_task
+
+        response = self._trips_response(results, media_list, itinerary, filters, facets)
+        if defer_itinerary:
+            response["itinerary_job"] = itinerary_job
+        return response
+
+    def _submit_itinerary_job(self, itinerary_args: tuple) -> dict:
+        """Queue the top itinerary, deduplicated by destination + normalized query."""
+        key = f"{normalize_query(itinerary_args[0])}|{normalize_query(itinerary_args[3])}"
         try:
-            url = "https://api.pexels.com/videos/search"
-            params = {
-                "query": query,
-                "per_page": 5, 
-                "orientation": "landscape",
-                "min_width": 1280
-            }
-            response = requests.get(url, headers=headers, params=params, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                print(f"Pexels Video Search: Found {len(data.get('videos', []))} videos for query '{query}'")
-                if data.get("videos"):
-                    video_data = data["videos"][0]
-                    video_files = video_data["video_files"]
-                    video_file = next((v for v in video_files if v["width"] == 1920 or v["width"] == 1280), video_files[0])
-                    return {
-                        "video_url": video_file["link"],
-                        "photographer_name": video_data["user"]["name"],
-                        "photographer_url": video_data["user"]["url"],
-                        "duration": video_data["duration"]
-                    }
-        except Exception as e:
-            print(f"Error fetching background video: {e}")
+            job = itinerary_jobs.submit(
+                key, lambda deadline: self._generate_itinerary(*itinerary_args, deadline=deadline))
+        except QueueFull as e:
+            print(f"Itinerary job rejected: {e}")
+            return {"id": None, "status": "rejected"}
+        return {"id": job.id, "status": job.status, "poll_url": f"/api/itinerary/jobs/{job.id}"}
+
+    def get_itinerary_job(self, job_id: str, wait: float = 0) -> dict:
+        """Status (and result once done) of a background itinerary job."""
+        job = itinerary_jobs.wait(job_id, wait)
+        return job.to_dict() if job else None
+
+    async def get_itinerary_job_async(self, job_id: str, wait: float = 0) -> dict:
+        """get_itinerary_job that long-polls on the event loop."""
+        job = await itinerary_jobs.wait_async(job_id, wait)
+        return job.to_dict() if job else None
+
+    def get_random_background_image(self, query: str = "nature,travel,india") -> dict:
+        return fetch_pexels_image(query).get("image_url")
+
+    def get_random_background_video(self, query: str = "timelapse,hyperlapse,city traffic,clouds moving") -> dict:
+        """A random background video (timelapse) from the prefetched pool."""
+        if not _pexels_enabled():
             return None
-        
-        print("No videos found or error in processing Pexels response.")
-        return None
+        return background_videos.pick(query)
 
-    def get_suggestions(self, query: str) -> list:
+    def get_suggestions(self, query: str, limit: int = DEFAULT_SUGGEST_LIMIT) -> list:
         """Get autocomplete suggestions for destinations."""
-        if not query or not self.destinations:
-            return []
-        
-        query = query.lower()
-        suggestions = []
-        
-        seen = set()
-        for dest in self.destinations:
-            name = dest.get("Destination")
-            if name and query in name.lower() and name not in seen:
-                suggestions.append(name)
-                seen.add(name)
-                
-            if len(suggestions) >= 10:
-                break
-                
-        return suggestions
+        return self.indexes["suggest_index"].suggest(query, limit)
@@ -0,0 +1,120 @@
+"""Shared helpers for the benchmark scripts: latency summaries and stored baselines."""
+import os
+import sys
+import json
+import math
+import time
+import platform
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Metrics compared against baselines; True means higher is better.
+COMPARED_METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "rps": True}
+DEFAULT_THRESHOLD = 0.25
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(seconds: list, elapsed: float = None) -> dict:
+    """Latency summary in milliseconds (plus throughput when `elapsed` is given)."""
+    values = sorted(s * 1000 for s in seconds)
+    summary = {
+        "n": len(values),
+        "mean_ms": sum(values) / len(values) if values else 0.0,
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1] if values else 0.0,
+    }
+    if elapsed:
+        summary["rps"] = len(values) / elapsed
+    return summary
+
+
+def print_table(results: dict):
+    """results: {group: {name: summary}}"""
+    print(f"{'benchmark':<28}{'n':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'rps':>10}")
+    for group, rows in results.items():
+        for name, s in rows.items():
+            rps = f"{s['rps']:>10.1f}" if "rps" in s else f"{'':>10}"
+            print(f"{group + '/' + name:<28}{s['n']:>8}{s['mean_ms']:>9.2f}m{s['p50_ms']:>9.2f}m"
+                  f"{s['p95_ms']:>9.2f}m{s['p99_ms']:>9.2f}m{rps}")
+
+
+def baseline_path(name: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(name: str, results: dict, params: dict = None) -> str:
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = baseline_path(name)
+    document = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+        "params": params or {},
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Saved baseline to {path}")
+    return path
+
+
+def compare_baseline(name: str, results: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Print current vs baseline for every compared metric and return the
+    regressions (changes worse than `threshold`, e.g. 0.25 = 25%).
+    """
+    with open(baseline_path(name)) as f:
+        baseline = json.load(f)
+    print(f"Comparing with baseline from {baseline['created_at']} on {baseline['machine']}")
+    print(f"{'metric':<36}{'baseline':>12}{'current':>12}{'change':>10}")
+    regressions = []
+    for group, rows in results.items():
+        for bench, summary in rows.items():
+            old = baseline["results"].get(group, {}).get(bench)
+            if old is None:
+                continue
+            for metric, higher_is_better in COMPARED_METRICS.items():
+                if metric not in summary or not old.get(metric):
+                    continue
+                change = (summary[metric] - old[metric]) / old[metric]
+                worse = -change if higher_is_better else change
+                flag = "  REGRESSION" if worse > threshold else ""
+                label = f"{group}/{bench}/{metric}"
+                print(f"{label:<36}{old[metric]:>12.2f}{summary[metric]:>12.2f}{change:>+9.0%}{flag}")
+                if flag:
+                    regressions.append(label)
+    return regressions
+
+
+def add_baseline_args(parser):
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="compare with the stored baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative change counted as a regression (default 0.25)")
+
+
+def finish(name: str, results: dict, args, params: dict = None) -> int:
+    """Print, then save and/or compare as requested; returns the process exit code."""
+    print_table(results)
+    if args.save:
+        save_baseline(name, results, params)
+    if args.compare:
+        regressions = compare_baseline(name, results, args.threshold)
+        if regressions:
+            print(f"FAIL: {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            return 1
+        print("OK")
+    return 0
@@ -0,0 +1,75 @@
+"""
+Import-time regression check for the serverless cold path.
+
+    python benchmarks/importtime.py [--runs 5] [--budget-ms 150] [--total-budget-ms 1500]
+
+Runs `python -X importtime -c "import main"` in fresh interpreters and fails
+(exit code 1) when:
+
+  * any heavy module (openai, requests, numpy, pandas, ...) is imported by
+    `import main`,
+  * the median cumulative import time of ai_service exceeds --budget-ms, or
+  * the median import time of main (FastAPI included) exceeds --total-budget-ms.
+"""
+import os
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages that must not be loaded just by importing the app.
+FORBIDDEN = ("openai", "requests", "urllib3", "httpx", "numpy", "pandas", "openpyxl", "google")
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def run_once() -> dict:
+    """Cumulative microseconds per imported module for one cold `import main`."""
+    env = dict(os.environ)
+    env.update({"OPENAI_API_KEY": "", "GROK_API_KEY": "", "PEXELS_API_KEY": ""})
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in out.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time budget check for `import main`.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", 150)),
+                        help="budget for ai_service and everything it imports")
+    parser.add_argument("--total-budget-ms", type=float, default=float(os.getenv("IMPORT_TOTAL_BUDGET_MS", 1500)),
+                        help="budget for `import main`, FastAPI included")
+    args = parser.parse_args(argv)
+
+    runs = [run_once() for _ in range(args.runs)]
+    failures = []
+
+    heavy = sorted({name.split(".")[0] for run in runs for name in run} & set(FORBIDDEN))
+    if heavy:
+        failures.append(f"heavy modules imported eagerly: {', '.join(heavy)}")
+
+    for module, budget in (("ai_service", args.budget_ms), ("main", args.total_budget_ms)):
+        elapsed = statistics.median(run.get(module, 0) for run in runs) / 1000
+        print(f"{module:<12}{elapsed:>10.1f}ms  (budget {budget:.0f}ms)")
+        if elapsed > budget:
+            failures.append(f"{module} imports in {elapsed:.1f}ms, over the {budget:.0f}ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
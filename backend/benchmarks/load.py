@@ -0,0 +1,261 @@
+"""
+End-to-end load test: the FastAPI app under uvicorn, driven by concurrent clients.
+
+    python benchmarks/load.py [--size 10k] [--concurrency 16] [--duration 20]
+                              [--pexels-latency 0.05] [--llm-latency 0.5]
+                              [--scenario mixed|isolation] [--probes 4]
+                              [--save | --compare [--threshold 0.25]]
+
+Starts the Pexels and OpenAI stand-ins (devservers.py) and a uvicorn server
+in separate processes, with the app pointed at a synthetic catalogue of
+`--size` destinations. Client threads then replay a weighted mix of
+suggest, destination, search and background-video requests for
+`--duration` seconds (after `--warmup` seconds that are not measured) and
+report throughput and p50/p95/p99 per route and overall.
+
+`--scenario isolation` measures how well cheap catalogue routes (suggest,
+facet search, nearby) are shielded from slow upstream work: `--probes`
+catalogue clients run alone, then again next to `--concurrency` clients
+hammering /search with the media and itinerary caches disabled, so every
+search waits on Pexels and the LLM. The catalogue latency of the two runs
+should be close.
+
+`--save` stores the results in benchmarks/baselines/<scenario>.json (the mixed
+scenario is "load"); `--compare` reports the change against it and exits 1
+on regressions.
+"""
+import os
+import sys
+import time
+import random
+import socket
+import argparse
+import threading
+import subprocess
+
+from common import BACKEND_DIR, add_baseline_args, finish, summarize
+from synthetic import ensure_dataset, parse_size
+
+# route -> share of requests
+WORKLOAD = {"suggest": 0.45, "destination": 0.30, "search": 0.15, "video": 0.10}
+# Isolation scenario: catalogue-only probes vs. upstream-bound searches.
+CATALOGUE_WORKLOAD = {"suggest": 0.6, "facets": 0.2, "nearby": 0.2}
+SEARCH_WORKLOAD = {"search": 1.0}
+# Server settings that send every search to the stand-ins.
+UNCACHED_ENV = {
+    "PEXELS_CACHE_TTL": "0", "PEXELS_CACHE_NEGATIVE_TTL": "0",
+    "ITINERARY_CACHE_TTL": "0", "PRECOMPUTED_ITINERARIES_PATH": "",
+}
+
+_SERVER = r"""
+import sys, uvicorn, main
+main.ai_service.json_path, main.ai_service.snapshot_path = sys.argv[1], sys.argv[2]
+uvicorn.run(main.app, host="127.0.0.1", port=int(sys.argv[3]), log_level="warning")
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url: str, timeout: float = 60.0):
+    import requests
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def _start_stand_in(service: str, latency: float) -> tuple:
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "devservers.py", service, "--port", str(port), "--latency", str(latency)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    _wait_for(url)
+    return process, url
+
+
+def _start_server(json_path: str, snapshot_path: str, pexels_url: str, openai_url: str,
+                  extra_env: dict = None) -> tuple:
+    port = _free_port()
+    env = dict(os.environ)
+    env.update({
+        "PEXELS_API_KEY": "bench",
+        "PEXELS_API_BASE": pexels_url,
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{openai_url}/v1",
+        "GROK_API_KEY": "",
+        "PEXELS_CACHE_BACKEND": "memory",
+        "ITINERARY_CACHE_BACKEND": "memory",
+        "CATALOGUE_RELOAD_INTERVAL": "0",
+    })
+    env.update(extra_env or {})
+    process = subprocess.Popen(
+        [sys.executable, "-c", _SERVER, json_path, snapshot_path, str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    _wait_for(url)
+    return process, url
+
+
+def _requests(catalogue_path: str, seed: int, workload: dict = WORKLOAD):
+    """An endless stream of (route, method, path, kwargs) drawn from the workload mix."""
+    import json
+
+    with open(catalogue_path, "r", encoding="utf-8") as f:
+        destinations = json.load(f)["destinations"]
+    rng = random.Random(seed)
+    routes, weights = zip(*workload.items())
+    while True:
+        route = rng.choices(routes, weights)[0]
+        dest = rng.choice(destinations)
+        if route == "suggest":
+            yield route, "GET", "/api/destinations/suggest", {"params": {"q": dest["Destination"][:rng.randint(1, 4)]}}
+        elif route == "destination":
+            yield route, "GET", f"/api/destinations/{dest['slug']}", {}
+        elif route == "search":
+            query = rng.choice([f"{dest['Destination']} trip", f"{dest['Type']} in {dest['State / UT']}"])
+            yield route, "POST", "/search", {"json": {"query": query}}
+        elif route == "facets":
+            params = {"q": dest["Type"], "max_distance": rng.choice([300, 800, 2000]), "limit": 10}
+            yield route, "GET", "/api/destinations/search", {"params": params}
+        elif route == "nearby":
+            if dest.get("lat") is not None:
+                params = {"lat": dest["lat"], "lon": dest["lon"], "k": 10}
+            else:
+                params = {"origin": rng.choice(["Delhi", "Mumbai", "Bengaluru", "Kolkata", "Jaipur"])}
+            yield route, "GET", "/api/destinations/nearby", {"params": params}
+        else:
+            yield route, "GET", "/api/video/background", {}
+
+
+def run_load(base_url: str, catalogue_path: str, clients: list, duration: float, warmup: float) -> dict:
+    """
+    Drive `clients`, a list of (label, workload, count), all at once.
+    Returns summaries per route, per client label (None for no separate
+    summary) and "all".
+    """
+    import requests
+
+    routes = sorted({route for _, workload, _ in clients for route in workload})
+    keys = routes + [label for label, _, _ in clients if label and label not in routes]
+    timings = {key: [] for key in keys}
+    errors = {key: 0 for key in keys}
+    lock = threading.Lock()
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    def client(label: str, workload: dict, seed: int):
+        session = requests.Session()
+        local = {key: [] for key in keys}
+        local_errors = {key: 0 for key in keys}
+        for route, method, path, kwargs in _requests(catalogue_path, seed, workload):
+            t0 = time.perf_counter()
+            if t0 >= stop_at:
+                break
+            try:
+                ok = session.request(method, base_url + path, timeout=30, **kwargs).status_code < 400
+            except requests.RequestException:
+                ok = False
+            if t0 >= measure_from:
+                seconds = time.perf_counter() - t0
+                for key in {route, label} - {None}:
+                    local[key].append(seconds)
+                    local_errors[key] += not ok
+        with lock:
+            for key in keys:
+                timings[key].extend(local[key])
+                errors[key] += local_errors[key]
+
+    threads = []
+    for label, workload, count in clients:
+        for _ in range(count):
+            threads.append(threading.Thread(target=client, args=(label, workload, len(threads))))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - measure_from
+
+    results = {}
+    for key in keys:
+        results[key] = dict(summarize(timings[key], elapsed), errors=errors[key])
+    every = [t for route in routes for t in timings[route]]
+    results["all"] = dict(summarize(every, elapsed), errors=sum(errors[route] for route in routes))
+    return results
+
+
+def run_isolation(base_url: str, catalogue_path: str, probes: int, concurrency: int,
+                  duration: float, warmup: float) -> dict:
+    """Catalogue-route latency alone and under a concurrent /search flood."""
+    alone = run_load(base_url, catalogue_path, [("catalogue", CATALOGUE_WORKLOAD, probes)], duration, warmup)
+    contended = run_load(
+        base_url, catalogue_path,
+        [("catalogue", CATALOGUE_WORKLOAD, probes), ("search", SEARCH_WORKLOAD, concurrency)],
+        duration, warmup,
+    )
+    return {"alone": alone, "under_search_load": contended}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end load test for the backend.")
+    parser.add_argument("--size", default="10k")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--pexels-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--scenario", choices=("mixed", "isolation"), default="mixed")
+    parser.add_argument("--probes", type=int, default=4, help="catalogue clients in the isolation scenario")
+    add_baseline_args(parser)
+    args = parser.parse_args(argv)
+
+    json_path, snapshot_path = ensure_dataset(parse_size(args.size))
+    isolation = args.scenario == "isolation"
+    processes = []
+    try:
+        pexels, pexels_url = _start_stand_in("pexels", args.pexels_latency)
+        processes.append(pexels)
+        openai, openai_url = _start_stand_in("openai", args.llm_latency)
+        processes.append(openai)
+        server, base_url = _start_server(json_path, snapshot_path, pexels_url, openai_url,
+                                         UNCACHED_ENV if isolation else None)
+        processes.append(server)
+
+        if isolation:
+            print(f"Isolation: {args.probes} catalogue clients, alone then next to {args.concurrency} "
+                  f"search clients, {args.duration:.0f}s each against {base_url}...", file=sys.stderr)
+            phases = run_isolation(base_url, json_path, args.probes, args.concurrency, args.duration, args.warmup)
+            results = {f"{args.size}-{phase}": summary for phase, summary in phases.items()}
+        else:
+            print(f"Load: {args.concurrency} clients for {args.duration:.0f}s against {base_url}...", file=sys.stderr)
+            results = {args.size: run_load(base_url, json_path, [(None, WORKLOAD, args.concurrency)],
+                                           args.duration, args.warmup)}
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+    errors = sum(summary["all"]["errors"] for summary in results.values())
+    if errors:
+        print(f"{errors} request(s) failed", file=sys.stderr)
+    params = {k: getattr(args, k) for k in ("size", "concurrency", "duration", "pexels_latency", "llm_latency")}
+    if isolation:
+        params["probes"] = args.probes
+    return finish("isolation" if isolation else "load", results, args, params)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
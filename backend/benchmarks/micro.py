@@ -0,0 +1,155 @@
+"""
+Micro-benchmarks for the backend hot paths, per catalogue size.
+
+    python benchmarks/micro.py [--sizes 1k,10k,100k] [--iterations 300]
+                               [--pexels-latency 0] [--llm-latency 0]
+                               [--save | --compare [--threshold 0.25]]
+
+Each size uses a cached synthetic catalogue (benchmarks/synthetic.py) and
+in-process stand-ins for Pexels and the OpenAI-compatible API
+(devservers.py), so nothing leaves the machine. Benchmarks:
+
+    load       cold TripAI index load from the binary snapshot
+    search     keyword/BM25 match (names, typos, field terms)
+    semantic   vector top-k
+    suggest    autocomplete prefixes
+    nearby     10 nearest destinations to a random point (geo index)
+    slug       get_destination_by_slug, media fetched from the stand-in
+    trips      generate_trips end to end (itinerary + media via stand-ins)
+    import     Excel-shaped DataFrame -> destinations JSON (import_master)
+
+`--save` stores the results in benchmarks/baselines/micro.json; `--compare`
+reports the change against it and exits 1 on regressions.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+from common import add_baseline_args, finish, summarize
+from synthetic import ensure_dataset, generate_sheet, parse_size, size_label
+
+from devservers import OpenAIStandIn, PexelsStandIn
+
+
+def _configure_env(pexels_url: str, openai_url: str):
+    # Must happen before ai_service is imported: it reads keys at import time.
+    os.environ.update({
+        "PEXELS_API_KEY": "bench",
+        "PEXELS_API_BASE": pexels_url,
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{openai_url}/v1",
+        "GROK_API_KEY": "",
+        "PEXELS_CACHE_BACKEND": "memory",
+        "ITINERARY_CACHE_BACKEND": "memory",
+        "CATALOGUE_RELOAD_INTERVAL": "0",
+    })
+
+
+def _queries(catalogue, rng: random.Random, count: int) -> list:
+    """A mix of name, typo, field-term and descriptive queries drawn from the catalogue."""
+    queries = []
+    for _ in range(count):
+        row = rng.randrange(len(catalogue))
+        name = catalogue.names[row]
+        kind = rng.randrange(4)
+        if kind == 0:
+            queries.append(f"{name} trip")
+        elif kind == 1 and len(name) > 5:
+            cut = rng.randrange(1, len(name) - 1)
+            queries.append(name[:cut] + name[cut + 1:])
+        elif kind == 2:
+            queries.append(f"{catalogue.types[row]} in {catalogue.states[row]}")
+        else:
+            queries.append(f"weekend with {catalogue.famous_for[row].split(',')[0]}")
+    return queries
+
+
+def _time(fn, inputs: list, warmup: bool = True) -> dict:
+    if warmup and inputs:
+        fn(inputs[0])  # first-call costs (lazy imports, client construction) aren't steady state
+    timings = []
+    start = time.perf_counter()
+    for value in inputs:
+        t0 = time.perf_counter()
+        fn(value)
+        timings.append(time.perf_counter() - t0)
+    return summarize(timings, time.perf_counter() - start)
+
+
+def bench_size(size: int, iterations: int, import_repeat: int) -> dict:
+    import ai_service
+    from ai_service import TripAI
+    from import_master import transform, write_destinations
+    from media_cache import create_media_cache
+
+    json_path, snapshot_path = ensure_dataset(size)
+    rng = random.Random(size)
+    results = {}
+
+    def fresh_service() -> TripAI:
+        service = TripAI()
+        service.json_path, service.snapshot_path = json_path, snapshot_path
+        return service
+
+    load_times = []
+    for _ in range(3):
+        service = fresh_service()
+        t0 = time.perf_counter()
+        service.indexes
+        load_times.append(time.perf_counter() - t0)
+    results["load"] = summarize(load_times)
+
+    indexes = service.indexes
+    catalogue = indexes["catalogue"]
+    queries = _queries(catalogue, rng, iterations)
+    results["search"] = _time(lambda q: indexes["search_index"].match(q, limit=6), queries)
+    results["semantic"] = _time(lambda q: indexes["semantic_index"].search(q, 6), queries)
+
+    prefixes = [catalogue.names[rng.randrange(len(catalogue))][:rng.randint(1, 5)] for _ in range(iterations)]
+    results["suggest"] = _time(service.get_suggestions, prefixes)
+
+    points = [(rng.uniform(8.0, 34.0), rng.uniform(68.5, 97.0)) for _ in range(iterations)]
+    results["nearby"] = _time(lambda point: service.nearby_destinations(*point, k=10), points)
+
+    # Cold media cache per size, so every slug reaches the Pexels stand-in once.
+    ai_service.media_cache = create_media_cache()
+    slugs = [catalogue.slugs[rng.randrange(len(catalogue))] for _ in range(iterations)]
+    results["slug"] = _time(service.get_destination_by_slug, slugs)
+
+    results["trips"] = _time(service.generate_trips, queries[: max(1, iterations // 5)])
+
+    sheet = generate_sheet(size)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "destinations.json")
+        results["import"] = _time(lambda _: write_destinations(transform(sheet).to_dict("records"), out),
+                                  range(import_repeat), warmup=False)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backend micro-benchmarks.")
+    parser.add_argument("--sizes", default="1k,10k,100k")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--import-repeat", type=int, default=3)
+    parser.add_argument("--pexels-latency", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    add_baseline_args(parser)
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    with PexelsStandIn(latency=args.pexels_latency) as pexels, OpenAIStandIn(latency=args.llm_latency) as openai:
+        _configure_env(pexels.url, openai.url)
+        results = {}
+        for size in sizes:
+            print(f"Benchmarking {size_label(size)} destinations...", file=sys.stderr)
+            results[size_label(size)] = bench_size(size, args.iterations, args.import_repeat)
+
+    params = {k: getattr(args, k) for k in ("sizes", "iterations", "pexels_latency", "llm_latency")}
+    return finish("micro", results, args, params)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Cold-start benchmark: fresh interpreter -> `import main` -> first response.
+
+    python benchmarks/startup.py [--runs 5]
+
+Each run starts a new Python process with external API keys blanked, imports
+the FastAPI app, and times the first /api/destinations/suggest and /search
+responses. Runs once with the binary catalogue snapshot and once with it
+disabled (CATALOGUE_SNAPSHOT=0) so the two load paths can be compared.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(main.app)
+t2 = time.perf_counter()
+client.get("/api/destinations/suggest", params={"q": "ja"})
+t3 = time.perf_counter()
+client.post("/search", json={"query": "weekend trip"})
+t4 = time.perf_counter()
+print(json.dumps({"import_main": t1 - t0, "first_suggest": t3 - t2, "first_search": t4 - t3}))
+"""
+
+
+def run_once(snapshot: bool) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "CATALOGUE_SNAPSHOT": "1" if snapshot else "0",
+        "OPENAI_API_KEY": "",
+        "GROK_API_KEY": "",
+        "PEXELS_API_KEY": "",
+        "ITINERARY_CACHE_BACKEND": "memory",
+    })
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    total = time.perf_counter() - start
+    timings = json.loads(out.stdout.strip().splitlines()[-1])
+    timings["process_to_first_response"] = total
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the backend.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for label, snapshot in (("snapshot", True), ("json", False)):
+        runs = [run_once(snapshot) for _ in range(args.runs)]
+        results[label] = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+
+    print(f"{'metric':<28}" + "".join(f"{label:>12}" for label in results))
+    for key in results["snapshot"]:
+        print(f"{key:<28}" + "".join(f"{results[label][key] * 1000:>10.1f}ms" for label in results))
+    return results
+
+
+if __name__ == "__main__":
+    main()
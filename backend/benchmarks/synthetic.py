@@ -0,0 +1,171 @@
+"""
+Synthetic destination catalogues for benchmarks.
+
+    python benchmarks/synthetic.py 10k [--output data.json] [--seed 7]
+
+Records have the destinations.json shape with realistic field lengths and
+vocabulary (states, trip types, attractions), so index sizes and query costs
+scale like the real catalogue. `ensure_dataset(size)` caches a generated
+catalogue plus its binary snapshot under benchmarks/.data/.
+"""
+import os
+import sys
+import json
+import pickle
+import random
+import struct
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+# Bump when the record shape changes so cached datasets are regenerated.
+GENERATOR_VERSION = 3
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+STATES = [
+    "Rajasthan", "Goa", "Kerala", "Himachal Pradesh", "Uttarakhand", "Jammu And Kashmir", "Ladakh",
+    "Karnataka", "Tamil Nadu", "Maharashtra", "Gujarat", "Madhya Pradesh", "Uttar Pradesh", "Punjab",
+    "West Bengal", "Sikkim", "Assam", "Meghalaya", "Odisha", "Andhra Pradesh",
+]
+TYPES = ["Beach", "Hill Station", "Heritage", "Wildlife", "Pilgrimage", "Adventure", "Lake", "Desert",
+         "City", "Backwaters", "Trekking", "Spiritual"]
+FEATURES = [
+    "forts", "palaces", "lakes", "temples", "trekking trails", "sandy beaches", "tea gardens",
+    "wildlife safaris", "houseboats", "snow peaks", "caves", "waterfalls", "street food", "bazaars",
+    "monasteries", "camel rides", "river rafting", "paragliding", "sunset points", "colonial churches",
+    "spice plantations", "hot springs", "stepwells", "bird sanctuaries", "cliff views", "night markets",
+]
+WAYPOINTS = ["Old Fort", "Lake Promenade", "Main Beach", "Sunset Point", "Mall Road", "Viewpoint",
+             "City Center", "Local Market", "Temple Complex", "Heritage Walk", "Nature Trail", "Museum"]
+BEST_TIMES = ["October to March", "March to June", "September to March", "All year"]
+DURATIONS = ["2 Days", "3 Days", "4 Days", "5 Days"]
+SYLLABLES = ["ra", "ja", "pur", "ga", "nee", "tal", "ko", "shi", "man", "dar", "ali", "bad", "kot",
+             "ner", "va", "lo", "nag", "gar", "hi", "mu", "sar", "pa", "ban", "del", "chi", "mor"]
+
+
+def parse_size(text: str) -> int:
+    """'10k' -> 10000, '1m' -> 1000000, '250' -> 250."""
+    text = str(text).strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def size_label(size: int) -> str:
+    return f"{size // 1000}k" if size >= 1000 and size % 1000 == 0 else str(size)
+
+
+def _name(rng: random.Random, used: set) -> str:
+    while True:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        if rng.random() < 0.2:
+            name += " " + rng.choice(["Hills", "Beach", "Valley", "Nagar", "Kund", "Ghat"])
+        if name.lower() not in used:
+            used.add(name.lower())
+            return name
+
+
+def generate_destinations(size: int, seed: int = 7) -> list:
+    """`size` records in the destinations.json shape, deterministic for a seed."""
+    rng = random.Random(seed)
+    used = set()
+    records = []
+    for i in range(size):
+        name = _name(rng, used)
+        state = rng.choice(STATES)
+        trip_type = rng.choice(TYPES)
+        features = rng.sample(FEATURES, 3)
+        best_time, duration, suitable = rng.choice(BEST_TIMES), rng.choice(DURATIONS), rng.choice(["Yes", "No"])
+        price = rng.randrange(3000, 40000, 250)
+        records.append({
+            "id": i + 1,
+            "slug": name.lower().replace(" ", "-"),
+            "Destination": name,
+            "State / UT": state,
+            "Type": trip_type,
+            "Famous For": ", ".join(features[:2]),
+            "Short Description": (
+                f"{name} is a {trip_type.lower()} destination in {state}, known for its {features[0]}, "
+                f"{features[1]} and {features[2]}. It is suitable for family, couple and solo travelers "
+                f"and serves as a base to explore nearby attractions."
+            ),
+            "Best Time to Visit": best_time,
+            "Ideal Duration": duration,
+            "Suitable For": suitable,
+            "Price": f"₹{price}",
+            "price_inr": price,
+            "waypoints": rng.sample(WAYPOINTS, rng.randint(2, 4)),
+            "distance_from_delhi": rng.randint(50, 3000),
+            "weekend_score": round(rng.uniform(1, 10), 1) if rng.random() > 0.1 else None,
+            # Anywhere in India's bounding box.
+            "lat": round(rng.uniform(8.0, 34.0), 4),
+            "lon": round(rng.uniform(68.5, 97.0), 4),
+        })
+    return records
+
+
+def generate_sheet(size: int, seed: int = 7):
+    """The same catalogue as a master_destination.xlsx-shaped DataFrame (for import benchmarks)."""
+    import pandas as pd
+
+    records = generate_destinations(size, seed)
+    return pd.DataFrame({
+        "City": [r["Destination"] for r in records],
+        "State/UT": [r["State / UT"] for r in records],
+        "Destination Point": [", ".join(r["waypoints"]) for r in records],
+        "Long Description": [r["Short Description"] for r in records],
+        "Category": [r["Type"] for r in records],
+        "Estimated Cost (₹)": [r["price_inr"] for r in records],
+        "Distance from Delhi (km)": [r["distance_from_delhi"] for r in records],
+        "Travel Time (hrs)": [round(r["distance_from_delhi"] / 60, 1) for r in records],
+        "Weekend Friendly": [r["Suitable For"] for r in records],
+        "Weekend Score": [r["weekend_score"] for r in records],
+    })
+
+
+def write_json(records: list, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"destinations": records}, separators=(",", ":")))
+
+
+def ensure_dataset(size: int, seed: int = 7) -> tuple:
+    """
+    (json_path, snapshot_path) for a cached synthetic catalogue. The snapshot
+    is rebuilt whenever it no longer matches the JSON or the index code.
+    """
+    from catalogue import Catalogue
+    from snapshot import SnapshotError, build_indexes, file_sha1, read_snapshot, write_snapshot
+
+    base = os.path.join(DATA_DIR, f"destinations-{size_label(size)}-s{seed}-v{GENERATOR_VERSION}")
+    json_path, snapshot_path = base + ".json", base + ".snapshot"
+    if not os.path.exists(json_path):
+        print(f"Generating {size} synthetic destinations...", file=sys.stderr)
+        write_json(generate_destinations(size, seed), json_path)
+    source = file_sha1(json_path)
+    try:
+        read_snapshot(snapshot_path, source)
+    except (SnapshotError, KeyError, pickle.UnpicklingError, struct.error):
+        print(f"Building snapshot for {size} destinations...", file=sys.stderr)
+        write_snapshot(build_indexes(Catalogue.from_json(json_path)), snapshot_path, source)
+    return json_path, snapshot_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic destinations.json.")
+    parser.add_argument("size", help="number of destinations, e.g. 1k, 10k, 100k")
+    parser.add_argument("--output", help="defaults to the cached dataset under benchmarks/.data/")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    size = parse_size(args.size)
+    if args.output:
+        write_json(generate_destinations(size, args.seed), args.output)
+        print(args.output)
+    else:
+        print(ensure_dataset(size, args.seed)[0])
+
+
+if __name__ == "__main__":
+    main()
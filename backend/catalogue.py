@@ -0,0 +1,130 @@
+import sys
+import json
+import math
+
+import numpy as np
+
+# (record field, column attribute, kind). Kinds:
+#   text      free text, stored as-is
+#   category  low-cardinality text, interned so repeated values share one object
+#   int       small integer ids
+#   number    float64 numpy array, NaN for missing
+#   list      list of strings
+COLUMNS = (
+    ("id", "ids", "int"),
+    ("slug", "slugs", "text"),
+    ("Destination", "names", "text"),
+    ("State / UT", "states", "category"),
+    ("Type", "types", "category"),
+    ("Famous For", "famous_for", "text"),
+    ("Short Description", "descriptions", "text"),
+    ("Best Time to Visit", "best_times", "category"),
+    ("Ideal Duration", "durations", "category"),
+    ("Suitable For", "suitable_for", "category"),
+    ("Price", "prices", "text"),
+    ("price_inr", "price_amounts", "number"),
+    ("waypoints", "waypoints", "list"),
+    ("distance_from_delhi", "distances", "number"),
+    ("weekend_score", "weekend_scores", "number"),
+    ("lat", "latitudes", "number"),
+    ("lon", "longitudes", "number"),
+)
+
+FIELD_TO_ATTR = {field: attr for field, attr, _ in COLUMNS}
+
+
+def _number(value) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return number
+
+
+def _category(value):
+    text = _text(value)
+    return sys.intern(text) if text is not None else None
+
+
+def _text(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return str(value)
+
+
+class Catalogue:
+    """
+    Column-oriented, read-only destination catalogue.
+
+    Each field is one list (or numpy array for numeric fields) indexed by
+    row, instead of one dict per destination. Categorical values are
+    interned, names are pre-lowered for matching, and slug/id lookups are
+    dicts built once. `record(row)` rebuilds the public dict shape.
+    """
+
+    __slots__ = tuple(attr for _, attr, _ in COLUMNS) + ("names_lower", "by_slug", "by_id", "size")
+
+    def __init__(self, records: list):
+        self.size = len(records)
+        for field, attr, kind in COLUMNS:
+            values = [r.get(field) for r in records]
+            if kind == "number":
+                column = np.array([_number(v) for v in values], dtype=np.float64)
+            elif kind == "int":
+                column = [int(v) if _text(v) is not None else None for v in values]
+            elif kind == "list":
+                column = [list(v) if isinstance(v, (list, tuple)) else [] for v in values]
+            elif kind == "category":
+                column = [_category(v) for v in values]
+            else:
+                column = [_text(v) for v in values]
+            setattr(self, attr, column)
+
+        self.names_lower = [name.lower() if name else "" for name in self.names]
+
+        # Constant-time lookups for the detail page; first record wins on duplicates.
+        self.by_slug = {}
+        self.by_id = {}
+        for row in range(self.size):
+            if self.slugs[row]:
+                self.by_slug.setdefault(self.slugs[row], row)
+            if self.ids[row] is not None:
+                self.by_id.setdefault(self.ids[row], row)
+
+    @classmethod
+    def from_json(cls, path: str) -> "Catalogue":
+        """Load {"destinations": [...]} JSON, or one record per line for .ndjson/.jsonl."""
+        with open(path, "r", encoding="utf-8") as f:
+            if path.lower().endswith((".ndjson", ".jsonl")):
+                return cls([json.loads(line) for line in f if line.strip()])
+            data = json.load(f)
+        return cls(data.get("destinations", []))
+
+    def __len__(self):
+        return self.size
+
+    def column(self, field: str):
+        """The column for a record field name, e.g. column("State / UT")."""
+        return getattr(self, FIELD_TO_ATTR[field])
+
+    def get(self, row: int, field: str, default=None):
+        value = self.column(field)[row]
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return default
+        return value
+
+    def record(self, row: int) -> dict:
+        """A fresh dict in the destinations.json shape (NaN numbers become None)."""
+        record = {}
+        for field, attr, kind in COLUMNS:
+            value = getattr(self, attr)[row]
+            if kind == "number":
+                value = None if math.isnan(value) else (int(value) if value.is_integer() else float(value))
+            elif kind == "list":
+                value = list(value)
+            record[field] = value
+        return record
+
+    def text(self, row: int, fields) -> str:
+        """Space-joined values of `fields` for one row."""
+        return " ".join(str(self.get(row, field, "")) for field in fields)
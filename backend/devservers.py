@@ -0,0 +1,261 @@
+"""
+Local stand-ins for the external APIs the backend calls.
+
+Run one and point the backend at it, e.g.
+
+    python devservers.py pexels --port 8765
+    PEXELS_API_BASE=http://127.0.0.1:8765 PEXELS_API_KEY=dev uvicorn main:app
+
+    python devservers.py openai --port 8766
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=dev uvicorn main:app
+"""
+import sys
+import re
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connection bursts (a media batch opens a
+    # dozen at once), and each dropped SYN costs a 1s retransmit.
+    request_queue_size = 128
+
+
+class StandInServer:
+    """Threaded HTTP server on a background thread; use as a context manager."""
+
+    handler_class = None
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, stream_delay: float = 0.0):
+        self.latency = latency
+        self.stream_delay = stream_delay
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        server = self
+
+        class Handler(self.handler_class):
+            stand_in = server
+
+        self.httpd = _StandInHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self):
+        with self._count_lock:
+            self.request_count += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    stand_in = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def begin(self):
+        self.stand_in.count()
+        if self.stand_in.latency:
+            time.sleep(self.stand_in.latency)
+
+
+class _PexelsHandler(_JSONHandler):
+    """
+    Serves /v1/search, /v1/curated and /videos/search. A query of "empty"
+    returns no results; "bad headers" comes with malformed X-Ratelimit-* headers.
+    """
+
+    def do_GET(self):
+        self.begin()
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        query = params.get("query", ["curated"])[0]
+        slug = "-".join(query.lower().split()) or "curated"
+        empty = query == "empty"
+        per_page = int(params.get("per_page", ["1"])[0])
+        headers = {"X-Ratelimit-Remaining": str(self.stand_in.ratelimit_remaining)}
+        if query == "bad headers":
+            headers = {"X-Ratelimit-Remaining": "n/a", "X-Ratelimit-Reset": "soon"}
+
+        if url.path in ("/v1/search", "/v1/curated"):
+            photos = [] if empty else [
+                {"src": {"landscape": f"https://images.pexels.test/{slug}-{i}.jpeg"}}
+                for i in range(per_page)
+            ]
+            self.send_json(200, {"photos": photos}, headers)
+        elif url.path == "/videos/search":
+            videos = [] if empty else [
+                {
+                    "id": i + 1,
+                    "width": 1920,
+                    "height": 1080,
+                    "duration": 15,
+                    "user": {"name": "Stand-in", "url": "https://www.pexels.test/@stand-in"},
+                    "video_files": [
+                        {"quality": "sd", "width": 640, "link": f"https://videos.pexels.test/{slug}-{i}-sd.mp4"},
+                        {"quality": "hd", "width": 1920, "link": f"https://videos.pexels.test/{slug}-{i}-hd.mp4"},
+                    ],
+                }
+                for i in range(per_page)
+            ]
+            self.send_json(200, {"videos": videos}, headers)
+        else:
+            self.send_json(404, {"error": "not found"})
+
+
+class PexelsStandIn(StandInServer):
+    handler_class = _PexelsHandler
+    # Reported in X-Ratelimit-Remaining; set it low to exercise quota handling.
+    ratelimit_remaining = 20000
+
+
+def fake_itinerary(prompt: str) -> dict:
+    """A well-formed itinerary sized to the day count requested in `prompt`."""
+    days = re.search(r"(\d+)[- ]day", prompt, re.IGNORECASE) or re.search(r"Duration: (\d+)", prompt)
+    num_days = int(days.group(1)) if days else 3
+    place = re.search(r"trip to ([A-Z][\w ]*?)[,.\n]", prompt)
+    destination = place.group(1).strip() if place else "your destination"
+    return {
+        "header": f"I've curated a bespoke {num_days}-day itinerary for {destination}.",
+        "days": [
+            {
+                "day_label": f"Day {d}",
+                "title": f"{destination} highlights, part {d}",
+                "subtitle": "Stand-in plan.",
+                "morning": [f"08:00 - Breakfast walk in {destination}"],
+                "afternoon": ["Museum visit", "Local lunch"],
+                "evening": ["Sunset point", "Dinner tip"],
+            }
+            for d in range(1, num_days + 1)
+        ],
+        "packing_list": ["Sunscreen", "Walking shoes", "Water bottle"],
+        "footer": "Stand-in concierge closing.",
+        "waypoints": [f"{destination} Center", "Old Market", "Viewpoint"],
+    }
+
+
+class _OpenAIHandler(_JSONHandler):
+    """OpenAI-compatible POST /v1/chat/completions returning `fake_itinerary` JSON."""
+
+    def do_POST(self):
+        self.begin()
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": "not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        content = json.dumps(fake_itinerary(prompt))
+        prompt_tokens = len(prompt.split())
+        completion_tokens = len(content.split())
+
+        if body.get("stream"):
+            self.send_stream(body.get("model", "stand-in"), content)
+            return
+
+        self.send_json(200, {
+            "id": f"chatcmpl-standin-{self.stand_in.request_count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stand-in"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+
+    def send_stream(self, model: str, content: str, chunk_size: int = 24):
+        """Send `content` as chat.completion.chunk SSE frames, `latency` spread across them."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        pieces = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        for n, piece in enumerate(pieces):
+            frame = {
+                "id": f"chatcmpl-standin-{self.stand_in.request_count}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": piece},
+                    "finish_reason": "stop" if n == len(pieces) - 1 else None,
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(frame)}\n\n".encode())
+            self.wfile.flush()
+            if self.stand_in.stream_delay:
+                time.sleep(self.stand_in.stream_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class OpenAIStandIn(StandInServer):
+    handler_class = _OpenAIHandler
+
+
+STAND_INS = {
+    "pexels": PexelsStandIn,
+    "openai": OpenAIStandIn,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("service", choices=sorted(STAND_INS))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--stream-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    args = parser.parse_args(argv)
+
+    server = STAND_INS[args.service](args.host, args.port, args.latency, args.stream_delay)
+    print(f"{args.service} stand-in listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""Structured filters (see FacetIndex.mask) and facet counts over the catalogue."""
+import re
+
+import numpy as np
+
+CATEGORY_FACETS = (("Type", "types"), ("State / UT", "states"))
+RANGE_FACETS = (
+    ("distance_from_delhi", "distances"),
+    ("weekend_score", "weekend_scores"),
+    ("price_inr", "price_amounts"),
+)
+MONTH_FACET = "month"
+RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+
+MONTHS = ("January", "February", "March", "April", "May", "June", "July",
+          "August", "September", "October", "November", "December")
+_MONTH_NUMBERS = {name.lower(): i for i, name in enumerate(MONTHS)}
+_MONTH_NUMBERS.update({name[:3].lower(): i for i, name in enumerate(MONTHS)})
+_MONTH_NUMBERS["sept"] = 8
+_ALL_YEAR = re.compile(r"all\s*(the\s*)?year|year[\s-]*round|any\s*time|throughout", re.I)
+_MONTH_WORD = r"(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|" \
+              r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+
+
+def months_in(text) -> list:
+    """
+    Month numbers (0-11) covered by a "Best Time to Visit" value:
+    "October to March" wraps the year end, "All year" covers every month,
+    and lists like "March, April" cover just those months.
+    """
+    if not text:
+        return []
+    if _ALL_YEAR.search(text):
+        return list(range(12))
+    found = [_MONTH_NUMBERS[m.lower()] for m in re.findall(r"\b" + _MONTH_WORD + r"\b", text, re.I)]
+    if len(found) == 2 and re.search(r"\bto\b|-|–|until|till", text, re.I):
+        start, end = found
+        return [(start + i) % 12 for i in range((end - start) % 12 + 1)]
+    return sorted(set(found))
+
+
+def _range_mask(sorted_values: np.ndarray, order: np.ndarray, size: int, bounds: dict) -> np.ndarray:
+    """Rows whose value satisfies every bound, via binary search on the sorted column."""
+    low, high = 0, len(sorted_values)
+    if "gte" in bounds:
+        low = max(low, int(np.searchsorted(sorted_values, bounds["gte"], side="left")))
+    if "gt" in bounds:
+        low = max(low, int(np.searchsorted(sorted_values, bounds["gt"], side="right")))
+    if "lte" in bounds:
+        high = min(high, int(np.searchsorted(sorted_values, bounds["lte"], side="right")))
+    if "lt" in bounds:
+        high = min(high, int(np.searchsorted(sorted_values, bounds["lt"], side="left")))
+    mask = np.zeros(size, dtype=bool)
+    if low < high:
+        mask[order[low:high]] = True
+    return mask
+
+
+class FacetIndex:
+    """
+    Bitmaps and sorted numeric columns for filtering, built once at load time.
+
+    Category values are matched case-insensitively. Missing numbers are left
+    out of the sorted arrays, so a destination without a distance never
+    matches a distance filter.
+    """
+
+    def __init__(self, catalogue):
+        self.size = len(catalogue)
+
+        # field -> (values, codes per row, one bitmap per value)
+        self.categories = {}
+        for field, attr in CATEGORY_FACETS:
+            values = sorted({v for v in getattr(catalogue, attr) if v})
+            lookup = {value: code for code, value in enumerate(values)}
+            codes = np.array([lookup.get(v, -1) for v in getattr(catalogue, attr)], dtype=np.int32)
+            bitmaps = [codes == code for code in range(len(values))]
+            self.categories[field] = (values, codes, bitmaps)
+
+        # One bitmap per month, from each distinct "Best Time to Visit" value.
+        by_text = {}
+        for row, text in enumerate(catalogue.best_times):
+            by_text.setdefault(text, []).append(row)
+        self.months = np.zeros((12, self.size), dtype=bool)
+        for text, rows in by_text.items():
+            covered = months_in(text)
+            if covered:
+                self.months[np.ix_(covered, rows)] = True
+
+        # field -> (sorted values without NaN, row ids in that order)
+        self.ranges = {}
+        for field, attr in RANGE_FACETS:
+            column = np.asarray(getattr(catalogue, attr), dtype=np.float64)
+            present = np.flatnonzero(~np.isnan(column))
+            order = present[np.argsort(column[present], kind="stable")]
+            self.ranges[field] = (column[order], order)
+
+    def mask(self, filters: dict):
+        """
+        Boolean row mask for `filters`, or None if there are none:
+
+            {
+                "Type": ["Beach"],                       # category facets: any of the values
+                "State / UT": ["Goa", "Kerala"],
+                "month": ["November"],                   # visitable in any of the months
+                "distance_from_delhi": {"lte": 500},     # numeric ranges: gt/gte/lt/lte
+                "weekend_score": {"gt": 7},
+                "price_inr": {"lte": 10000},
+            }
+        """
+        mask = None
+
+        def narrow(selected):
+            nonlocal mask
+            mask = selected if mask is None else mask & selected
+
+        for field, (values, _, bitmaps) in self.categories.items():
+            wanted = filters.get(field)
+            if not wanted:
+                continue
+            wanted = {str(v).lower() for v in wanted}
+            selected = np.zeros(self.size, dtype=bool)
+            for value, bitmap in zip(values, bitmaps):
+                if value.lower() in wanted:
+                    selected |= bitmap
+            narrow(selected)
+
+        months = filters.get(MONTH_FACET)
+        if months:
+            numbers = sorted({_MONTH_NUMBERS[str(m).lower()] for m in months if str(m).lower() in _MONTH_NUMBERS})
+            narrow(self.months[numbers].any(axis=0) if numbers else np.zeros(self.size, dtype=bool))
+
+        for field, (sorted_values, order) in self.ranges.items():
+            bounds = filters.get(field)
+            if bounds:
+                narrow(_range_mask(sorted_values, order, self.size, bounds))
+        return mask
+
+    def counts(self, rows) -> dict:
+        """
+        Facet counts over `rows` (doc ids or a boolean mask): destinations per
+        category value and per month, most frequent first, plus min/max of
+        each numeric column.
+        """
+        rows = np.asarray(rows)
+        if rows.dtype != bool:
+            selected = np.zeros(self.size, dtype=bool)
+            selected[rows.astype(np.int64)] = True
+            rows = selected
+
+        facets = {}
+        for field, (values, codes, _) in self.categories.items():
+            picked = codes[rows]
+            counts = np.bincount(picked[picked >= 0], minlength=len(values))
+            nonzero = np.flatnonzero(counts)
+            nonzero = nonzero[np.argsort(-counts[nonzero], kind="stable")]
+            facets[field] = {values[i]: int(counts[i]) for i in nonzero}
+
+        month_counts = np.count_nonzero(self.months & rows, axis=1)
+        facets[MONTH_FACET] = {MONTHS[i]: int(n) for i, n in enumerate(month_counts) if n}
+
+        for field, (sorted_values, order) in self.ranges.items():
+            present = sorted_values[rows[order]]
+            facets[field] = (
+                {"min": _plain(present[0]), "max": _plain(present[-1])} if len(present) else None
+            )
+        return facets
+
+
+def _plain(value: float):
+    return int(value) if float(value).is_integer() else float(value)
+
+
+# Free-text filters. Each pattern's match is removed from the query text.
+_NUMBER = r"(\d+(?:[.,]\d+)*)\s*(k\b)?"
+_CURRENCY = r"(?:₹|(?<!\w)(?:rs|inr)(?![a-z])\.?)"
+_LESS = r"(?:within|under|below|less than|up\s*to|upto|max(?:imum)?|at most|<=?)"
+_MORE = r"(?:over|above|more than|beyond|at least|min(?:imum)?|>=?)"
+_OPERATORS = {
+    "<": "lt", "<=": "lte", ">": "gt", ">=": "gte", "=": "gte",
+    "above": "gt", "over": "gt", "more than": "gt", "below": "lt", "under": "lt", "less than": "lt",
+    "at least": "gte", "min": "gte", "minimum": "gte", "at most": "lte", "max": "lte", "maximum": "lte",
+}
+
+_COMPARE = rf"(?<!\w)(?:({_LESS})|({_MORE}))"
+
+_DISTANCE = re.compile(rf"{_COMPARE}\s*{_NUMBER}\s*(?:km|kms|kilomet(?:er|re)s?)\b", re.I)
+_PRICE = re.compile(
+    rf"(?:\b(?:price|cost|budget)\s*(?:of\s*)?)?(?:{_COMPARE})?\s*{_CURRENCY}\s*{_NUMBER}"
+    rf"|\b(?:price|cost|budget)\s*(?:of\s*)?(?:{_COMPARE})?\s*{_NUMBER}", re.I)
+# "score > 7", "rating at least 8", "score 8+"; a bare "rated 5" or "rating 5 day" is not a filter.
+_SCORE = re.compile(
+    r"\b(?:weekend\s+)?(?:score|rating)\s*"
+    r"(>=|<=|>|<|=|above|over|more than|below|under|less than|at least|at most|min(?:imum)?|max(?:imum)?)?"
+    r"\s*(\d+(?:\.\d+)?)\s*(\+)?", re.I)
+_MONTH = re.compile(rf"\b(?:(?:visitable|visit|go|travel)\s+)?(?:in|during)\s+{_MONTH_WORD}\b", re.I)
+
+
+def _amount(number: str, thousands: str) -> float:
+    value = float(number.replace(",", ""))
+    return value * 1000 if thousands else value
+
+
+def parse_query(query: str) -> tuple:
+    """
+    Split free text into (remaining text, filters):
+
+        "beach within 500 km in november" -> ("beach", {"distance_from_delhi": {"lte": 500},
+                                                        "month": ["November"]})
+    """
+    filters = {}
+    text = query or ""
+
+    def take(pattern, handle):
+        nonlocal text
+        text = pattern.sub(lambda m: "" if handle(m) else m.group(0), text)
+
+    def distance(m):
+        less, _, number, thousands = m.groups()
+        op = "lte" if less else "gte"
+        filters.setdefault("distance_from_delhi", {})[op] = _amount(number, thousands)
+        return True
+
+    def price(m):
+        _, more1, number1, k1, _, more2, number2, k2 = m.groups()
+        number, thousands = (number1, k1) if number1 else (number2, k2)
+        op = "gte" if more1 or more2 else "lte"   # "budget ₹8000" means at most
+        filters.setdefault("price_inr", {})[op] = _amount(number, thousands)
+        return True
+
+    def score(m):
+        word, number, plus = m.groups()
+        op = _OPERATORS.get(word.lower()) if word else "gte" if plus else None
+        if op is None:
+            return False
+        filters.setdefault("weekend_score", {})[op] = float(number)
+        return True
+
+    def month(m):
+        name = MONTHS[_MONTH_NUMBERS[m.group(1).lower()]]
+        filters.setdefault(MONTH_FACET, [])
+        if name not in filters[MONTH_FACET]:
+            filters[MONTH_FACET].append(name)
+        return True
+
+    take(_DISTANCE, distance)
+    take(_PRICE, price)
+    take(_SCORE, score)
+    take(_MONTH, month)
+    return " ".join(text.split()), filters
+
+
+def _bounds(value: dict) -> dict:
+    bounds = {}
+    for op, bound in value.items():
+        if op not in RANGE_OPERATORS or bound is None:
+            continue
+        try:
+            bounds[op] = float(bound)
+        except (TypeError, ValueError):
+            continue
+    return bounds
+
+
+def merge_filters(*sources) -> dict:
+    """
+    Combine filter dicts, dropping empty values and unknown range operators;
+    later sources win for the same range operator or category.
+    """
+    merged = {}
+    for source in sources:
+        for field, value in (source or {}).items():
+            if isinstance(value, dict):
+                bounds = _bounds(value)
+                if bounds:
+                    merged.setdefault(field, {}).update(bounds)
+            elif isinstance(value, (str, list, tuple)):
+                values = [value] if isinstance(value, str) else [str(v) for v in value if v not in (None, "")]
+                if values and values != [""]:
+                    merged[field] = values
+    return merged
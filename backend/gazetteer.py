@@ -0,0 +1,72 @@
+import os
+import re
+import csv
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_GAZETTEER_PATH = os.path.join(BASE_DIR, "data", "gazetteer.csv")
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def place_key(name) -> str:
+    """"Mount  Abu", "mount-abu" -> "mount abu"."""
+    return _NON_WORD.sub(" ", str(name or "").lower()).strip()
+
+
+class Gazetteer:
+    """
+    Offline lookup of Indian cities and destinations to coordinates, from the
+    bundled data/gazetteer.csv (name, state, lat, lon, ";"-separated aliases).
+    Names and aliases are matched case- and punctuation-insensitively; a
+    state narrows ambiguous names.
+    """
+
+    def __init__(self, places: list):
+        self.places = places
+        self._by_key = {}
+        for place in places:
+            for name in [place["name"], *place["aliases"]]:
+                self._by_key.setdefault(place_key(name), []).append(place)
+
+    @classmethod
+    def from_csv(cls, path: str = DEFAULT_GAZETTEER_PATH) -> "Gazetteer":
+        places = []
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                places.append({
+                    "name": row["name"].strip(),
+                    "state": row["state"].strip(),
+                    "lat": float(row["lat"]),
+                    "lon": float(row["lon"]),
+                    "aliases": [a.strip() for a in (row.get("aliases") or "").split(";") if a.strip()],
+                })
+        return cls(places)
+
+    def __len__(self):
+        return len(self.places)
+
+    def lookup(self, name, state=None) -> dict:
+        """{"name", "state", "lat", "lon"} for a place name, or None if unknown."""
+        matches = self._by_key.get(place_key(name))
+        if not matches:
+            return None
+        if state and len(matches) > 1:
+            wanted = place_key(state)
+            matches = [p for p in matches if place_key(p["state"]) == wanted] or matches
+        place = matches[0]
+        return {"name": place["name"], "state": place["state"], "lat": place["lat"], "lon": place["lon"]}
+
+
+_gazetteer = None
+_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """The bundled gazetteer, read on first use."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer.from_csv(DEFAULT_GAZETTEER_PATH)
+    return _gazetteer
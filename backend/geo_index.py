@@ -0,0 +1,114 @@
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# ~55 km cells: a few hundred km radius touches a few dozen cells.
+DEFAULT_CELL_DEGREES = 0.5
+# Nearest-k starts at this radius and doubles until k destinations are inside.
+_INITIAL_RADIUS_KM = 100.0
+
+# Ranking: proximity decays with distance on this scale and is blended with
+# weekend_score (0-10, missing counts as NEUTRAL_SCORE).
+DISTANCE_SCALE_KM = 300.0
+PROXIMITY_WEIGHT = 0.6
+NEUTRAL_SCORE = 5.0
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to arrays of points."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def nearby_scores(distances: np.ndarray, weekend_scores: np.ndarray) -> np.ndarray:
+    """Higher is better: exp(-distance / scale) blended with weekend_score / 10."""
+    scores = np.where(np.isnan(weekend_scores), NEUTRAL_SCORE, weekend_scores)
+    proximity = np.exp(-distances / DISTANCE_SCALE_KM)
+    return PROXIMITY_WEIGHT * proximity + (1 - PROXIMITY_WEIGHT) * np.clip(scores, 0, 10) / 10
+
+
+def rank_nearby(distances: np.ndarray, weekend_scores: np.ndarray) -> np.ndarray:
+    """Order (indices) by nearby_scores, best first; nearer wins ties."""
+    return np.lexsort((distances, -nearby_scores(distances, weekend_scores)))
+
+
+class GeoIndex:
+    """
+    Grid (geohash-style) spatial index over destination coordinates.
+
+    Destinations with lat/lon are bucketed into `cell_degrees` cells and
+    stored sorted by cell id, with their coordinates in the same order. A
+    radius query binary-searches the cell range of each grid row its bounding
+    box touches and computes exact haversine distances for those candidates
+    only. Destinations without coordinates are not indexed.
+    """
+
+    def __init__(self, catalogue, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.lon_cells = int(math.ceil(360 / cell_degrees))
+        lats = np.asarray(catalogue.latitudes, dtype=np.float64)
+        lons = np.asarray(catalogue.longitudes, dtype=np.float64)
+        rows = np.flatnonzero(~np.isnan(lats) & ~np.isnan(lons))
+        cells = self._cells(lats[rows], lons[rows])
+        order = np.argsort(cells, kind="stable")
+        self.rows = rows[order].astype(np.int64)
+        self.cells = cells[order]
+        self.lats = lats[self.rows]
+        self.lons = lons[self.rows]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _lat_index(self, lat):
+        return np.floor((np.asarray(lat) + 90) / self.cell_degrees).astype(np.int64)
+
+    def _lon_index(self, lon):
+        return np.floor((np.asarray(lon) + 180) / self.cell_degrees).astype(np.int64)
+
+    def _cells(self, lats, lons) -> np.ndarray:
+        return self._lat_index(lats) * self.lon_cells + self._lon_index(lons)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Positions (into the sorted arrays) of every point that may lie within radius_km."""
+        dlat = radius_km / KM_PER_DEGREE
+        max_lat = min(abs(lat) + dlat, 90.0)
+        if max_lat >= 89.0:
+            return np.arange(len(self.rows))
+        dlon = radius_km / (KM_PER_DEGREE * math.cos(math.radians(max_lat)))
+        if lon - dlon < -180 or lon + dlon >= 180:
+            return np.arange(len(self.rows))  # crosses the antimeridian; not worth a special case
+
+        lat_rows = np.arange(int(self._lat_index(max(lat - dlat, -90.0))), int(self._lat_index(lat + dlat)) + 1)
+        first, last = int(self._lon_index(lon - dlon)), int(self._lon_index(lon + dlon))
+        starts = np.searchsorted(self.cells, lat_rows * self.lon_cells + first, side="left")
+        ends = np.searchsorted(self.cells, lat_rows * self.lon_cells + last, side="right")
+        spans = [np.arange(s, e) for s, e in zip(starts, ends) if e > s]
+        return np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> tuple:
+        """(rows, distances_km) of destinations within radius_km, nearest first."""
+        positions = self._candidates(lat, lon, radius_km)
+        distances = haversine_km(lat, lon, self.lats[positions], self.lons[positions])
+        inside = distances <= radius_km
+        positions, distances = positions[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return self.rows[positions[order]], distances[order]
+
+    def nearest(self, lat: float, lon: float, k: int) -> tuple:
+        """(rows, distances_km) of the k nearest destinations, nearest first."""
+        k = min(k, len(self.rows))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        radius = _INITIAL_RADIUS_KM
+        while True:
+            rows, distances = self.within(lat, lon, radius)
+            # Everything within `radius` was examined, so once k points are
+            # inside it they are the k nearest.
+            if len(rows) >= k or radius >= math.pi * EARTH_RADIUS_KM:
+                return rows[:k], distances[:k]
+            radius *= 2
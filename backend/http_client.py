@@ -0,0 +1,179 @@
+import os
+import time
+import asyncio
+import weakref
+import threading
+
+from tracing import observe_upstream
+from upstream import get_limiter
+
+# Read from the environment when the session is first built (after dotenv).
+DEFAULT_PEXELS_API_BASE = "https://api.pexels.com"
+DEFAULT_POOL_SIZE = 16
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF = 0.3
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RateLimitExhausted(Exception):
+    """Raised instead of calling Pexels while the quota window is used up."""
+
+
+class RateLimit:
+    """Tracks the X-Ratelimit-* headers from the most recent Pexels response."""
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self._lock = threading.Lock()
+
+    def update(self, headers):
+        try:
+            remaining = headers.get("X-Ratelimit-Remaining")
+            limit = headers.get("X-Ratelimit-Limit")
+            reset = headers.get("X-Ratelimit-Reset")
+            remaining = int(remaining) if remaining is not None else None
+            limit = int(limit) if limit is not None else None
+            reset = float(reset) if reset is not None else None
+        except (AttributeError, ValueError):
+            # Malformed headers mustn't fail the call that carried them; keep the last values.
+            return
+        with self._lock:
+            if remaining is not None:
+                self.remaining = remaining
+            if limit is not None:
+                self.limit = limit
+            if reset is not None:
+                self.reset_at = reset
+
+    def exhausted(self) -> bool:
+        with self._lock:
+            if self.remaining is None or self.remaining > 0:
+                return False
+            # Without a reset time, let the next call through to refresh the headers.
+            if self.reset_at is None or time.time() >= self.reset_at:
+                self.remaining = None
+                return False
+            return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"limit": self.limit, "remaining": self.remaining, "reset_at": self.reset_at}
+
+
+pexels_rate_limit = RateLimit()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> "requests.Session":
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    pool_size = int(os.getenv("PEXELS_POOL_SIZE", DEFAULT_POOL_SIZE))
+    retry = Retry(
+        total=int(os.getenv("PEXELS_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+        backoff_factor=float(os.getenv("PEXELS_BACKOFF", DEFAULT_BACKOFF)),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+        # Pexels resets hourly/monthly; sleeping for Retry-After would pin a worker.
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.hooks["response"].append(lambda response, *args, **kwargs: pexels_rate_limit.update(response.headers))
+    return session
+
+
+def get_pexels_session() -> "requests.Session":
+    """Module-level keep-alive session shared by every Pexels call."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def pexels_get(path: str, params: dict = None, timeout: float = 5, api_key: str = None) -> "requests.Response":
+    """
+    GET a Pexels API path (e.g. "/v1/search") through the pooled session.
+
+    Retries 429/5xx with exponential backoff and raises RateLimitExhausted
+    without touching the network once X-Ratelimit-Remaining hits zero.
+    """
+    if pexels_rate_limit.exhausted():
+        raise RateLimitExhausted("Pexels rate limit exhausted until reset")
+    base = os.getenv("PEXELS_API_BASE", DEFAULT_PEXELS_API_BASE).rstrip("/")
+    headers = {"Authorization": api_key or os.getenv("PEXELS_API_KEY", "")}
+    started = time.perf_counter()
+    try:
+        response = get_pexels_session().get(f"{base}{path}", headers=headers, params=params, timeout=timeout)
+    except Exception:
+        observe_upstream("pexels", time.perf_counter() - started, "error")
+        raise
+    observe_upstream("pexels", time.perf_counter() - started, response.status_code)
+    return response
+
+
+# One client per event loop: connection pools are bound to their loop.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_pexels_async_client() -> "httpx.AsyncClient":
+    """Keep-alive async client for Pexels, shared by every call on the running loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import httpx
+
+        pool_size = int(os.getenv("PEXELS_POOL_SIZE", DEFAULT_POOL_SIZE))
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            event_hooks={"response": [_update_rate_limit]},
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def _update_rate_limit(response):
+    pexels_rate_limit.update(response.headers)
+
+
+async def pexels_get_async(path: str, params: dict = None, timeout: float = 5,
+                           api_key: str = None) -> "httpx.Response":
+    """
+    Async pexels_get: same retries and rate-limit handling, with each attempt
+    holding a slot of the "pexels" limiter (see upstream.py). Raises
+    UpstreamBusy when the limiter's queue is full.
+    """
+    if pexels_rate_limit.exhausted():
+        raise RateLimitExhausted("Pexels rate limit exhausted until reset")
+    base = os.getenv("PEXELS_API_BASE", DEFAULT_PEXELS_API_BASE).rstrip("/")
+    headers = {"Authorization": api_key or os.getenv("PEXELS_API_KEY", "")}
+    retries = int(os.getenv("PEXELS_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+    backoff = float(os.getenv("PEXELS_BACKOFF", DEFAULT_BACKOFF))
+    client = get_pexels_async_client()
+    limiter = get_limiter("pexels")
+    for attempt in range(retries + 1):
+        async with limiter:
+            started = time.perf_counter()
+            try:
+                response = await client.get(f"{base}{path}", headers=headers, params=params, timeout=timeout)
+            except Exception:
+                observe_upstream("pexels", time.perf_counter() - started, "error")
+                if attempt == retries:
+                    raise
+            else:
+                observe_upstream("pexels", time.perf_counter() - started, response.status_code)
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    return response
+        # Backoff outside the limiter, so a retrying call doesn't hold a slot.
+        await asyncio.sleep(backoff * (2 ** attempt))
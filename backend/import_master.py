@@ -1,101 +1,300 @@
-import pandas as pd
-import json
+"""
+Convert the master destination workbook into data/destinations.json and rebuild its indexes.
+
+    python import_master.py [workbook] [--output data/destinations.json] [--skip-indexes] [--full]
+
+Imports are incremental by slug (only changed records are written to a .delta.json
+and re-indexed); --full forces a clean rebuild.
+"""
 import os
+import json
+import hashlib
+import argparse
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_EXCEL_PATH = os.path.join(BASE_DIR, "..", "frontend", "master_destination.xlsx")
+DEFAULT_JSON_PATH = os.path.join(BASE_DIR, "data", "destinations.json")
+
+DEFAULT_PRICE = "₹5,000 - ₹15,000"
+
+# Best time by state (not in the master sheet): first matching rule wins.
+BEST_TIME_RULES = (
+    ("himachal|uttarakhand|kashmir", "March to June"),
+    ("kerala|goa|south", "September to March"),
+)
+DEFAULT_BEST_TIME = "October to March"
+
+# Fallback waypoints by trip type when the sheet has no "Destination Point".
+WAYPOINT_RULES = (
+    ("beach", ["Main Beach", "Sunset Point"]),
+    ("hill", ["Mall Road", "Viewpoint"]),
+)
+DEFAULT_WAYPOINTS = ["City Center", "Local Market"]
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+def _has_calamine() -> bool:
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def read_workbook(path: str, sheet: str = None) -> pd.DataFrame:
+    """
+    Load the first (or named) sheet as strings/numbers with a stripped header.
+
+    .xlsx files are streamed row by row with openpyxl's read-only reader,
+    which keeps memory flat on large workbooks. If python-calamine is
+    installed its (much faster) parser is used instead; other formats go
+    through pandas.
+    """
+    if path.lower().endswith(".csv"):
+        df = pd.read_csv(path)
+    elif not path.lower().endswith((".xlsx", ".xlsm")) or _has_calamine():
+        engine = "calamine" if _has_calamine() else None
+        df = pd.read_excel(path, sheet_name=sheet or 0, engine=engine)
+    else:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.active
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            width = len(header)
+            data = [row[:width] for row in rows if any(value is not None for value in row)]
+        finally:
+            workbook.close()
+        columns = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+        df = pd.DataFrame.from_records(data, columns=columns)
+    df.columns = [str(c).strip() for c in df.columns]
+    return df
+
+
+def _text(df: pd.DataFrame, *names) -> pd.Series:
+    """First non-blank value across `names` (missing columns are skipped), as str or NaN."""
+    result = pd.Series(np.nan, index=df.index, dtype=object)
+    for name in names:
+        if name not in df:
+            continue
+        column = df[name].astype("string").str.strip()
+        column = column.mask(column.isin(["", "nan", "NaN", "None"]))
+        result = result.fillna(column.astype(object))
+    return result
+
+
+def _number(df: pd.DataFrame, name: str) -> pd.Series:
+    if name not in df:
+        return pd.Series(np.nan, index=df.index, dtype=np.float64)
+    return pd.to_numeric(df[name], errors="coerce").astype(np.float64)
+
+
+def _json_number(values: pd.Series) -> pd.Series:
+    """Float column -> object column of int/float/None (JSON has no NaN)."""
+    out = values.astype(object).where(values.notna(), None)
+    integral = values.notna() & (values % 1 == 0)
+    out[integral] = values[integral].astype(np.int64).astype(object)
+    return out
+
+
+def _rule_select(text: pd.Series, rules, default):
+    """Value of the first rule whose regex matches `text`, else default."""
+    conditions = [text.str.contains(pattern, regex=True, na=False) for pattern, _ in rules]
+    keys = np.select(conditions, list(range(len(rules))), default=-1)
+    values = [value for _, value in rules]
+    return [values[k] if k >= 0 else default for k in keys]
 
-def import_master_excel():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    excel_path = os.path.join(base_dir, "..", "frontend", "master_destination.xlsx")
-    json_path = os.path.join(base_dir, "data", "destinations.json")
-    
+
+def _prices(df: pd.DataFrame) -> tuple:
+    """(display price, numeric price in ₹ or NaN) per row."""
+    raw = _text(df, "Estimated Cost (₹)")
+    numeric = pd.to_numeric(raw.str.replace(r"[₹,\s]|rs\.?|inr", "", case=False, regex=True), errors="coerce")
+    integral = numeric.notna() & (numeric % 1 == 0)
+    text = raw.copy()
+    text[integral] = numeric[integral].astype(np.int64).astype(str)
+    display = ("₹" + text.str.lstrip("₹")).where(raw.notna() & (numeric != 0), DEFAULT_PRICE)
+    return display, numeric.where(numeric > 0).astype(np.float64)
+
+
+def _coordinates(df: pd.DataFrame, city: pd.Series, state: pd.Series) -> tuple:
+    """
+    (lat, lon) per row: the sheet's Latitude/Longitude columns when filled,
+    otherwise looked up by city (and state) in the bundled gazetteer.
+    """
+    from gazetteer import get_gazetteer
+
+    gazetteer = get_gazetteer()
+    places = {key: gazetteer.lookup(*key) for key in set(zip(city, state.fillna("")))}
+    found = [places[key] for key in zip(city, state.fillna(""))]
+    lat = pd.Series([p["lat"] if p else np.nan for p in found], index=df.index, dtype=np.float64)
+    lon = pd.Series([p["lon"] if p else np.nan for p in found], index=df.index, dtype=np.float64)
+    sheet_lat, sheet_lon = _number(df, "Latitude"), _number(df, "Longitude")
+    given = sheet_lat.notna() & sheet_lon.notna()
+    return sheet_lat.where(given, lat), sheet_lon.where(given, lon)
+
+
+def _waypoints(points: pd.Series, trip_type: pd.Series) -> list:
+    """"A, B, C" -> [A, B, C]; a single point gets "City Center"; otherwise by trip type."""
+    listed = points.str.split(",").map(lambda parts: [p.strip() for p in parts], na_action="ignore")
+    single = points.map(lambda point: [point, "City Center"], na_action="ignore")
+    chosen = listed.where(points.str.contains(",", regex=False, na=False), single)
+    fallback = _rule_select(trip_type.str.lower(), WAYPOINT_RULES, DEFAULT_WAYPOINTS)
+    return [w if isinstance(w, list) else list(f) for w, f in zip(chosen, fallback)]
+
+
+def transform(df: pd.DataFrame, previous_ids: dict = None) -> pd.DataFrame:
+    """
+    Master sheet rows -> destination records (one row per unique slug).
+    Slugs in `previous_ids` keep their id; new slugs are numbered after them.
+    """
+    city = _text(df, "City", "Destination")
+    df = df[city.notna()]
+    city = city[city.notna()]
+
+    slug = city.str.lower().str.replace(" ", "-", regex=False)
+    keep = ~slug.duplicated(keep="first")
+    df, city, slug = df[keep], city[keep], slug[keep]
+
+    state = _text(df, "State/UT", "State")
+    trip_type = _text(df, "Category", "Type").fillna("Leisure")
+    points = _text(df, "Destination Point")
+
+    out = pd.DataFrame(index=df.index)
+    ids = slug.map(previous_ids or {})
+    new = ids.isna()
+    start = max(previous_ids.values(), default=0) + 1 if previous_ids else 1
+    ids[new] = np.arange(start, start + int(new.sum()))
+    out["id"] = ids.astype(np.int64)
+    out["slug"] = slug
+    out["Destination"] = city.str.title()
+    out["State / UT"] = state.str.title().fillna("India")
+    out["Type"] = trip_type.str.title()
+    out["Famous For"] = _text(df, "Famous For", "Destination Point").fillna(trip_type)
+    out["Short Description"] = _text(df, "Long Description", "Short Description", "Description").fillna(
+        "Explore " + city + "."
+    )
+    out["Best Time to Visit"] = _rule_select(state.str.lower(), BEST_TIME_RULES, DEFAULT_BEST_TIME)
+    out["Ideal Duration"] = "3 Days"
+    out["Suitable For"] = _text(df, "Weekend Friendly").fillna("Everyone")
+    out["Price"], price = _prices(df)
+    out["price_inr"] = _json_number(price)
+    out["waypoints"] = _waypoints(points, trip_type)
+    out["distance_from_delhi"] = _json_number(_number(df, "Distance from Delhi (km)"))
+    out["weekend_score"] = _json_number(_number(df, "Weekend Score"))
+    lat, lon = _coordinates(df, city, state)
+    out["lat"], out["lon"] = _json_number(lat), _json_number(lon)
+    unplaced = int(lat.isna().sum())
+    if unplaced:
+        print(f"{unplaced} destinations not found in the gazetteer (no lat/lon)")
+    return out.reset_index(drop=True)
+
+
+def read_destinations(path: str) -> list:
+    """Records from a destinations file written by write_destinations ([] if missing)."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(NDJSON_SUFFIXES):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f).get("destinations", [])
+
+
+def row_hash(record: dict) -> str:
+    """Content hash of a record, ignoring its id."""
+    body = {key: value for key, value in record.items() if key != "id"}
+    return hashlib.sha1(json.dumps(body, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def diff_destinations(previous: list, current: list) -> dict:
+    """Records added or changed (by slug and row hash) and slugs removed."""
+    old = {record["slug"]: row_hash(record) for record in previous}
+    added, changed = [], []
+    for record in current:
+        digest = old.pop(record["slug"], None)
+        if digest is None:
+            added.append(record)
+        elif digest != row_hash(record):
+            changed.append(record)
+    return {"added": added, "changed": changed, "removed": sorted(old)}
+
+
+def write_destinations(records: list, path: str):
+    """Compact {"destinations": [...]} JSON, or one record per line for .ndjson/.jsonl."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        if path.lower().endswith(NDJSON_SUFFIXES):
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":"), allow_nan=False))
+                f.write("\n")
+        else:
+            # dumps (one C-encoder pass) is much faster than dump's chunked writes.
+            f.write(json.dumps({"destinations": records}, separators=(",", ":"), allow_nan=False))
+    os.replace(tmp_path, path)
+
+
+def import_master_excel(excel_path: str = DEFAULT_EXCEL_PATH, json_path: str = DEFAULT_JSON_PATH,
+                        build_indexes: bool = True, full: bool = False):
     if not os.path.exists(excel_path):
         print(f"Excel file not found: {excel_path}")
         return
 
     print(f"Reading {excel_path}...")
     try:
-        df = pd.read_excel(excel_path)
+        df = read_workbook(excel_path)
     except Exception as e:
         print(f"Error reading Excel: {e}")
         return
-    
-    # Normalize columns
-    df.columns = [str(c).strip() for c in df.columns]
     print(f"Detected columns: {df.columns.tolist()}")
 
-    destinations = []
-    seen_slugs = set()
+    previous = [] if full else read_destinations(json_path)
+    destinations = transform(df, {r["slug"]: r["id"] for r in previous}).to_dict("records")
+    delta = diff_destinations(previous, destinations)
+    print(f"{len(delta['added'])} added, {len(delta['changed'])} changed, {len(delta['removed'])} removed")
+    if previous and not any(delta.values()):
+        from snapshot import indexes_current
+
+        # The snapshot is also stale after an index code change, with the same JSON.
+        if not build_indexes or indexes_current(json_path):
+            print("Catalogue unchanged; nothing to rebuild.")
+            return
+        print("Catalogue unchanged; rebuilding its out-of-date indexes.")
+    else:
+        write_destinations(destinations, json_path)
+        with open(os.path.splitext(json_path)[0] + ".delta.json", "w", encoding="utf-8") as f:
+            f.write(json.dumps(delta, separators=(",", ":"), allow_nan=False))
+        print(f"Successfully converted {len(destinations)} cities to {os.path.basename(json_path)}")
+
+    if build_indexes:
+        # Update the semantic vector index and the binary snapshot next to the JSON
+        from semantic_index import build_index
+        from snapshot import build_snapshot
+
+        if full:
+            build_index(json_path)
+            build_snapshot(json_path)
+        else:
+            build_snapshot(json_path, incremental=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import the master destination workbook.")
+    parser.add_argument("excel_path", nargs="?", default=DEFAULT_EXCEL_PATH)
+    parser.add_argument("--output", default=DEFAULT_JSON_PATH,
+                        help="destinations file; .ndjson/.jsonl writes one record per line")
+    parser.add_argument("--skip-indexes", action="store_true",
+                        help="don't rebuild the vector index and snapshot")
+    parser.add_argument("--full", action="store_true",
+                        help="renumber ids and rebuild every index from scratch")
+    args = parser.parse_args(argv)
+    import_master_excel(args.excel_path, args.output, build_indexes=not args.skip_indexes, full=args.full)
 
-    for index, row in df.iterrows():
-        city = row.get("City") or row.get("Destination")
-        if not city or pd.isna(city) or str(city).lower() == "nan":
-            continue
-            
-        slug = str(city).lower().replace(" ", "-")
-        if slug in seen_slugs:
-            continue
-        seen_slugs.add(slug)
-        
-        state = row.get("State/UT") or row.get("State")
-        state_str = str(state).title() if state and not pd.isna(state) else "India"
-        
-        trip_type = row.get("Category") or row.get("Type") or "Leisure"
-        desc = row.get("Long Description") or row.get("Short Description") or row.get("Description") or f"Explore {city}."
-        famous_for = row.get("Famous For") or row.get("Destination Point") or trip_type
-        price = row.get("Estimated Cost (₹)")
-        
-        # Best Time Generation (Since not explicitly in this file)
-        # Simple heuristic based on known states
-        best_time = "October to March"
-        state_lower = str(state).lower()
-        if "himachal" in state_lower or "uttarakhand" in state_lower or "kashmir" in state_lower:
-             best_time = "March to June"
-        elif "kerala" in state_lower or "goa" in state_lower or "south" in state_lower:
-             best_time = "September to March"
-
-        # Waypoints Generation
-        waypoints = []
-        if not pd.isna(row.get("Destination Point")):
-             # Try to split by comma if multiple points listed? 
-             # Or serves as one waypoint.
-             pts = str(row.get("Destination Point"))
-             if "," in pts:
-                 waypoints = [p.strip() for p in pts.split(",")]
-             else:
-                 waypoints = [pts, "City Center"]
-        
-        if not waypoints:
-            type_lower = str(trip_type).lower()
-            if "beach" in type_lower:
-                 waypoints = ["Main Beach", "Sunset Point"]
-            elif "hill" in type_lower:
-                 waypoints = ["Mall Road", "Viewpoint"]
-            else:
-                 waypoints = ["City Center", "Local Market"]
-
-        dest_obj = {
-            "id": len(destinations) + 1,
-            "slug": slug,
-            "Destination": str(city).title(),
-            "State / UT": state_str,
-            "Type": str(trip_type).title(),
-            "Famous For": str(famous_for),
-            "Short Description": str(desc),
-            "Best Time to Visit": best_time,
-            "Ideal Duration": "3 Days",
-            "Suitable For": str(row.get("Weekend Friendly") or "Everyone"),
-            "Price": f"₹{price}" if price else "₹5,000 - ₹15,000",
-            "waypoints": waypoints,
-            "distance_from_delhi": row.get("Distance from Delhi (km)"),
-            "weekend_score": row.get("Weekend Score")
-        }
-        destinations.append(dest_obj)
-
-    # Save to JSON
-    output = {"destinations": destinations}
-    with open(json_path, "w") as f:
-        json.dump(output, f, indent=4)
-        
-    print(f"Successfully converted {len(destinations)} cities to destinations.json")
 
 if __name__ == "__main__":
-    import_master_excel()
+    main()
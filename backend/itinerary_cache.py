@@ -0,0 +1,252 @@
+import os
+import json
+import math
+import time
+import sqlite3
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future
+
+from media_cache import MemoryBackend, SQLiteBackend, normalize_query
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_MAX_SIZE = 5000
+
+
+def itinerary_key(destination, state, trip_type, num_days, query, model, prompt_version) -> str:
+    """Stable cache key for one itinerary request."""
+    parts = [
+        normalize_query(destination),
+        normalize_query(state),
+        normalize_query(trip_type),
+        int(num_days),
+        normalize_query(query),
+        model or "",
+        prompt_version,
+    ]
+    return hashlib.sha1(json.dumps(parts).encode()).hexdigest()
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def do(self, key: str, fn):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result()
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines on one event loop. The leader runs as its
+    own task, so a caller that is cancelled (client gone) doesn't cancel the
+    work the others are waiting on.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    async def do(self, key: str, fn):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+
+class PlanFileBackend:
+    """
+    Plans loaded from a JSON file of {key: itinerary}, which never expire
+    (keys carry the model and prompt version), in front of a MemoryBackend
+    for plans set at runtime. `save` writes chosen entries back to the file.
+    """
+
+    def __init__(self, path: str = None, max_size: int = DEFAULT_MAX_SIZE):
+        self.path = path
+        self.plans = {}
+        self.live = MemoryBackend(max_size)
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.plans = json.load(f)["plans"]
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Precomputed itineraries at {path} not loaded: {e}")
+
+    def get(self, key: str):
+        entry = self.live.get(key)
+        if entry is None and key in self.plans:
+            return self.plans[key], math.inf
+        return entry
+
+    def set(self, key: str, value, expires_at: float):
+        self.live.set(key, value, expires_at)
+
+    def delete(self, key: str):
+        self.live.delete(key)
+
+    def __len__(self):
+        return len(self.plans) + len(self.live)
+
+    def save(self, keys) -> int:
+        """Write the plans for `keys` (those present) to the file, replacing it; returns how many."""
+        plans = {}
+        for key in keys:
+            entry = self.get(key)
+            if entry is not None:
+                plans[key] = entry[0]
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"plans": plans}, f, ensure_ascii=False, sort_keys=True, indent=1)
+        os.replace(tmp_path, self.path)
+        self.plans = plans
+        return len(plans)
+
+
+class ItineraryCache:
+    """
+    TTL + size bounded store for generated itineraries with single-flight.
+
+    `generate()` must return `(itinerary, cacheable)`; fallbacks produced on
+    LLM errors should be returned with cacheable=False.
+    """
+
+    def __init__(self, backend=None, ttl: float = DEFAULT_TTL):
+        self.backend = backend if backend is not None else MemoryBackend(DEFAULT_MAX_SIZE)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._flight = SingleFlight()
+        self._async_flight = AsyncSingleFlight()
+
+    def get(self, key: str):
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            self.backend.delete(key)
+            return None
+        return value
+
+    def lookup(self, key: str):
+        """`get` that counts towards hit/miss stats, for callers generating on their own."""
+        cached = self.get(key)
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+
+    def set(self, key: str, itinerary: dict, ttl: float = None):
+        self.backend.set(key, itinerary, time.time() + (ttl or self.ttl))
+
+    def get_or_generate(self, key: str, generate) -> dict:
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        calls = []
+
+        def run():
+            calls.append(True)
+            # Another leader may have filled the cache while we queued.
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            self.misses += 1
+            itinerary, cacheable = generate()
+            if cacheable:
+                self.set(key, itinerary)
+            return itinerary
+
+        result = self._flight.do(key, run)
+        if not calls:
+            self.coalesced += 1
+        return result
+
+    async def get_or_generate_async(self, key: str, generate) -> dict:
+        """get_or_generate for a coroutine `generate()` returning `(itinerary, cacheable)`."""
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        calls = []
+
+        async def run():
+            calls.append(True)
+            self.misses += 1
+            itinerary, cacheable = await generate()
+            if cacheable:
+                self.set(key, itinerary)
+            return itinerary
+
+        result = await self._async_flight.do(key, run)
+        if not calls:
+            self.coalesced += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+def create_itinerary_cache() -> ItineraryCache:
+    """
+    Build the itinerary cache from ITINERARY_CACHE_* environment variables.
+    Persists to SQLite by default; falls back to memory if the path is not writable.
+    """
+    max_size = int(os.getenv("ITINERARY_CACHE_SIZE", DEFAULT_MAX_SIZE))
+    ttl = float(os.getenv("ITINERARY_CACHE_TTL", DEFAULT_TTL))
+    backend = None
+    if os.getenv("ITINERARY_CACHE_BACKEND", "sqlite").lower() == "sqlite":
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        path = os.getenv("ITINERARY_CACHE_PATH", os.path.join(base_dir, "data", "itinerary_cache.sqlite3"))
+        try:
+            backend = SQLiteBackend(path, max_size, table="itineraries")
+        except (OSError, sqlite3.Error) as e:
+            print(f"Itinerary cache at {path} unavailable, using memory: {e}")
+    if backend is None:
+        backend = MemoryBackend(max_size)
+    return ItineraryCache(backend, ttl)
+
+
+def create_precomputed_itineraries() -> ItineraryCache:
+    """
+    Store for default (non-personalized) plans: the plans in
+    PRECOMPUTED_ITINERARIES_PATH (data/precomputed_itineraries.json, written by
+    warm_itineraries.py and deployed with the catalogue) plus, in memory, any
+    generated on a miss. An empty path disables the file.
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    path = os.getenv("PRECOMPUTED_ITINERARIES_PATH", os.path.join(base_dir, "data", "precomputed_itineraries.json"))
+    ttl = float(os.getenv("ITINERARY_CACHE_TTL", DEFAULT_TTL))
+    return ItineraryCache(PlanFileBackend(path or None, int(os.getenv("ITINERARY_CACHE_SIZE", DEFAULT_MAX_SIZE))), ttl)
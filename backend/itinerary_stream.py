@@ -0,0 +1,141 @@
+import json
+
+# Top-level arrays whose elements are emitted one by one as they complete.
+STREAMED_ARRAYS = {"days": "day"}
+
+
+class ItineraryStreamParser:
+    """
+    Incremental parser for a streamed itinerary JSON object.
+
+    Feed completion text as it arrives; `feed()` returns `(event, data)` pairs
+    for every top-level field that has finished (e.g. ("header", "...")) and
+    for every element of a streamed array (("day", {...}) per `days[i]`).
+    Anything before the first "{" (markdown fences, preamble) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.result = {}
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self._item_start = None
+
+    def _finish_value(self, end: int, events: list):
+        text = self.buffer[self._value_start:end].strip()
+        key = self._key
+        self._key = None
+        self._value_start = None
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return
+        self.result[key] = value
+        if key not in STREAMED_ARRAYS:
+            events.append((key, value))
+
+    def feed(self, chunk: str) -> list:
+        events = []
+        if self.done or not chunk:
+            return events
+        self.buffer += chunk
+        buf = self.buffer
+
+        while self._pos < len(buf):
+            i = self._pos
+            c = buf[i]
+            self._pos += 1
+
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif c == "\\":
+                    self._escaped = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+
+            top_level = self._depth == 1
+            in_streamed_array = (
+                self._depth == 2
+                and self._key in STREAMED_ARRAYS
+                and self._value_start is not None
+                and buf[self._value_start] == "["
+            )
+
+            if c == '"':
+                self._in_string = True
+                if top_level and self._key is None:
+                    self._key_start = i
+                elif top_level and self._value_start is None:
+                    self._value_start = i
+                elif in_streamed_array and self._item_start is None:
+                    self._item_start = i
+            elif c in "{[":
+                if top_level and self._value_start is None:
+                    self._value_start = i
+                elif in_streamed_array and self._item_start is None:
+                    self._item_start = i
+                self._depth += 1
+            elif c in "}]":
+                if in_streamed_array and self._item_start is not None:
+                    # closing "]" right after a scalar element
+                    self._emit_item(i, events)
+                self._depth -= 1
+                if self._depth == 2 and self._item_start is not None:
+                    self._emit_item(i + 1, events)
+                elif self._depth == 1 and self._value_start is not None:
+                    self._finish_value(i + 1, events)
+                elif self._depth == 0:
+                    if self._value_start is not None:
+                        self._finish_value(i, events)
+                    self.done = True
+                    break
+            elif c == ",":
+                if top_level and self._value_start is not None:
+                    self._finish_value(i, events)
+                elif in_streamed_array and self._item_start is not None:
+                    self._emit_item(i, events)
+            elif c == ":" or c.isspace():
+                continue
+            elif top_level and self._key is not None and self._value_start is None:
+                # number, true, false, null
+                self._value_start = i
+            elif in_streamed_array and self._item_start is None:
+                self._item_start = i
+
+        return events
+
+    def _emit_item(self, end: int, events: list):
+        text = self.buffer[self._item_start:end].strip()
+        self._item_start = None
+        try:
+            item = json.loads(text)
+        except ValueError:
+            return
+        events.append((STREAMED_ARRAYS[self._key], item))
+
+
+def itinerary_events(itinerary: dict) -> list:
+    """The event sequence a parser would emit for an already complete itinerary."""
+    events = []
+    for key, value in itinerary.items():
+        if key in STREAMED_ARRAYS and isinstance(value, list):
+            events.extend((STREAMED_ARRAYS[key], item) for item in value)
+        else:
+            events.append((key, value))
+    return events
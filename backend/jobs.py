@@ -0,0 +1,176 @@
+import os
+import time
+import uuid
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 64
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_RESULT_TTL = 10 * 60.0
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+TIMEOUT = "timeout"
+
+
+class QueueFull(Exception):
+    """Raised when the job queue is at its pending limit."""
+
+
+class Job:
+    def __init__(self, key: str, timeout: float):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.timeout = timeout
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.deadline = None
+        self.finished_at = None
+        self.finished = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def status(self) -> str:
+        return self.state
+
+    def add_done_callback(self, callback):
+        """Call `callback()` (from the worker thread) once the job finishes; now if it has."""
+        with self._lock:
+            if not self.finished.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_done_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def _finish(self):
+        with self._lock:
+            self.finished_at = time.time()
+            self.finished.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def to_dict(self) -> dict:
+        data = {"id": self.id, "status": self.status}
+        if self.state == DONE:
+            data["itinerary"] = self.result
+        elif self.state == FAILED:
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+    """
+    Bounded background worker pool with deduplication by key.
+
+    Submitting a key that is still pending (or finished within `result_ttl`)
+    returns the existing job instead of starting a new one. Jobs run as
+    `fn(deadline)` and must stop by `deadline` (time.time() + timeout from
+    when they start), raising TimeoutError if they can't finish in time.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_pending: int = DEFAULT_MAX_PENDING,
+                 timeout: float = DEFAULT_TIMEOUT, result_ttl: float = DEFAULT_RESULT_TTL):
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="itinerary-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._by_key = {}
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+
+    def pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.state in (QUEUED, RUNNING))
+
+    def submit(self, key: str, fn) -> Job:
+        with self._lock:
+            self._expire()
+            existing = self._by_key.get(key)
+            if existing is not None and existing.state not in (FAILED, TIMEOUT):
+                return existing
+            if self.pending() >= self.max_pending:
+                raise QueueFull(f"{self.max_pending} itinerary jobs already pending")
+
+            job = Job(key, self.timeout)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+        self._pool.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn):
+        job.state = RUNNING
+        job.started_at = time.time()
+        job.deadline = job.started_at + job.timeout
+        try:
+            job.result = fn(job.deadline)
+            job.state = DONE
+        except TimeoutError as e:
+            print(f"Itinerary job {job.id} timed out: {e}")
+            job.error = str(e) or "timed out"
+            job.state = TIMEOUT
+        except Exception as e:
+            print(f"Itinerary job {job.id} failed: {e}")
+            job.error = str(e)
+            job.state = FAILED
+        finally:
+            job._finish()
+
+    def get(self, job_id: str) -> Job:
+        return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: float = 0) -> Job:
+        """Long-poll: block up to `timeout` seconds for the job to finish."""
+        job = self.get(job_id)
+        if job is not None and timeout > 0:
+            job.finished.wait(timeout)
+        return job
+
+    async def wait_async(self, job_id: str, timeout: float = 0) -> Job:
+        """`wait` for the event loop: no thread is held while the job runs."""
+        job = self.get(job_id)
+        if job is None or timeout <= 0 or job.finished.is_set():
+            return job
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: done.done() or done.set_result(None))
+
+        job.add_done_callback(wake)
+        try:
+            await asyncio.wait_for(done, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            job.remove_done_callback(wake)
+        return job
+
+
+def create_job_queue() -> JobQueue:
+    """Build the itinerary job queue from ITINERARY_JOB_* environment variables."""
+    return JobQueue(
+        workers=int(os.getenv("ITINERARY_JOB_WORKERS", DEFAULT_WORKERS)),
+        max_pending=int(os.getenv("ITINERARY_JOB_MAX_PENDING", DEFAULT_MAX_PENDING)),
+        timeout=float(os.getenv("ITINERARY_JOB_TIMEOUT", DEFAULT_TIMEOUT)),
+        result_ttl=float(os.getenv("ITINERARY_JOB_RESULT_TTL", DEFAULT_RESULT_TTL)),
+    )
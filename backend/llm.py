@@ -0,0 +1,101 @@
+import os
+import asyncio
+import weakref
+import threading
+
+_client = None
+_provider = None
+_model_name = None
+_client_kwargs = None
+_initialized = False
+_lock = threading.Lock()
+# AsyncOpenAI clients by event loop (see http_client._async_clients).
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _init():
+    global _client, _provider, _model_name, _client_kwargs, _initialized
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    grok_api_key = os.getenv("GROK_API_KEY")
+
+    if openai_api_key:
+        try:
+            # Standard OpenAI
+            from openai import OpenAI
+            _client_kwargs = {"api_key": openai_api_key}
+            _client = OpenAI(**_client_kwargs)
+            _provider = "openai"
+            _model_name = "gpt-3.5-turbo"  # Default model for OpenAI
+            print("Using OpenAI API")
+        except Exception as e:
+            print(f"Failed to init OpenAI: {e}")
+    elif grok_api_key:
+        try:
+            # Fallback to Grok
+            from openai import OpenAI
+            _client_kwargs = {"api_key": grok_api_key, "base_url": "https://api.x.ai/v1"}
+            _client = OpenAI(**_client_kwargs)
+            _provider = "grok"
+            _model_name = "grok-2-latest"
+            print("Using Grok API")
+        except Exception as e:
+            print(f"Failed to init Grok: {e}")
+    if _client is None:
+        _provider = _client_kwargs = None
+    _initialized = True
+
+
+def _ensure():
+    if not _initialized:
+        with _lock:
+            if not _initialized:
+                _init()
+
+
+def get_llm_client():
+    """The shared OpenAI-compatible client, or None when no provider is configured."""
+    _ensure()
+    return _client
+
+
+def get_async_llm_client():
+    """AsyncOpenAI for the configured provider on the running event loop, or None without one."""
+    _ensure()
+    if _client_kwargs is None:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        from openai import AsyncOpenAI
+        client = _async_clients[loop] = AsyncOpenAI(**_client_kwargs)
+    return client
+
+
+def get_provider() -> str:
+    """"openai", "grok", or None when no provider is configured."""
+    _ensure()
+    return _provider
+
+
+def get_model_name() -> str:
+    """Default chat model for the configured provider (None without one)."""
+    _ensure()
+    return _model_name
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Timeouts, connection failures, rate limits, 5xx and unknown models: worth trying another model."""
+    import openai
+
+    return isinstance(error, (
+        openai.APIConnectionError,   # includes APITimeoutError
+        openai.RateLimitError,
+        openai.InternalServerError,
+        openai.NotFoundError,
+    ))
+
+
+def is_timeout_error(error: Exception) -> bool:
+    import openai
+
+    return isinstance(error, (openai.APITimeoutError, TimeoutError))
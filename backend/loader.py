@@ -1,8 +1,8 @@
-import pandas as pd
-import json
 import re
 import os
 
+from import_master import read_workbook, write_destinations
+
 # Paths
 EXCEL_PATH = "../frontend/Indian_Travel_100plus_Segmented.xlsx"
 OUTPUT_JSON = "data/destinations.json"
@@ -11,9 +11,9 @@ def clean_key(key):
     """Remove content in parentheses from keys, e.g., 'Duration (Days)' -> 'Duration'"""
     return re.sub(r'\s*\(.*?\)', '', key).strip()
 
-def generate_slug(name):
-    """Generate a URL-friendly slug from the name."""
-    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+def generate_slug(names):
+    """Generate URL-friendly slugs from a column of names."""
+    return names.str.lower().str.replace(r'[^a-z0-9]+', '-', regex=True).str.strip('-')
 
 def load_data():
     if not os.path.exists(EXCEL_PATH):
@@ -21,38 +21,24 @@ def load_data():
         return
 
     try:
-        df = pd.read_excel(EXCEL_PATH)
-        
-        destinations = []
-        for index, row in df.iterrows():
-            item = {}
-            # Clean keys and build item
-            for col in df.columns:
-                clean_col = clean_key(col)
-                val = row[col]
-                
-                # Handle NaN/None
-                if pd.isna(val):
-                    val = None
-                else:
-                    val = str(val).strip()
-                
-                item[clean_col] = val
-            
-            # Add metadata
-            if item.get("Destination"):
-                item["id"] = index + 1
-                item["slug"] = generate_slug(item["Destination"])
-                destinations.append(item)
-            
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(OUTPUT_JSON), exist_ok=True)
-        
-        with open(OUTPUT_JSON, 'w') as f:
-            json.dump({"destinations": destinations}, f, indent=2)
-            
+        df = read_workbook(EXCEL_PATH)
+        df.columns = [clean_key(col) for col in df.columns]
+        if "Destination" not in df:
+            df["Destination"] = None
+
+        # Every value becomes a stripped string (or None), column by column.
+        values = df.astype("string").apply(lambda column: column.str.strip())
+        values = values[values["Destination"].fillna("") != ""]
+
+        # Add metadata
+        values["id"] = values.index + 1
+        values["slug"] = generate_slug(values["Destination"])
+        destinations = values.astype(object).where(values.notna(), None).to_dict("records")
+
+        write_destinations(destinations, OUTPUT_JSON)
+
         print(f"Successfully loaded {len(destinations)} destinations to {OUTPUT_JSON}")
-        
+
     except Exception as e:
         print(f"Error processing Excel: {e}")
 
@@ -1,7 +1,12 @@
-from fastapi import FastAPI, Response
+import os
+import json
+from fastapi import Depends, FastAPI, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+
+from tracing import PROMETHEUS_CONTENT_TYPE, TracingMiddleware, registry, stage
 
 app = FastAPI()
 
@@ -12,58 +17,217 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Per-request stage timings (Server-Timing header) and latency histograms for /metrics.
+app.add_middleware(TracingMiddleware)
+
+# "background" returns /search immediately and generates the top itinerary as a job.
+DEFAULT_DEFER_ITINERARY = os.getenv("ITINERARY_MODE", "inline").lower() == "background"
 
 class SearchQuery(BaseModel):
     query: str
     location: Optional[str] = None
+    defer_itinerary: Optional[bool] = None
+    # e.g. {"Type": ["Beach"], "month": ["November"], "distance_from_delhi": {"lte": 500}}
+    filters: Optional[dict] = None
 
 @app.get("/")
 def read_root():
     return {"Hello": "Weekend Travellers"}
 
-from ai_service import TripAI
+from ai_service import TripAI, cache_stats
+from http_client import pexels_rate_limit
+from response_cache import (
+    DESTINATION_CACHE_CONTROL, NO_STORE, SUGGEST_CACHE_CONTROL, VIDEO_CACHE_CONTROL, create_response_cache,
+)
+from suggest import DEFAULT_LIMIT as DEFAULT_SUGGEST_LIMIT
+from upstream import limiter_stats
 
 ai_service = TripAI()
+# Read-only GETs below are cached in-process and carry ETag/Cache-Control for the edge.
+response_cache = create_response_cache()
+
+# Routes that call Pexels or the LLM are `async def`: outbound calls wait on
+# per-upstream limiters (upstream.py) on the event loop instead of holding
+# threadpool workers. Catalogue-only routes are `async def` too, since they
+# never block: they run straight away, however many upstream calls are queued.
+# Job long-polls wait on the loop as well. Sync routes are the ones that may
+# block (a cold video pool).
 
-@app.post("/search")
-def search_trips(search: SearchQuery):
-    results = ai_service.generate_trips(search.query)
-    return results
+async def catalogue_loaded():
+    # Async routes read the catalogue inline; load it off the loop first.
+    await ai_service.load_async()
+
+CATALOGUE = [Depends(catalogue_loaded)]
+
+@app.post("/search", dependencies=CATALOGUE)
+async def search_trips(search: SearchQuery):
+    defer = DEFAULT_DEFER_ITINERARY if search.defer_itinerary is None else search.defer_itinerary
+    results = await ai_service.generate_trips_async(search.query, defer_itinerary=defer, filters=search.filters)
+    with stage("serialize"):
+        return JSONResponse(results)
+
+@app.get("/api/itinerary/jobs/{job_id}")
+async def get_itinerary_job(job_id: str, wait: float = 0):
+    """Poll a background itinerary job; `wait` long-polls for up to 25 seconds."""
+    result = await ai_service.get_itinerary_job_async(job_id, min(max(wait, 0), 25))
+    if not result:
+        return {"error": "Job not found"}
+    return result
 
 
 
 @app.get("/api/video/background")
 def get_background_video(query: str = "timelapse,hyperlapse,nature motion,city lights"):
-    """Get a random background video."""
+    """Get a random background video from the prefetched pool."""
     result = ai_service.get_random_background_video(query)
     if not result:
         # Fallback - return None or a specific error indicator, frontend handles fallback
-        return {"video_url": None}
-    return result
+        return JSONResponse({"video_url": None}, headers={"Cache-Control": NO_STORE})
+    # Not in the response cache: every request gets a fresh random pick.
+    return JSONResponse(result, headers={"Cache-Control": VIDEO_CACHE_CONTROL})
 
-@app.get("/api/destinations/suggest")
-def suggest_destinations(q: str):
+@app.get("/api/destinations/suggest", dependencies=CATALOGUE)
+async def suggest_destinations(request: Request, q: str, limit: int = DEFAULT_SUGGEST_LIMIT):
     """Get autocomplete suggestions."""
-    return ai_service.get_suggestions(q)
+    return response_cache.respond(
+        request,
+        lambda: (ai_service.get_suggestions(q, limit), True),
+        SUGGEST_CACHE_CONTROL,
+        version=ai_service.catalogue_version,
+    )
+
+MAX_SEARCH_LIMIT = 100
+
+@app.get("/api/destinations/search", dependencies=CATALOGUE)
+async def search_destinations(
+    request: Request,
+    q: str = "",
+    type: Optional[List[str]] = Query(None),
+    state: Optional[List[str]] = Query(None),
+    month: Optional[List[str]] = Query(None),
+    min_distance: Optional[float] = None,
+    max_distance: Optional[float] = None,
+    min_score: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_price: Optional[float] = None,
+    limit: int = 20,
+    offset: int = 0,
+):
+    """Filter the catalogue (facets + free text, e.g. q=beach within 500 km) with facet counts."""
+    filters = {
+        "Type": type,
+        "State / UT": state,
+        "month": month,
+        "distance_from_delhi": {"gte": min_distance, "lte": max_distance},
+        "weekend_score": {"gte": min_score},
+        "price_inr": {"gte": min_price, "lte": max_price},
+    }
+    return response_cache.respond(
+        request,
+        lambda: (ai_service.search_destinations(q, filters, min(max(limit, 1), MAX_SEARCH_LIMIT), max(offset, 0)), True),
+        SUGGEST_CACHE_CONTROL,
+        version=ai_service.catalogue_version,
+    )
+
+MAX_NEARBY_LIMIT = 100
 
-@app.get("/api/destinations/{slug}")
-def get_destination(slug: str):
+@app.get("/api/destinations/nearby", dependencies=CATALOGUE)
+async def nearby_destinations(
+    request: Request,
+    origin: Optional[str] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    k: int = 10,
+    radius_km: Optional[float] = None,
+    sort: str = "score",
+):
+    """
+    Destinations near an origin city (?origin=Mumbai) or point (?lat=&lon=):
+    the k nearest, or those within radius_km, ranked with weekend_score
+    (sort=score) or by distance (sort=distance).
+    """
+    def build():
+        if lat is not None and lon is not None:
+            place = {"name": origin, "lat": lat, "lon": lon}
+        elif origin:
+            place = ai_service.resolve_origin(origin)
+            if place is None:
+                return {"error": f"Unknown origin: {origin}"}, False
+        else:
+            return {"error": "Pass origin or lat/lon"}, False
+        results = ai_service.nearby_destinations(
+            place["lat"], place["lon"], min(max(k, 1), MAX_NEARBY_LIMIT), radius_km,
+            "distance" if sort == "distance" else "score",
+        )
+        return {"origin": place, "results": results}, True
+
+    return response_cache.respond(request, build, DESTINATION_CACHE_CONTROL, version=ai_service.catalogue_version)
+
+@app.get("/api/destinations/{slug}", dependencies=CATALOGUE)
+async def get_destination(request: Request, slug: str):
     """Get destination details by slug."""
-    result = ai_service.get_destination_by_slug(slug)
-    if not result:
-        return {"error": "Destination not found"}
-    if not result:
-        return {"error": "Destination not found"}
-    return result
+    async def build():
+        result, media_complete = await ai_service.get_destination_by_slug_async(slug)
+        if not result:
+            return {"error": "Destination not found"}, False
+        # Don't pin a response whose media lookup failed; "no media" is fine.
+        return result, media_complete
+
+    return await response_cache.respond_async(
+        request, build, DESTINATION_CACHE_CONTROL, version=ai_service.catalogue_version
+    )
+
+@registry.register_collector
+def _cache_metrics():
+    caches = dict(cache_stats(), response=response_cache.stats())
+    for name, help in (("hits", "Cache hits."), ("misses", "Cache misses.")):
+        yield (f"tripai_cache_{name}_total", "counter", help,
+               [({"cache": cache}, stats.get(name)) for cache, stats in caches.items()])
+    ratios = []
+    for cache, stats in caches.items():
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        if lookups:
+            ratios.append(({"cache": cache}, stats["hits"] / lookups))
+    yield "tripai_cache_hit_ratio", "gauge", "Cache hits / lookups since start.", ratios
+    yield ("tripai_cache_entries", "gauge", "Entries held per cache.",
+           [({"cache": cache}, stats.get("size", stats.get("candidates"))) for cache, stats in caches.items()])
+    yield ("tripai_pexels_ratelimit_remaining", "gauge", "Pexels requests left in the quota window.",
+           [({}, pexels_rate_limit.snapshot()["remaining"])])
+    limiters = limiter_stats()
+    for name, metric_type, help in (
+        ("active", "gauge", "Outbound calls in flight per upstream."),
+        ("waiting", "gauge", "Calls queued for an upstream slot."),
+        ("rejected", "counter", "Calls turned away because the upstream queue was full."),
+    ):
+        metric = f"tripai_upstream_{name}" + ("_total" if metric_type == "counter" else "")
+        yield metric, metric_type, help, [({"upstream": up}, stats[name]) for up, stats in limiters.items()]
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 class ItineraryRequest(BaseModel):
     destination: str
     query: str
 
 @app.post("/api/generate-itinerary")
-def generate_itinerary(req: ItineraryRequest):
+async def generate_itinerary(req: ItineraryRequest):
     """Generate AI itinerary using Grok/OpenAI."""
-    return ai_service.generate_itinerary(req.destination, req.query)
+    return await ai_service.generate_itinerary_async(req.destination, req.query)
+
+@app.get("/api/generate-itinerary/stream")
+async def stream_itinerary(destination: str, query: str = ""):
+    """Stream the AI itinerary as Server-Sent Events (header, each day, then the rest)."""
+    async def events():
+        async for event, data in ai_service.stream_itinerary_async(destination, query or destination):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.post("/api/login")
 def login(response: Response):
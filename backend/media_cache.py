@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+DEFAULT_TTL = 24 * 60 * 60       # Pexels results for a query rarely change
+DEFAULT_NEGATIVE_TTL = 60 * 60   # Retry empty results sooner
+DEFAULT_MAX_SIZE = 2048
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a media query: lowercase, single-spaced."""
+    return " ".join(str(query or "").lower().split())
+
+
+class MemoryBackend:
+    """In-process LRU store. Entries are (value, expires_at)."""
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value, expires_at: float):
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """On-disk LRU store that survives restarts. Values are stored as JSON."""
+
+    def __init__(self, path: str, max_size: int = DEFAULT_MAX_SIZE, table: str = "media"):
+        self.max_size = max_size
+        self.table = table
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, time.time()),
+            )
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class MediaCache:
+    """
+    TTL cache in front of a media fetcher.
+
+    `fetch(query)` must return `(media, cacheable)`. Results where every value
+    is empty are cached for `negative_ttl`; uncacheable results (upstream
+    errors) are returned but not stored.
+    """
+
+    def __init__(self, backend=None, ttl: float = DEFAULT_TTL, negative_ttl: float = DEFAULT_NEGATIVE_TTL):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+
+    def _lookup(self, key: str):
+        entry = self.backend.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.time():
+                self.hits += 1
+                if not any(value.values()):
+                    self.negative_hits += 1
+                return dict(value)
+            self.backend.delete(key)
+        self.misses += 1
+        return None
+
+    def _store(self, key: str, value: dict, cacheable: bool) -> dict:
+        if cacheable:
+            ttl = self.ttl if any(value.values()) else self.negative_ttl
+            self.backend.set(key, value, time.time() + ttl)
+        return dict(value)
+
+    def get_or_fetch(self, query: str, fetch, namespace: str = "media") -> dict:
+        key = f"{namespace}:{normalize_query(query)}"
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        return self._store(key, *fetch(query))
+
+    async def get_or_fetch_async(self, query: str, fetch, namespace: str = "media") -> dict:
+        """get_or_fetch for a coroutine `fetch(query)` returning `(media, cacheable)`."""
+        key = f"{namespace}:{normalize_query(query)}"
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        return self._store(key, *(await fetch(query)))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_media_cache() -> MediaCache:
+    """Build the media cache from PEXELS_CACHE_* environment variables."""
+    max_size = int(os.getenv("PEXELS_CACHE_SIZE", DEFAULT_MAX_SIZE))
+    if os.getenv("PEXELS_CACHE_BACKEND", "memory").lower() == "sqlite":
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        path = os.getenv("PEXELS_CACHE_PATH", os.path.join(base_dir, "data", "media_cache.sqlite3"))
+        backend = SQLiteBackend(path, max_size)
+    else:
+        backend = MemoryBackend(max_size)
+    return MediaCache(
+        backend,
+        ttl=float(os.getenv("PEXELS_CACHE_TTL", DEFAULT_TTL)),
+        negative_ttl=float(os.getenv("PEXELS_CACHE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL)),
+    )
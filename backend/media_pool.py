@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import random
+import threading
+
+from http_client import RateLimitExhausted, pexels_rate_limit
+from itinerary_cache import SingleFlight
+from media_cache import normalize_query
+
+DEFAULT_POOL_SIZE = 40                 # candidates kept per query set
+DEFAULT_REFRESH_INTERVAL = 30 * 60     # re-fetch a pool this often
+DEFAULT_RETRY_INTERVAL = 60            # retry an empty (failed) pool sooner
+DEFAULT_MIN_REMAINING = 100            # Pexels quota left for user-facing lookups
+DEFAULT_MAX_POOLS = 20                 # distinct queries kept; the least recently picked goes first
+DEFAULT_IDLE_TTL = 24 * 60 * 60        # drop a pool nobody has picked for this long
+
+
+class MediaPool:
+    """
+    Prefetched pools of media candidates per query, served by random pick.
+
+    `fetch(query, count)` returns a list of validated candidates. The first
+    request for a query fills its pool synchronously (once, single-flight);
+    after that a background thread refreshes pools as they go stale, so
+    requests never wait on the external API. Background refreshes are
+    skipped while the Pexels quota is below `min_remaining`, and a failed
+    refresh keeps serving the previous pool. At most `max_pools` queries are
+    kept (least recently picked evicted first) and pools idle for `idle_ttl`
+    are dropped rather than refreshed, so arbitrary client queries can't grow
+    memory, disk or Pexels usage without bound.
+
+    Pools are swapped whole (copy-on-write), so `pick` takes no locks.
+    """
+
+    def __init__(self, fetch, size: int = DEFAULT_POOL_SIZE, refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+                 retry_interval: float = DEFAULT_RETRY_INTERVAL, min_remaining: int = DEFAULT_MIN_REMAINING,
+                 max_pools: int = DEFAULT_MAX_POOLS, idle_ttl: float = DEFAULT_IDLE_TTL, path: str = None):
+        self.fetch = fetch
+        self.size = size
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.min_remaining = min_remaining
+        self.max_pools = max(max_pools, 1)
+        self.idle_ttl = idle_ttl
+        self.path = path
+        self.refreshes = 0
+        self.skipped = 0
+        self.evicted = 0
+        self._pools = self._read()
+        self._picked_at = {key: pool["fetched_at"] for key, pool in self._pools.items()}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._thread = None
+
+    def pick(self, query: str):
+        """A random candidate for `query`, or None if none could be fetched."""
+        self._start_refresher()
+        key = normalize_query(query)
+        self._picked_at[key] = time.time()
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._flight.do(key, lambda: self.refresh(query, background=False))
+        items = pool["items"] if pool else ()
+        return random.choice(items) if items else None
+
+    def refresh(self, query: str, background: bool = True) -> dict:
+        """Re-fetch one pool; returns the pool now being served."""
+        key = normalize_query(query)
+        current = self._pools.get(key)
+        if background and current is None:
+            return None   # dropped since the refresh was scheduled
+        if pexels_rate_limit.exhausted() or (background and self._low_quota()):
+            self.skipped += 1
+            return current
+
+        try:
+            items = tuple(self.fetch(query, self.size))
+        except RateLimitExhausted:
+            self.skipped += 1
+            return current
+        except Exception as e:
+            print(f"Error refreshing media pool for '{query}': {e}")
+            items = ()
+        self.refreshes += 1
+
+        if not items and current and current["items"]:
+            # Keep serving what we have; try again after the retry interval.
+            pool = dict(current, fetched_at=time.time() - self.refresh_interval + self.retry_interval)
+        else:
+            pool = {"query": query, "items": items, "fetched_at": time.time()}
+        with self._lock:
+            pools = dict(self._pools)
+            pools[key] = pool
+            while len(pools) > self.max_pools:
+                oldest = min((k for k in pools if k != key), key=lambda k: self._picked_at.get(k, 0))
+                self._remove(pools, oldest)
+            self._pools = pools
+        self._write()
+        return pool
+
+    def _remove(self, pools: dict, key: str):
+        del pools[key]
+        self._picked_at.pop(key, None)
+        self.evicted += 1
+
+    def refresh_stale(self):
+        now = time.time()
+        idle = [key for key in self._pools if now - self._picked_at.get(key, 0) >= self.idle_ttl]
+        if idle:
+            with self._lock:
+                pools = dict(self._pools)
+                for key in idle:
+                    self._remove(pools, key)
+                self._pools = pools
+            self._write()
+        for pool in list(self._pools.values()):
+            max_age = self.refresh_interval if pool["items"] else self.retry_interval
+            if now - pool["fetched_at"] >= max_age:
+                self.refresh(pool["query"])
+
+    def _low_quota(self) -> bool:
+        remaining = pexels_rate_limit.snapshot()["remaining"]
+        return remaining is not None and remaining < self.min_remaining
+
+    def _start_refresher(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            def run():
+                while True:
+                    time.sleep(min(self.retry_interval, self.refresh_interval))
+                    try:
+                        self.refresh_stale()
+                    except Exception as e:
+                        print(f"Media pool refresher error: {e}")
+
+            self._thread = threading.Thread(target=run, name="media-pool", daemon=True)
+            self._thread.start()
+
+    def _read(self) -> dict:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                pools = json.load(f)
+            newest = sorted(pools, key=lambda key: pools[key]["fetched_at"], reverse=True)[:self.max_pools]
+            return {key: dict(pools[key], items=tuple(pools[key]["items"])) for key in newest}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring media pool file {self.path}: {e}")
+            return {}
+
+    def _write(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({key: dict(pool, items=list(pool["items"])) for key, pool in self._pools.items()}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not persist media pool: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "pools": len(self._pools),
+            "candidates": sum(len(pool["items"]) for pool in self._pools.values()),
+            "refreshes": self.refreshes,
+            "skipped": self.skipped,
+            "evicted": self.evicted,
+        }
+
+
+def create_media_pool(fetch) -> MediaPool:
+    """Build a pool from BACKGROUND_POOL_* environment variables (PATH enables the disk copy)."""
+    return MediaPool(
+        fetch,
+        size=int(os.getenv("BACKGROUND_POOL_SIZE", DEFAULT_POOL_SIZE)),
+        refresh_interval=float(os.getenv("BACKGROUND_POOL_REFRESH", DEFAULT_REFRESH_INTERVAL)),
+        retry_interval=float(os.getenv("BACKGROUND_POOL_RETRY", DEFAULT_RETRY_INTERVAL)),
+        min_remaining=int(os.getenv("BACKGROUND_POOL_MIN_REMAINING", DEFAULT_MIN_REMAINING)),
+        max_pools=int(os.getenv("BACKGROUND_POOL_MAX_QUERIES", DEFAULT_MAX_POOLS)),
+        idle_ttl=float(os.getenv("BACKGROUND_POOL_IDLE_TTL", DEFAULT_IDLE_TTL)),
+        path=os.getenv("BACKGROUND_POOL_PATH") or None,
+    )
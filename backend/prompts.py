@@ -0,0 +1,177 @@
+"""Itinerary prompts, local token counting, completion budgets and model routing."""
+import os
+import re
+import math
+from collections import namedtuple
+
+from llm import get_provider
+
+# Bump when a template changes so cached plans from the old prompt are ignored.
+CONCIERGE_PROMPT_VERSION = "concierge-2"
+PLANNER_PROMPT_VERSION = "planner-2"
+
+MAX_DAYS = 5          # longer requests are planned as MAX_DAYS
+DEFAULT_DAYS = 2
+PLANNER_DAYS = 3
+SHORT_TRIP_DAYS = int(os.getenv("LLM_SHORT_TRIP_DAYS", 2))
+
+# Completion budgets in tokens: the fixed fields plus a slice per day. A day
+# of the concierge schema (title, subtitle, six timed items) runs ~180 tokens.
+COMPLETION_BUDGETS = {
+    "concierge": (160, 230),   # header, footer, waypoints; per day
+    "planner": (220, 160),     # header, packing list, weather, waypoints; per day
+}
+BUDGET_SCALE = float(os.getenv("LLM_BUDGET_SCALE", 1.0))
+# Stands in for the traveller's search in default (non-personalized) plans.
+DEFAULT_PLAN_QUERY = "no specific request; a classic first visit"
+# User text is clipped to this many tokens before it goes into a prompt.
+MAX_QUERY_TOKENS = 120
+
+# Per-attempt timeout: connection + time to first token, plus generation at a
+# conservative tokens/second, so a full budget always fits.
+TIMEOUT_BASE = float(os.getenv("LLM_TIMEOUT_BASE", 4.0))
+TOKENS_PER_SECOND = float(os.getenv("LLM_TOKENS_PER_SECOND", 40.0))
+
+# provider -> purpose -> models; "short" serves concierge trips of up to SHORT_TRIP_DAYS.
+MODEL_ROUTES = {
+    "openai": {
+        "short": ("gpt-4o-mini", "gpt-3.5-turbo"),
+        "concierge": ("gpt-3.5-turbo", "gpt-4o-mini"),
+        "planner": ("gpt-4o", "gpt-4o-mini"),
+    },
+    "grok": {
+        "short": ("grok-2-latest",),
+        "concierge": ("grok-2-latest",),
+        "planner": ("grok-2-latest",),
+    },
+}
+
+# USD per million (prompt, completion) tokens, for cost accounting.
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "grok-2-latest": (2.00, 10.00),
+}
+
+
+class Route(namedtuple("Route", "purpose models max_tokens timeout")):
+    __slots__ = ()
+
+    @property
+    def model(self) -> str:
+        """First-choice model (None when no provider is configured)."""
+        return self.models[0] if self.models else None
+
+
+def trip_days(duration) -> int:
+    """Day count from an "Ideal Duration" value ("2-3 Days" -> 3), within 1..MAX_DAYS."""
+    numbers = [int(n) for n in re.findall(r"\d+", str(duration or ""))]
+    if not numbers or max(numbers) < 1:
+        return DEFAULT_DAYS
+    return min(max(numbers), MAX_DAYS)
+
+
+def duration_days(duration) -> list:
+    """Every day count an "Ideal Duration" covers ("2-3 Days" -> [2, 3]), within 1..MAX_DAYS."""
+    numbers = [min(int(n), MAX_DAYS) for n in re.findall(r"\d+", str(duration or "")) if int(n) >= 1]
+    if not numbers:
+        return [DEFAULT_DAYS]
+    return list(range(min(numbers), max(numbers) + 1))
+
+
+def completion_budget(purpose: str, num_days: int) -> int:
+    base, per_day = COMPLETION_BUDGETS[purpose]
+    return int(math.ceil((base + per_day * num_days) * BUDGET_SCALE))
+
+
+def llm_route(purpose: str, num_days: int = PLANNER_DAYS) -> Route:
+    """
+    Models (fallbacks after the first), max_tokens and timeout for a
+    "concierge" or "planner" call. LLM_MODELS_SHORT / _CONCIERGE / _PLANNER
+    override the models (comma-separated).
+    """
+    key = "short" if purpose == "concierge" and num_days <= SHORT_TRIP_DAYS else purpose
+    configured = os.getenv(f"LLM_MODELS_{key.upper()}")
+    if configured:
+        models = tuple(m.strip() for m in configured.split(",") if m.strip())
+    else:
+        models = MODEL_ROUTES.get(get_provider(), {}).get(key, ())
+    max_tokens = completion_budget(purpose, num_days)
+    return Route(purpose, models, max_tokens, TIMEOUT_BASE + max_tokens / TOKENS_PER_SECOND)
+
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int):
+    """Estimated spend for one call, or None for a model without a price."""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+# Local token estimate for cl100k/o200k-style BPE: short alphabetic runs,
+# digit groups of up to three and single symbols are about one token each.
+_PIECES = re.compile(r"[A-Za-z]{1,6}|\d{1,3}|[^\sA-Za-z\d]")
+_MESSAGE_OVERHEAD = 4   # role and separators per chat message
+_REPLY_OVERHEAD = 3
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count of `text` (no tokenizer download, ~10% high for English)."""
+    return len(_PIECES.findall(text or ""))
+
+
+def count_message_tokens(messages: list) -> int:
+    """Approximate prompt tokens of a chat request."""
+    return _REPLY_OVERHEAD + sum(_MESSAGE_OVERHEAD + count_tokens(m.get("content")) for m in messages)
+
+
+def clip_tokens(text: str, limit: int = MAX_QUERY_TOKENS) -> str:
+    """`text` cut to about `limit` tokens, at a piece boundary."""
+    text = " ".join(str(text or "").split())
+    for n, match in enumerate(_PIECES.finditer(text)):
+        if n == limit:
+            return text[:match.start()].rstrip() + "..."
+    return text
+
+
+_JSON_ONLY = "Reply with one JSON object only, no markdown."
+
+CONCIERGE_SYSTEM = "You are a luxury travel concierge: curated, in-the-know, verified. " + _JSON_ONLY
+CONCIERGE_TEMPLATE = (
+    'Plan a thoughtfully paced {days}-day trip to {destination}, {state} ({trip_type}).\n'
+    'Traveller\'s search: "{query}"\n'
+    'Use real businesses and places: signature dishes, photo spots, approx entry fees, travel times. '
+    'Items are "HH:MM - Activity: detail", under 20 words.\n'
+    'JSON: {{"header": one warm sentence, '
+    '"days": [{days} x {{"day_label": "Day N", "title", "subtitle", '
+    '"morning": [2 items], "afternoon": [2 items], "evening": [2 items]}}], '
+    '"footer": one concierge closing sentence, "waypoints": [3-4 real locations]}}'
+)
+
+PLANNER_SYSTEM = "You are a luxury travel planner. " + _JSON_ONLY
+PLANNER_TEMPLATE = (
+    'Create a detailed 3-day itinerary for a trip to {destination}.\n'
+    'Context: "{query}"\n'
+    'Style: poetic, specific, ending on a "Leaving with..." note.\n'
+    'JSON: {{"header": engaging header, '
+    '"days": [3 x {{"day": N, "title": theme, "activities": [3-4 items]}}], '
+    '"packing_list": [4 items], "weather_note": one sentence, "waypoints": [4 stops]}}'
+)
+
+
+def concierge_messages(destination: str, state: str, trip_type: str, query: str, num_days: int) -> list:
+    return [
+        {"role": "system", "content": CONCIERGE_SYSTEM},
+        {"role": "user", "content": CONCIERGE_TEMPLATE.format(
+            days=num_days, destination=destination, state=state, trip_type=trip_type,
+            query=clip_tokens(query) or DEFAULT_PLAN_QUERY)},
+    ]
+
+
+def planner_messages(destination: str, query_context: str) -> list:
+    return [
+        {"role": "system", "content": PLANNER_SYSTEM},
+        {"role": "user", "content": PLANNER_TEMPLATE.format(
+            destination=destination, query=clip_tokens(query_context))},
+    ]
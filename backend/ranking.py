@@ -0,0 +1,194 @@
+import re
+import math
+from bisect import bisect_left
+
+import numpy as np
+
+# Field boosts for BM25F-style scoring: a hit in the name outweighs one in the blurb.
+FIELD_BOOSTS = {
+    "Destination": 3.0,
+    "Type": 2.0,
+    "State / UT": 1.5,
+    "Famous For": 1.2,
+    "Short Description": 0.5,
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text) -> list:
+    """Lowercase and split text into alphanumeric tokens."""
+    if not text or not isinstance(text, str):
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+K1 = 1.2
+B = 0.75
+
+# Score multipliers for expanded query terms.
+PREFIX_WEIGHT = 0.7
+FUZZY_WEIGHT = {1: 0.6, 2: 0.35}
+
+
+def max_edits(term: str) -> int:
+    """Edit budget by term length: exact for short words, 1 for 4-7 chars, 2 beyond."""
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+def _deletes(term: str, distance: int) -> set:
+    found = {term}
+    frontier = {term}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment) distance, or limit + 1 if larger."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class BM25Ranker:
+    """
+    BM25F ranking over the destination fields with typo tolerance.
+
+    Per-term posting weights (tf saturation, length normalization and field
+    boosts) are precomputed, so scoring a query is one vectorized scatter
+    per matched term. Misspelled terms are expanded through a symmetric
+    deletion index; ties are broken by weekend_score.
+    """
+
+    def __init__(self, catalogue, field_boosts: dict = None, previous: "BM25Ranker" = None):
+        self.size = len(catalogue)
+        boosts = field_boosts or FIELD_BOOSTS
+        self.weekend_scores = np.nan_to_num(catalogue.weekend_scores, nan=0.0)
+
+        field_tokens = {field: [tokenize(v) for v in catalogue.column(field)] for field in boosts}
+        weights = {}
+        for field, boost in boosts.items():
+            lengths = np.array([len(t) for t in field_tokens[field]], dtype=np.float64)
+            avg_len = lengths.mean() if self.size and lengths.mean() > 0 else 1.0
+            for doc_id, tokens in enumerate(field_tokens[field]):
+                counts = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                norm = K1 * (1 - B + B * lengths[doc_id] / avg_len)
+                for token, tf in counts.items():
+                    per_doc = weights.setdefault(token, {})
+                    per_doc[doc_id] = per_doc.get(doc_id, 0.0) + boost * tf * (K1 + 1) / (tf + norm)
+
+        # Postings in CSR form: term -> (start, end) into two flat arrays, so the
+        # whole index is a couple of contiguous buffers (cheap to snapshot/mmap).
+        self.vocabulary = sorted(weights)
+        self.offsets = {}
+        doc_ids, values = [], []
+        for token in self.vocabulary:
+            per_doc = weights[token]
+            idf = math.log(1 + (self.size - len(per_doc) + 0.5) / (len(per_doc) + 0.5))
+            self.offsets[token] = (len(doc_ids), len(doc_ids) + len(per_doc))
+            doc_ids.extend(per_doc.keys())
+            values.extend(w * idf for w in per_doc.values())
+        self.doc_ids = np.array(doc_ids, dtype=np.int32)
+        self.weights = np.array(values, dtype=np.float64)
+        self.deletes = self._deletion_index(previous)
+
+    def _deletion_index(self, previous) -> dict:
+        """
+        Deletion variant -> indexed terms. Given the ranker this one replaces,
+        only terms added to or dropped from the vocabulary are (un)indexed;
+        `previous` itself is left untouched.
+        """
+        if previous is None:
+            added, removed, deletes = self.vocabulary, (), {}
+        else:
+            old, new = set(previous.vocabulary), set(self.vocabulary)
+            added, removed = sorted(new - old), old - new
+            deletes = {variant: list(terms) for variant, terms in previous.deletes.items()}
+        for term in removed:
+            for variant in _deletes(term, max_edits(term)):
+                terms = deletes[variant]
+                terms.remove(term)
+                if not terms:
+                    del deletes[variant]
+        for term in added:
+            for variant in _deletes(term, max_edits(term)):
+                deletes.setdefault(variant, []).append(term)
+        return deletes
+
+    def expand(self, term: str) -> dict:
+        """Indexed terms for one query term -> score multiplier."""
+        expanded = {}
+        if term in self.offsets:
+            expanded[term] = 1.0
+
+        if len(term) >= 4:
+            pos = bisect_left(self.vocabulary, term)
+            while pos < len(self.vocabulary) and self.vocabulary[pos].startswith(term):
+                expanded.setdefault(self.vocabulary[pos], PREFIX_WEIGHT)
+                pos += 1
+
+        budget = max_edits(term)
+        if budget:
+            for variant in _deletes(term, budget):
+                for candidate in self.deletes.get(variant, ()):
+                    if candidate in expanded:
+                        continue
+                    distance = edit_distance(term, candidate, budget)
+                    if 0 < distance <= budget:
+                        expanded[candidate] = FUZZY_WEIGHT[distance]
+        return expanded
+
+    def scores(self, terms: list) -> np.ndarray:
+        scores = np.zeros(self.size, dtype=np.float64)
+        for term in terms:
+            # Each query term contributes its best-matching expansion per doc.
+            best = np.zeros(self.size, dtype=np.float64)
+            for candidate, weight in self.expand(term).items():
+                start, end = self.offsets[candidate]
+                doc_ids = self.doc_ids[start:end]
+                # doc ids are unique within a posting list, so fancy indexing is safe
+                best[doc_ids] = np.maximum(best[doc_ids], self.weights[start:end] * weight)
+            scores += best
+        return scores
+
+    def rank(self, terms: list, candidates=None, limit: int = None, mask: np.ndarray = None) -> list:
+        """
+        Doc ids with a positive score, best first (ties: higher weekend_score).
+        `candidates` restricts ranking to a subset of doc ids; a boolean `mask`
+        (e.g. from facet filters) further restricts it, and without terms
+        ranks every masked doc.
+        """
+        scores = self.scores(terms)
+        if candidates is not None:
+            selected = np.zeros(self.size, dtype=bool)
+            selected[np.fromiter(candidates, dtype=np.int64)] = True
+        elif terms or mask is None:
+            selected = scores > 0
+        else:
+            selected = np.ones(self.size, dtype=bool)
+        if mask is not None:
+            selected &= mask
+        doc_ids = np.flatnonzero(selected)
+        order = np.lexsort((doc_ids, -self.weekend_scores[doc_ids], -np.round(scores[doc_ids], 9)))
+        ranked = doc_ids[order]
+        if limit is not None:
+            ranked = ranked[:limit]
+        return ranked.tolist()
@@ -0,0 +1,177 @@
+import os
+import time
+import hashlib
+from urllib.parse import urlencode
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+from itinerary_cache import AsyncSingleFlight, SingleFlight
+from media_cache import MemoryBackend
+from tracing import stage
+
+DEFAULT_TTL = 5 * 60
+DEFAULT_MAX_SIZE = 4096
+
+
+def cache_control(max_age: int, s_maxage: int, stale_while_revalidate: int) -> str:
+    """Public caching: browsers keep `max_age`, the CDN (Vercel edge) `s_maxage` plus SWR."""
+    return f"public, max-age={max_age}, s-maxage={s_maxage}, stale-while-revalidate={stale_while_revalidate}"
+
+
+SUGGEST_CACHE_CONTROL = cache_control(60, 60 * 60, 24 * 60 * 60)
+DESTINATION_CACHE_CONTROL = cache_control(5 * 60, 24 * 60 * 60, 7 * 24 * 60 * 60)
+# Short, so the edge still rotates through the prefetched pool.
+VIDEO_CACHE_CONTROL = cache_control(60, 60, 10 * 60)
+NO_STORE = "no-store"
+
+
+def request_key(request: Request) -> str:
+    """Route + sorted query params, so ?a=1&b=2 and ?b=2&a=1 share an entry."""
+    return f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+
+
+def _etag(*parts) -> str:
+    digest = hashlib.sha1("\0".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: float = None) -> bool:
+    """Evaluate If-None-Match (weak comparison), else If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class ResponseCache:
+    """
+    In-process TTL cache of rendered JSON responses for read-only GET routes,
+    with ETag/Last-Modified validators and 304 handling.
+
+    With a catalogue `version`, validators are derived from it and the route
+    key, so conditional requests are answered before anything is built and a
+    catalogue reload invalidates every entry. Without one (e.g. Pexels-backed
+    routes), validators come from the body and the time it was rendered.
+    """
+
+    def __init__(self, backend=None, ttl: float = DEFAULT_TTL):
+        self.backend = backend if backend is not None else MemoryBackend(DEFAULT_MAX_SIZE)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._flight = SingleFlight()
+        self._async_flight = AsyncSingleFlight()
+
+    def respond(self, request: Request, build, cache_control: str, version: dict = None,
+                ttl: float = None) -> Response:
+        """
+        `build()` returns `(payload, cacheable)`; uncacheable payloads (errors,
+        failed media lookups) are sent with `Cache-Control: no-store`, keeping
+        the catalogue validators when there is a `version`.
+        """
+        key, etag, last_modified, early = self._lookup(request, cache_control, version)
+        if early is not None:
+            return early
+        cached = self._flight.do(key, lambda: self._render(key, build(), etag, last_modified, ttl))
+        return self._finish(request, cached, cache_control, version)
+
+    async def respond_async(self, request: Request, build, cache_control: str, version: dict = None,
+                            ttl: float = None) -> Response:
+        """`respond` for a coroutine `build()`; concurrent misses share one build."""
+        key, etag, last_modified, early = self._lookup(request, cache_control, version)
+        if early is not None:
+            return early
+
+        async def render():
+            return self._render(key, await build(), etag, last_modified, ttl)
+
+        cached = await self._async_flight.do(key, render)
+        return self._finish(request, cached, cache_control, version)
+
+    def _lookup(self, request: Request, cache_control: str, version: dict) -> tuple:
+        """(key, etag, last_modified, response) where response is set for a 304 or a cache hit."""
+        key = request_key(request)
+        etag = last_modified = None
+        if version and version.get("sha1"):
+            etag = _etag(version["sha1"], key)
+            last_modified = version.get("modified")
+            if is_not_modified(request, etag, last_modified):
+                self.not_modified += 1
+                return key, etag, last_modified, self._response(304, None, etag, last_modified, cache_control)
+
+        entry = self.backend.get(key)
+        if entry is not None and entry[1] > time.time() and (etag is None or entry[0]["etag"] == etag):
+            self.hits += 1
+            return key, etag, last_modified, self._finish(request, entry[0], cache_control, version)
+        self.misses += 1
+        return key, etag, last_modified, None
+
+    def _finish(self, request: Request, cached: dict, cache_control: str, version: dict) -> Response:
+        if not cached["cacheable"]:
+            # no-store keeps it out of caches; the catalogue ETag still describes it.
+            if version is None:
+                return self._response(200, cached["body"], None, None, NO_STORE)
+            return self._response(200, cached["body"], cached["etag"], cached["last_modified"], NO_STORE)
+        if version is None and is_not_modified(request, cached["etag"], cached["last_modified"]):
+            self.not_modified += 1
+            return self._response(304, None, cached["etag"], cached["last_modified"], cache_control)
+        return self._response(200, cached["body"], cached["etag"], cached["last_modified"], cache_control)
+
+    def _render(self, key: str, built: tuple, etag: str, last_modified: float, ttl: float) -> dict:
+        payload, cacheable = built
+        with stage("serialize"):
+            body = JSONResponse(payload).body
+        cached = {
+            "body": body,
+            "etag": etag or _etag(body.decode()),
+            "last_modified": last_modified if last_modified is not None else time.time(),
+            "cacheable": cacheable,
+        }
+        if cacheable:
+            self.backend.set(key, cached, time.time() + (ttl if ttl is not None else self.ttl))
+        return cached
+
+    @staticmethod
+    def _response(status: int, body: bytes, etag: str, last_modified: float, cache_control: str) -> Response:
+        headers = {"Cache-Control": cache_control}
+        if etag:
+            headers["ETag"] = etag
+        if last_modified is not None:
+            headers["Last-Modified"] = _http_date(last_modified)
+        if status == 304:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+def create_response_cache() -> ResponseCache:
+    """Build the response cache from RESPONSE_CACHE_* environment variables."""
+    return ResponseCache(
+        MemoryBackend(int(os.getenv("RESPONSE_CACHE_SIZE", DEFAULT_MAX_SIZE))),
+        ttl=float(os.getenv("RESPONSE_CACHE_TTL", DEFAULT_TTL)),
+    )
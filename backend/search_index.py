@@ -0,0 +1,62 @@
+from ranking import BM25Ranker, tokenize
+
+STOPWORDS = {
+    "trip", "travel", "days", "day", "night", "nights", "to", "in", "for",
+    "a", "an", "the", "near", "weekend", "holiday", "vacation",
+}
+
+
+class SearchIndex:
+    """
+    Keyword search over the destination catalogue, built once at load time.
+
+    Destination names are looked up by contiguous spans of the query; all
+    other matching is BM25-ranked (with typo tolerance) by BM25Ranker.
+    """
+
+    def __init__(self, catalogue, previous: "SearchIndex" = None):
+        self.size = len(catalogue)
+        # "mount abu" -> [doc ids]; names are keyed by their token sequence so
+        # they can be matched against contiguous spans of the query.
+        self.names = {}
+        self.max_name_tokens = 1
+        for doc_id, name in enumerate(catalogue.names_lower):
+            name_tokens = tokenize(name)
+            if name_tokens:
+                self.names.setdefault(" ".join(name_tokens), []).append(doc_id)
+                self.max_name_tokens = max(self.max_name_tokens, len(name_tokens))
+
+        self.ranker = BM25Ranker(catalogue, previous=previous.ranker if previous else None)
+
+    def match_names(self, tokens: list) -> set:
+        """Doc ids whose full name appears as a contiguous span of the query."""
+        found = set()
+        for start in range(len(tokens)):
+            for length in range(1, self.max_name_tokens + 1):
+                if start + length > len(tokens):
+                    break
+                doc_ids = self.names.get(" ".join(tokens[start:start + length]))
+                if doc_ids:
+                    found.update(doc_ids)
+        return found
+
+    def match(self, query: str, limit: int = None, mask=None) -> list:
+        """
+        Return matching doc ids, best first.
+
+        Priority 1/2: destination name mentioned in the query.
+        Priority 3: BM25 over the destination fields (only used when no name
+        matched). Ties are broken by weekend_score.
+
+        A boolean `mask` (facet filters) restricts the results; with a mask
+        and no query terms, every masked destination matches.
+        """
+        tokens = tokenize(query)
+        terms = [t for t in tokens if t not in STOPWORDS and len(t) > 2]
+
+        named = self.match_names(tokens)
+        if named:
+            ranked = self.ranker.rank(terms, candidates=named, limit=limit, mask=mask)
+            if ranked or mask is None:
+                return ranked
+        return self.ranker.rank(terms, limit=limit, mask=mask)
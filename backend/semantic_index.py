@@ -0,0 +1,237 @@
+"""Local vector index for semantic destination matching (python semantic_index.py rebuilds it)."""
+import os
+import re
+import json
+import math
+import zlib
+import hashlib
+
+import numpy as np
+
+from catalogue import Catalogue
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_JSON_PATH = os.path.join(BASE_DIR, "data", "destinations.json")
+
+# Fields embedded for each destination.
+TEXT_FIELDS = ("Destination", "State / UT", "Type", "Famous For", "Short Description", "Best Time to Visit")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def destination_text(catalogue, row: int) -> str:
+    return catalogue.text(row, TEXT_FIELDS)
+
+
+class HashingEmbedder:
+    """
+    Hashed TF-IDF embedder: words, word bigrams and character trigrams are
+    hashed into `dim` signed buckets, weighted by sublinear term frequency and
+    (once fitted) inverse document frequency, then L2-normalized.
+    """
+
+    name = "hashing-tfidf-v1"
+
+    def __init__(self, dim: int = 1024, idf=None):
+        self.dim = dim
+        self.idf = np.asarray(idf, dtype=np.float32) if idf is not None else None
+
+    def _features(self, text: str) -> dict:
+        words = _WORD_RE.findall(text.lower())
+        features = {}
+        grams = list(words)
+        grams += [f"{a}_{b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"#{word}#"
+            grams += [padded[i:i + 3] for i in range(len(padded) - 2)]
+        for gram in grams:
+            h = zlib.crc32(gram.encode())
+            bucket = h % self.dim
+            sign = 1.0 if h >> 31 else -1.0
+            features[bucket] = features.get(bucket, 0.0) + sign
+        return features
+
+    def _raw(self, texts: list) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, count in self._features(text).items():
+                if count:
+                    matrix[row, bucket] = math.copysign(1.0 + math.log(abs(count)), count)
+        return matrix
+
+    def fit(self, raw: np.ndarray):
+        """Learn IDF weights from a matrix of raw (unweighted) feature rows."""
+        df = np.count_nonzero(raw, axis=0)
+        self.idf = (np.log((1 + raw.shape[0]) / (1 + df)) + 1.0).astype(np.float32)
+
+    def fit_embed(self, texts: list) -> np.ndarray:
+        """Learn IDF weights from `texts` and return their embeddings."""
+        matrix = self._raw(texts)
+        self.fit(matrix)
+        return self._normalize(matrix)
+
+    def embed(self, texts: list) -> np.ndarray:
+        return self._normalize(self._raw(texts))
+
+    def _normalize(self, matrix: np.ndarray) -> np.ndarray:
+        if self.idf is not None:
+            matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def config(self) -> dict:
+        return {"dim": self.dim, "idf": self.idf.tolist() if self.idf is not None else None}
+
+
+# Pluggable embedders: name -> factory(**config). Register others (e.g. a hosted
+# embedding model) here; the saved index records which one built it.
+EMBEDDERS = {
+    HashingEmbedder.name: HashingEmbedder,
+}
+
+
+def index_path_for(json_path: str) -> str:
+    """Index files live beside their catalogue: data/destinations.json -> data/destinations.vectors.*"""
+    return os.path.splitext(json_path)[0] + ".vectors"
+
+
+def index_is_current(index_path: str, catalogue) -> bool:
+    """True if the saved index at index_path was built from `catalogue`."""
+    try:
+        with open(index_path + ".json") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return meta.get("fingerprint") == catalogue_fingerprint(catalogue) and os.path.exists(index_path + ".npy")
+
+
+def _replace(path: str, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def catalogue_fingerprint(catalogue) -> str:
+    digest = hashlib.sha1()
+    for row in range(len(catalogue)):
+        digest.update(destination_text(catalogue, row).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SemanticIndex:
+    """
+    Cosine top-k over an (n_destinations x dim) row-normalized matrix.
+
+    `norms` keeps each row's length before normalization, so the raw hashed
+    features of unchanged rows can be recovered by `update` instead of being
+    re-embedded.
+    """
+
+    def __init__(self, matrix: np.ndarray, embedder, min_score: float = 0.05, norms: np.ndarray = None):
+        self.matrix = matrix
+        self.embedder = embedder
+        self.min_score = min_score
+        self.norms = norms
+
+    @classmethod
+    def build(cls, catalogue, embedder=None) -> "SemanticIndex":
+        texts = [destination_text(catalogue, row) for row in range(len(catalogue))]
+        embedder = embedder or HashingEmbedder()
+        if isinstance(embedder, HashingEmbedder) and embedder.idf is None:
+            return cls._fit(embedder._raw(texts), embedder)
+        return cls(embedder.embed(texts).astype(np.float32), embedder)
+
+    @classmethod
+    def _fit(cls, raw: np.ndarray, embedder: HashingEmbedder) -> "SemanticIndex":
+        embedder.fit(raw)
+        raw *= embedder.idf
+        norms = np.linalg.norm(raw, axis=1)
+        norms[norms == 0] = 1.0
+        return cls((raw / norms[:, None]).astype(np.float32), embedder, norms=norms.astype(np.float32))
+
+    @classmethod
+    def update(cls, previous: "SemanticIndex", previous_catalogue, catalogue) -> "SemanticIndex":
+        """
+        Index `catalogue`, embedding only destinations whose text is not in
+        `previous_catalogue`; IDF is refitted over all rows. `previous` is not
+        modified.
+        """
+        embedder = previous.embedder
+        if not isinstance(embedder, HashingEmbedder) or embedder.idf is None or previous.norms is None:
+            return cls.build(catalogue)
+
+        old_rows = {}
+        for row in range(len(previous_catalogue)):
+            old_rows.setdefault(destination_text(previous_catalogue, row), row)
+        texts = [destination_text(catalogue, row) for row in range(len(catalogue))]
+        source = np.array([old_rows.get(text, -1) for text in texts], dtype=np.int64)
+
+        raw = np.empty((len(texts), embedder.dim), dtype=np.float32)
+        kept = source >= 0
+        rows = source[kept]
+        raw[kept] = previous.matrix[rows] * (previous.norms[rows, None] / embedder.idf)
+        fresh = np.flatnonzero(~kept)
+        if fresh.size:
+            raw[fresh] = embedder._raw([texts[i] for i in fresh])
+        print(f"Semantic index: reused {int(kept.sum())} rows, embedded {fresh.size}.")
+        return cls._fit(raw, HashingEmbedder(embedder.dim))
+
+    def save(self, path: str, catalogue):
+        # Each file is written beside its target and swapped in, never
+        # rewritten in place: a running server may have the old one mapped.
+        _replace(path + ".npy", lambda f: np.save(f, self.matrix))
+        if self.norms is not None:
+            _replace(path + ".norms.npy", lambda f: np.save(f, self.norms))
+        meta = {
+            "embedder": self.embedder.name,
+            "config": self.embedder.config(),
+            "count": int(self.matrix.shape[0]),
+            "fingerprint": catalogue_fingerprint(catalogue),
+        }
+        _replace(path + ".json", lambda f: f.write(json.dumps(meta).encode()))
+
+    @classmethod
+    def load(cls, path: str, catalogue) -> "SemanticIndex":
+        """Memory-map a prebuilt index; rebuild in memory if it is missing or stale."""
+        try:
+            with open(path + ".json") as f:
+                meta = json.load(f)
+            if meta["fingerprint"] != catalogue_fingerprint(catalogue):
+                raise ValueError("catalogue changed since the index was built")
+            embedder = EMBEDDERS[meta["embedder"]](**meta["config"])
+            matrix = np.load(path + ".npy", mmap_mode="r")
+            norms = np.load(path + ".norms.npy") if os.path.exists(path + ".norms.npy") else None
+            if norms is not None and norms.shape[0] != matrix.shape[0]:
+                norms = None
+            return cls(matrix, embedder, norms=norms)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Semantic index not loaded ({e}); building in memory.")
+            return cls.build(catalogue)
+
+    def search(self, query: str, k: int = 6, mask: np.ndarray = None) -> list:
+        """Return up to k (doc_id, score) pairs, best first, optionally within a boolean row mask."""
+        if not query or self.matrix.shape[0] == 0:
+            return []
+        scores = self.matrix @ self.embedder.embed([query])[0]
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top if scores[i] >= self.min_score]
+
+
+def build_index(json_path: str = DEFAULT_JSON_PATH, index_path: str = None) -> SemanticIndex:
+    index_path = index_path or index_path_for(json_path)
+    catalogue = Catalogue.from_json(json_path)
+    index = SemanticIndex.build(catalogue)
+    index.save(index_path, catalogue)
+    print(f"Built semantic index for {len(catalogue)} destinations at {index_path}.npy")
+    return index
+
+
+if __name__ == "__main__":
+    build_index()
@@ -0,0 +1,211 @@
+"""Prebuilt binary snapshot of the catalogue and its indexes (python snapshot.py rebuilds it)."""
+import os
+import sys
+import json
+import mmap
+import time
+import pickle
+import struct
+import hashlib
+
+from catalogue import Catalogue
+from facets import FacetIndex
+from geo_index import GeoIndex
+from search_index import SearchIndex
+from suggest import SuggestIndex
+from semantic_index import SemanticIndex, index_is_current, index_path_for
+
+# MAGIC | format (u32) | header length (u32) | header JSON | pickle stream |
+# 64-byte aligned raw buffers. numpy arrays are pickled out-of-band into the
+# buffers and come back as zero-copy views over an mmap of the file.
+MAGIC = b"WTSNAP\0\0"
+# Bump when the file layout or the pickled state of any index class
+# (catalogue, search_index, ranking, suggest, semantic_index, facets,
+# geo_index) changes; older snapshots are then rebuilt from the JSON.
+SNAPSHOT_FORMAT_VERSION = 2
+_PREFIX = struct.Struct("<8sII")
+_ALIGN = 64
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_JSON_PATH = os.path.join(BASE_DIR, "data", "destinations.json")
+DEFAULT_SNAPSHOT_PATH = os.path.join(BASE_DIR, "data", "catalogue.snapshot")
+
+
+def snapshot_path_for(json_path: str) -> str:
+    """data/catalogue.snapshot for the default catalogue, else <json stem>.snapshot beside it."""
+    if os.path.abspath(json_path) == os.path.abspath(DEFAULT_JSON_PATH):
+        return DEFAULT_SNAPSHOT_PATH
+    return os.path.splitext(json_path)[0] + ".snapshot"
+
+
+class SnapshotError(Exception):
+    """The snapshot is missing, corrupt, or was built from other data or another format."""
+
+
+def file_sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_indexes(catalogue, semantic_index=None, previous: dict = None) -> dict:
+    """
+    Everything TripAI serves from, built from a catalogue. With `previous`
+    (the indexes of an older catalogue), work for unchanged destinations is
+    reused instead of redone.
+    """
+    if semantic_index is None:
+        if previous is not None:
+            semantic_index = SemanticIndex.update(previous["semantic_index"], previous["catalogue"], catalogue)
+        else:
+            semantic_index = SemanticIndex.build(catalogue)
+    search_index = SearchIndex(catalogue, previous=previous["search_index"] if previous else None)
+    return {
+        "catalogue": catalogue,
+        "search_index": search_index,
+        "suggest_index": SuggestIndex(catalogue),
+        "semantic_index": semantic_index,
+        "facet_index": FacetIndex(catalogue),
+        "geo_index": GeoIndex(catalogue),
+        "top_rated": search_index.ranker.rank([], candidates=range(len(catalogue))),
+    }
+
+
+def load_from_json(json_path: str = DEFAULT_JSON_PATH) -> dict:
+    catalogue = Catalogue.from_json(json_path)
+    return build_indexes(catalogue, SemanticIndex.load(index_path_for(json_path), catalogue))
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def write_snapshot(indexes: dict, path: str, source_sha1: str = None) -> dict:
+    buffers = []
+    payload = pickle.dumps(indexes, protocol=5, buffer_callback=buffers.append)
+    raw = [buf.raw() for buf in buffers]
+
+    # Offsets are relative to the (aligned) start of the data area.
+    spans = []
+    offset = len(payload)
+    for buf in raw:
+        offset = _aligned(offset)
+        spans.append([offset, buf.nbytes])
+        offset += buf.nbytes
+
+    header = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "source_sha1": source_sha1,
+        "created_at": time.time(),
+        "count": len(indexes["catalogue"]),
+        "pickle": [0, len(payload)],
+        "buffers": spans,
+    }
+    header_bytes = json.dumps(header).encode()
+    header_bytes = header_bytes.ljust(_aligned(_PREFIX.size + len(header_bytes)) - _PREFIX.size)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, SNAPSHOT_FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        data_start = f.tell()
+        f.write(payload)
+        for (offset, _), buf in zip(spans, raw):
+            f.write(b"\0" * (data_start + offset - f.tell()))
+            f.write(buf)
+    os.replace(tmp_path, path)
+    return header
+
+
+def read_snapshot(path: str, source_sha1: str = None) -> dict:
+    """Map a snapshot and return its indexes; numpy arrays are views over the mmap."""
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"cannot map {path}: {e}")
+
+    try:
+        magic, version, header_len = _PREFIX.unpack_from(mapped, 0)
+        if magic != MAGIC or version != SNAPSHOT_FORMAT_VERSION:
+            raise SnapshotError(f"unsupported snapshot format in {path}")
+        header = json.loads(bytes(mapped[_PREFIX.size:_PREFIX.size + header_len]))
+        if source_sha1 and header["source_sha1"] != source_sha1:
+            raise SnapshotError("snapshot is older than destinations.json")
+
+        view = memoryview(mapped)[_PREFIX.size + header_len:]
+        start, length = header["pickle"]
+        buffers = [view[offset:offset + size] for offset, size in header["buffers"]]
+        return pickle.loads(view[start:start + length], buffers=buffers)
+    except SnapshotError:
+        raise
+    except Exception as e:
+        # A truncated or corrupt file can fail anywhere in struct, json or pickle.
+        raise SnapshotError(f"corrupt snapshot {path}: {e!r}")
+
+
+def catalogue_version(json_path: str, source_sha1: str = None) -> dict:
+    """Content hash and mtime of the catalogue source (drives HTTP ETag/Last-Modified)."""
+    if not os.path.exists(json_path):
+        return {"sha1": None, "modified": None}
+    return {"sha1": source_sha1 or file_sha1(json_path), "modified": os.path.getmtime(json_path)}
+
+
+def indexes_current(json_path: str) -> bool:
+    """True if json_path's snapshot and semantic index were both built from it in the current format."""
+    try:
+        indexes = read_snapshot(snapshot_path_for(json_path), file_sha1(json_path))
+    except (OSError, SnapshotError):
+        return False
+    return index_is_current(index_path_for(json_path), indexes["catalogue"])
+
+
+def load_indexes(json_path: str = DEFAULT_JSON_PATH, snapshot_path: str = DEFAULT_SNAPSHOT_PATH) -> dict:
+    """
+    Use the snapshot when it matches destinations.json; otherwise parse the JSON.
+    The result also carries the catalogue "version".
+    """
+    source = file_sha1(json_path) if os.path.exists(json_path) else None
+    if os.getenv("CATALOGUE_SNAPSHOT", "1") != "0" and os.path.exists(snapshot_path):
+        try:
+            indexes = read_snapshot(snapshot_path, source)
+            indexes["version"] = catalogue_version(json_path, source)
+            print(f"Loaded {len(indexes['catalogue'])} destinations from snapshot.")
+            return indexes
+        except SnapshotError as e:
+            print(f"Snapshot not used ({e}); falling back to JSON.")
+    indexes = load_from_json(json_path)
+    indexes["version"] = catalogue_version(json_path, source)
+    print(f"Loaded {len(indexes['catalogue'])} destinations from JSON.")
+    return indexes
+
+
+def build_snapshot(json_path: str = DEFAULT_JSON_PATH, snapshot_path: str = None,
+                   incremental: bool = False) -> dict:
+    """
+    Write the snapshot for json_path (to snapshot_path_for(json_path) by
+    default). With `incremental`, the indexes are updated from the existing
+    snapshot (falling back to a full build) and the semantic index files are
+    rewritten to match.
+    """
+    snapshot_path = snapshot_path or snapshot_path_for(json_path)
+    if incremental:
+        catalogue = Catalogue.from_json(json_path)
+        try:
+            previous = read_snapshot(snapshot_path)
+        except SnapshotError as e:
+            print(f"Previous snapshot not reused ({e}); rebuilding all indexes.")
+            previous = None
+        indexes = build_indexes(catalogue, previous=previous)
+        indexes["semantic_index"].save(index_path_for(json_path), catalogue)
+    else:
+        indexes = load_from_json(json_path)
+    header = write_snapshot(indexes, snapshot_path, file_sha1(json_path))
+    print(f"Wrote snapshot of {header['count']} destinations to {snapshot_path}")
+    return header
+
+
+if __name__ == "__main__":
+    build_snapshot(*sys.argv[1:3])
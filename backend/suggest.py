@@ -0,0 +1,115 @@
+import heapq
+import math
+from bisect import bisect_left
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Prefixes up to this length have their top MAX_LIMIT answers precomputed,
+# since one or two keystrokes match the largest slices of the catalogue.
+_PRECOMPUTED_PREFIX_LEN = 2
+_NGRAM = 3
+
+
+def _score(value) -> float:
+    """Coerce a weekend_score value (float, NaN, None) to a float."""
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(score) else score
+
+
+def _ngrams(text: str) -> set:
+    return {text[i:i + _NGRAM] for i in range(len(text) - _NGRAM + 1)}
+
+
+class SuggestIndex:
+    """
+    Autocomplete over destination names, built once at load time.
+
+    Prefix matches come from a sorted array of lowercase keys, infix matches
+    from a trigram index. Within each tier results are ranked by
+    weekend_score (highest first), then alphabetically.
+    """
+
+    def __init__(self, catalogue):
+        best = {}
+        for name, score in zip(catalogue.names, catalogue.weekend_scores):
+            if not name:
+                continue
+            score = _score(score)
+            if name not in best or score > best[name]:
+                best[name] = score
+
+        # Parallel arrays sorted by lowercase key.
+        entries = sorted((name.lower(), name, score) for name, score in best.items())
+        self.keys = [e[0] for e in entries]
+        self.names = [e[1] for e in entries]
+        self.scores = [e[2] for e in entries]
+
+        # Sorted (suffix, pos) pairs for every later word of a name, so short
+        # queries still match "Mount Abu" on "ab" without a trigram.
+        self.word_starts = sorted(
+            (key[i + 1:], pos)
+            for pos, key in enumerate(self.keys)
+            for i, ch in enumerate(key)
+            if ch == " "
+        )
+
+        self.ngrams = {}
+        for pos, key in enumerate(self.keys):
+            for gram in _ngrams(key):
+                self.ngrams.setdefault(gram, []).append(pos)
+
+        self.top_prefix = {}
+        for pos, key in enumerate(self.keys):
+            for length in range(1, min(_PRECOMPUTED_PREFIX_LEN, len(key)) + 1):
+                self.top_prefix.setdefault(key[:length], []).append(pos)
+        for prefix, positions in self.top_prefix.items():
+            self.top_prefix[prefix] = self._rank(positions, MAX_LIMIT)
+
+    def _rank(self, positions, limit: int) -> list:
+        return heapq.nsmallest(limit, positions, key=lambda p: (-self.scores[p], self.keys[p]))
+
+    def _prefix_range(self, prefix: str) -> range:
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\uffff", lo)
+        return range(lo, hi)
+
+    def _infix(self, query: str) -> list:
+        """Positions whose key contains `query` (not necessarily at the start)."""
+        if len(query) < _NGRAM:
+            # Too short for the trigram index: match word starts only.
+            lo = bisect_left(self.word_starts, (query,))
+            hi = bisect_left(self.word_starts, (query + "\uffff",), lo)
+            return list({pos for _, pos in self.word_starts[lo:hi]})
+
+        candidates = None
+        for gram in sorted(_ngrams(query), key=lambda g: len(self.ngrams.get(g, ()))):
+            postings = self.ngrams.get(gram)
+            if not postings:
+                return []
+            candidates = set(postings) if candidates is None else candidates.intersection(postings)
+            if not candidates:
+                return []
+        return [p for p in candidates if query in self.keys[p]]
+
+    def suggest(self, query: str, limit: int = DEFAULT_LIMIT) -> list:
+        """Return up to `limit` destination names matching `query`."""
+        query = (query or "").strip().lower()
+        if not query or not self.keys:
+            return []
+        limit = max(1, min(int(limit), MAX_LIMIT))
+
+        if query in self.top_prefix:
+            ranked = self.top_prefix[query][:limit]
+        else:
+            ranked = self._rank(self._prefix_range(query), limit)
+
+        if len(ranked) < limit:
+            seen = set(ranked)
+            infix = [p for p in self._infix(query) if p not in seen]
+            ranked += self._rank(infix, limit - len(ranked))
+
+        return [self.names[p] for p in ranked]
@@ -0,0 +1,91 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Keep importing ai_service from touching data/ or starting background threads.
+os.environ.setdefault("PEXELS_CACHE_BACKEND", "memory")
+os.environ.setdefault("ITINERARY_CACHE_BACKEND", "memory")
+os.environ.setdefault("CATALOGUE_RELOAD_INTERVAL", "0")
+os.environ.setdefault("PRECOMPUTED_ITINERARIES_PATH", "")
+
+from devservers import OpenAIStandIn, PexelsStandIn  # noqa: E402
+
+
+@pytest.fixture
+def pexels(monkeypatch):
+    """A running Pexels stand-in the Pexels client is pointed at."""
+    with PexelsStandIn() as server:
+        monkeypatch.setenv("PEXELS_API_BASE", server.url)
+        monkeypatch.setenv("PEXELS_API_KEY", "test")
+        yield server
+
+
+def _reset_llm():
+    import llm
+
+    llm._initialized = False
+    llm._client = llm._client_kwargs = None
+    llm._async_clients.clear()
+
+
+@pytest.fixture
+def openai_stand_in(monkeypatch):
+    """A running OpenAI stand-in (0.2s per completion) the LLM client is rebuilt against."""
+    with OpenAIStandIn(latency=0.2) as server:
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url + "/v1")
+        monkeypatch.delenv("GROK_API_KEY", raising=False)
+        _reset_llm()
+        yield server
+    _reset_llm()
+
+
+def _destination(slug, name, state, type_, famous_for, description, best_time, price, distance, score, lat, lon):
+    return {
+        "slug": slug, "Destination": name, "State / UT": state, "Type": type_, "Famous For": famous_for,
+        "Short Description": description, "Best Time to Visit": best_time, "Ideal Duration": "3 Days",
+        "price_inr": price, "distance_from_delhi": distance, "weekend_score": score, "lat": lat, "lon": lon,
+    }
+
+
+# A small hand-made catalogue for the index tests.
+DESTINATIONS = [
+    _destination("goa", "Goa", "Goa", "Beach", "Beaches, nightlife and seafood",
+                 "Sunny shores with shacks, water sports and Portuguese churches.",
+                 "November to February", 12000, 1900, 9.0, 15.4909, 73.8278),
+    _destination("manali", "Manali", "Himachal Pradesh", "Hill Station", "Snow, paragliding and apple orchards",
+                 "A Himalayan town for snow views and river walks.",
+                 "October to June", 15000, 540, 8.5, 32.2432, 77.1892),
+    _destination("mount-abu", "Mount Abu", "Rajasthan", "Hill Station", "Nakki Lake and Dilwara temples",
+                 "The only hill station in Rajasthan, with a cool lake and temples.",
+                 "All year", 8000, 760, 7.0, 24.5926, 72.7156),
+    _destination("jaipur", "Jaipur", "Rajasthan", "Heritage", "Forts, palaces and bazaars",
+                 "The Pink City of forts, palaces and busy bazaars.",
+                 "October to March", 9000, 280, 7.5, 26.9124, 75.7873),
+    _destination("rishikesh", "Rishikesh", "Uttarakhand", "Adventure", "River rafting, yoga and ashrams",
+                 "A Ganga-side town for rafting, yoga retreats and cafes.",
+                 "All year", 7000, 240, 8.0, 30.0869, 78.2676),
+    _destination("varkala", "Varkala", "Kerala", "Beach", "Cliff beach and mineral springs",
+                 "A quiet cliffside beach town on the Arabian Sea.",
+                 "December, January", 18000, 2800, None, 8.7379, 76.7163),
+    _destination("lonavala", "Lonavala", "Maharashtra", "Hill Station", "Waterfalls and chikki",
+                 "A monsoon getaway in the Sahyadri hills.",
+                 "June to September", 6000, 1400, 6.0, None, None),
+]
+
+
+@pytest.fixture(scope="session")
+def catalogue():
+    from catalogue import Catalogue
+
+    return Catalogue(DESTINATIONS)
+
+
+@pytest.fixture(scope="session")
+def row(catalogue):
+    """Row id of a DESTINATIONS slug."""
+    return lambda slug: catalogue.by_slug[slug]
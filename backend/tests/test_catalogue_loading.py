@@ -0,0 +1,42 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from ai_service import TripAI
+from response_cache import ResponseCache
+
+LOAD_SECONDS = 1.0
+
+
+@pytest.fixture
+def slow_service(monkeypatch):
+    service = TripAI()
+    read_indexes = service._read_indexes
+
+    def slow_read():
+        time.sleep(LOAD_SECONDS)   # a stale snapshot rebuilt from a large JSON
+        return read_indexes()
+
+    monkeypatch.setattr(service, "_read_indexes", slow_read)
+    monkeypatch.setattr(main, "ai_service", service)
+    monkeypatch.setattr(main, "response_cache", ResponseCache())
+    return service
+
+
+def test_cold_load_does_not_block_the_event_loop(slow_service):
+    with TestClient(main.app) as client:
+        responses = []
+        loading = threading.Thread(target=lambda: responses.append(client.get("/api/destinations/suggest?q=ja")))
+        loading.start()
+        time.sleep(0.1)
+
+        started = time.perf_counter()
+        assert client.get("/api/itinerary/jobs/missing").json() == {"error": "Job not found"}
+        assert time.perf_counter() - started < LOAD_SECONDS / 2
+
+        loading.join()
+        assert responses[0].status_code == 200
+        assert responses[0].json()
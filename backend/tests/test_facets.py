@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from ai_service import TripAI
+from facets import FacetIndex, months_in, parse_query
+
+
+@pytest.mark.parametrize("text, months", [
+    ("October to March", [9, 10, 11, 0, 1, 2]),
+    ("Sept - Nov", [8, 9, 10]),
+    ("All year", list(range(12))),
+    ("Year-round", list(range(12))),
+    ("March, April", [2, 3]),
+    ("Monsoon", []),
+    (None, []),
+])
+def test_months_in(text, months):
+    assert months_in(text) == months
+
+
+@pytest.fixture(scope="module")
+def index(catalogue):
+    return FacetIndex(catalogue)
+
+
+def _slugs(catalogue, mask):
+    return {catalogue.slugs[i] for i in np.flatnonzero(mask)}
+
+
+@pytest.mark.parametrize("filters, slugs", [
+    ({"Type": ["beach"]}, {"goa", "varkala"}),
+    ({"State / UT": ["Goa", "Kerala"]}, {"goa", "varkala"}),
+    ({"month": ["July"]}, {"mount-abu", "rishikesh", "lonavala"}),
+    ({"month": ["jan", "Smarch"]}, {"goa", "manali", "mount-abu", "jaipur", "rishikesh", "varkala"}),
+    ({"distance_from_delhi": {"lte": 500}}, {"jaipur", "rishikesh"}),
+    ({"weekend_score": {"gt": 8}}, {"goa", "manali"}),
+    ({"weekend_score": {"gte": 0}}, {"goa", "manali", "mount-abu", "jaipur", "rishikesh", "lonavala"}),
+    ({"Type": ["Hill Station"], "price_inr": {"gt": 6000, "lt": 15000}}, {"mount-abu"}),
+    ({"Type": ["Desert"]}, set()),
+])
+def test_mask(index, catalogue, filters, slugs):
+    assert _slugs(catalogue, index.mask(filters)) == slugs
+
+
+def test_no_filters_means_no_mask(index):
+    assert index.mask({}) is None
+    assert index.mask({"Type": [], "distance_from_delhi": {}}) is None
+
+
+def test_counts(index, row):
+    rows = [row("manali"), row("mount-abu"), row("lonavala"), row("varkala")]
+    facets = index.counts(rows)
+    assert facets["Type"] == {"Hill Station": 3, "Beach": 1}
+    assert facets["month"]["July"] == 2 and facets["month"]["January"] == 3
+    assert facets["distance_from_delhi"] == {"min": 540, "max": 2800}
+    assert facets["weekend_score"] == {"min": 6, "max": 8.5}   # Varkala has no score
+    assert index.counts(np.zeros(len(index.months[0]), dtype=bool))["price_inr"] is None
+
+
+@pytest.mark.parametrize("query, text, filters", [
+    ("beach within 500 km in november", "beach",
+     {"distance_from_delhi": {"lte": 500}, "month": ["November"]}),
+    ("score > 7", "", {"weekend_score": {"gt": 7}}),
+    ("hills rating at least 8", "hills", {"weekend_score": {"gte": 8}}),
+    ("score 8+", "", {"weekend_score": {"gte": 8}}),
+    ("budget ₹8000", "", {"price_inr": {"lte": 8000}}),
+    ("price above 20k", "", {"price_inr": {"gte": 20000}}),
+])
+def test_parse_query(query, text, filters):
+    assert parse_query(query) == (text, filters)
+
+
+@pytest.mark.parametrize("query", ["top rated 5 day trip", "rating 5 day", "beach rating of 8", "rated 9"])
+def test_numbers_without_a_comparator_are_not_score_filters(query):
+    assert parse_query(query) == (query, {})
+
+
+@pytest.fixture(scope="module")
+def service():
+    return TripAI()
+
+
+@pytest.mark.parametrize("query", ["top rated 5 day trip", "trip in may", "weekend score > 11"])
+def test_text_filters_matching_nothing_fall_back_to_plain_search(service, query):
+    trips, filters, _ = service._trip_candidates(query, None)
+    assert trips
+    assert filters == {}
+
+
+def test_explicit_filters_matching_nothing_stay_empty(service):
+    trips, filters, _ = service._trip_candidates("trip", {"price_inr": {"lt": 0}})
+    assert trips == []
+    assert filters == {"price_inr": {"lt": 0.0}}
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from catalogue import Catalogue
+from gazetteer import Gazetteer, get_gazetteer, place_key
+from geo_index import GeoIndex, haversine_km, rank_nearby
+
+DELHI = (28.6139, 77.2090)
+
+
+@pytest.fixture(scope="module")
+def index(catalogue):
+    return GeoIndex(catalogue)
+
+
+def _slugs(catalogue, rows):
+    return [catalogue.slugs[r] for r in rows]
+
+
+def test_haversine():
+    # Delhi to Mumbai is about 1150 km as the crow flies.
+    assert haversine_km(*DELHI, np.array([19.0760]), np.array([72.8777]))[0] == pytest.approx(1150, abs=10)
+
+
+def test_destinations_without_coordinates_are_not_indexed(index, catalogue):
+    assert len(index) == len(catalogue) - 1
+    assert "lonavala" not in _slugs(catalogue, index.nearest(*DELHI, k=100)[0])
+
+
+def test_nearest(index, catalogue):
+    rows, distances = index.nearest(*DELHI, k=3)
+    assert _slugs(catalogue, rows) == ["rishikesh", "jaipur", "manali"]
+    assert list(distances) == sorted(distances)
+    assert len(index.nearest(*DELHI, k=100)[0]) == len(index)
+    assert len(index.nearest(*DELHI, k=0)[0]) == 0
+
+
+def test_within_radius(index, catalogue):
+    rows, distances = index.within(*DELHI, radius_km=300)
+    assert _slugs(catalogue, rows) == ["rishikesh", "jaipur"]
+    assert (distances <= 300).all()
+    assert len(index.within(*DELHI, radius_km=100)[0]) == 0
+
+
+@pytest.mark.parametrize("cell_degrees", [0.1, 0.5, 5.0])
+def test_grid_matches_brute_force(cell_degrees):
+    rng = np.random.default_rng(7)
+    lats, lons = rng.uniform(8, 34, 500), rng.uniform(68.5, 97, 500)
+    index = GeoIndex(Catalogue([{"lat": lat, "lon": lon} for lat, lon in zip(lats, lons)]), cell_degrees)
+    for lat, lon, radius in [(28.6, 77.2, 250), (10.0, 76.0, 800), (33.9, 96.9, 40)]:
+        expected = np.flatnonzero(haversine_km(lat, lon, lats, lons) <= radius)
+        assert sorted(index.within(lat, lon, radius)[0]) == sorted(expected)
+        brute = np.argsort(haversine_km(lat, lon, lats, lons), kind="stable")[:7]
+        assert list(index.nearest(lat, lon, 7)[0]) == list(brute)
+
+
+def test_rank_nearby_blends_distance_with_score():
+    distances = np.array([50.0, 60.0, 400.0])
+    scores = np.array([2.0, 9.0, 10.0])
+    assert list(rank_nearby(distances, scores)) == [1, 0, 2]
+    # Missing scores count as neutral; equal blends go to the nearer one.
+    assert list(rank_nearby(np.array([100.0, 90.0]), np.array([np.nan, 5.0]))) == [1, 0]
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Bombay", "Mumbai"),
+    ("  mount-ABU ", "Mount Abu"),
+    ("Gurgaon", "Gurugram"),
+    ("Panjim", "Panaji"),
+])
+def test_gazetteer_lookup(name, expected):
+    assert get_gazetteer().lookup(name)["name"] == expected
+
+
+@pytest.mark.parametrize("name", ["Atlantis", "", None, "Mumbai Beach"])
+def test_gazetteer_unknown_places(name):
+    assert get_gazetteer().lookup(name) is None
+
+
+def test_gazetteer_state_narrows_ambiguous_names():
+    gazetteer = Gazetteer([
+        {"name": "Aurangabad", "state": "Maharashtra", "lat": 19.88, "lon": 75.34, "aliases": []},
+        {"name": "Aurangabad", "state": "Bihar", "lat": 24.75, "lon": 84.37, "aliases": []},
+    ])
+    assert gazetteer.lookup("aurangabad")["state"] == "Maharashtra"
+    assert gazetteer.lookup("Aurangabad", "bihar")["lat"] == 24.75
+    assert gazetteer.lookup("Aurangabad", "Goa")["state"] == "Maharashtra"
+    assert place_key("Mount  Abu!") == "mount abu"
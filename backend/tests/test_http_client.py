@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from ai_service import _fetch_pexels_image, _fetch_pexels_image_async
+from http_client import RateLimit, pexels_rate_limit
+
+
+def test_rate_limit_reads_headers():
+    rate_limit = RateLimit()
+    rate_limit.update({"X-Ratelimit-Limit": "25000", "X-Ratelimit-Remaining": "0", "X-Ratelimit-Reset": "4102444800"})
+    assert rate_limit.snapshot() == {"limit": 25000, "remaining": 0, "reset_at": 4102444800.0}
+    assert rate_limit.exhausted()
+
+
+@pytest.mark.parametrize("headers", [
+    {"X-Ratelimit-Remaining": "n/a"},
+    {"X-Ratelimit-Remaining": "10", "X-Ratelimit-Reset": "soon"},
+    {"X-Ratelimit-Limit": "1.5"},
+])
+def test_malformed_rate_limit_headers_are_ignored(headers):
+    rate_limit = RateLimit()
+    rate_limit.update({"X-Ratelimit-Remaining": "42"})
+    rate_limit.update(headers)
+    assert rate_limit.snapshot() == {"limit": None, "remaining": 42, "reset_at": None}
+
+
+def test_malformed_headers_do_not_fail_the_call(pexels):
+    before = pexels_rate_limit.snapshot()
+    media, cacheable = _fetch_pexels_image("bad headers")
+    assert cacheable and media["image_url"].endswith("/bad-headers-0.jpeg")
+
+    media, cacheable = asyncio.run(_fetch_pexels_image_async("bad headers"))
+    assert cacheable and media["image_url"].endswith("/bad-headers-0.jpeg")
+    assert pexels_rate_limit.snapshot() == before
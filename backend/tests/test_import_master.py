@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from import_master import DEFAULT_EXCEL_PATH, import_master_excel
+from snapshot import DEFAULT_JSON_PATH, DEFAULT_SNAPSHOT_PATH, read_snapshot, snapshot_path_for
+
+DATA_DIR = os.path.dirname(DEFAULT_JSON_PATH)
+PRODUCTION_FILES = [DEFAULT_JSON_PATH, DEFAULT_SNAPSHOT_PATH] + [
+    os.path.join(DATA_DIR, "destinations.vectors" + suffix) for suffix in (".npy", ".norms.npy", ".json")]
+
+pytestmark = pytest.mark.skipif(not os.path.exists(DEFAULT_EXCEL_PATH), reason="master workbook not present")
+
+
+def _mtimes():
+    return {path: os.stat(path).st_mtime_ns for path in PRODUCTION_FILES if os.path.exists(path)}
+
+
+@pytest.mark.parametrize("full", [False, True])
+def test_custom_output_writes_indexes_beside_it(tmp_path, full):
+    before = _mtimes()
+    json_path = str(tmp_path / "scratch.json")
+    import_master_excel(DEFAULT_EXCEL_PATH, json_path, full=full)
+
+    assert _mtimes() == before
+    assert snapshot_path_for(json_path) == str(tmp_path / "scratch.snapshot")
+    assert read_snapshot(str(tmp_path / "scratch.snapshot"))["catalogue"] is not None
+    assert os.path.exists(tmp_path / "scratch.vectors.npy")
+
+
+def test_unchanged_catalogue_rebuilds_stale_indexes(tmp_path):
+    json_path = str(tmp_path / "scratch.json")
+    snapshot_path = str(tmp_path / "scratch.snapshot")
+    import_master_excel(DEFAULT_EXCEL_PATH, json_path)
+    written = os.stat(snapshot_path).st_mtime_ns
+
+    import_master_excel(DEFAULT_EXCEL_PATH, json_path)   # nothing to do
+    assert os.stat(snapshot_path).st_mtime_ns == written
+
+    os.remove(str(tmp_path / "scratch.vectors.npy"))
+    with open(snapshot_path, "r+b") as f:
+        f.write(b"garbage!")
+    import_master_excel(DEFAULT_EXCEL_PATH, json_path)
+    assert read_snapshot(snapshot_path)["catalogue"] is not None
+    assert os.path.exists(tmp_path / "scratch.vectors.npy")
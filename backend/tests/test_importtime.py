@@ -0,0 +1,17 @@
+import os
+import statistics
+
+from benchmarks.importtime import FORBIDDEN, run_once
+
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 150))
+TOTAL_BUDGET_MS = float(os.getenv("IMPORT_TOTAL_BUDGET_MS", 1500))
+
+
+def test_import_main_stays_light_and_within_budget():
+    runs = [run_once() for _ in range(3)]
+
+    heavy = sorted({name.split(".")[0] for run in runs for name in run} & set(FORBIDDEN))
+    assert not heavy, f"heavy modules imported eagerly: {heavy}"
+    for module, budget in (("ai_service", BUDGET_MS), ("main", TOTAL_BUDGET_MS)):
+        elapsed = statistics.median(run[module] for run in runs) / 1000
+        assert elapsed <= budget, f"{module} imports in {elapsed:.1f}ms, over the {budget:.0f}ms budget"
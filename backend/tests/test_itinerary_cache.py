@@ -0,0 +1,95 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import ai_service
+from ai_service import TripAI
+from itinerary_cache import ItineraryCache
+from media_cache import MemoryBackend, SQLiteBackend
+
+JAIPUR = {"Destination": "Jaipur", "State / UT": "Rajasthan", "Type": "Heritage", "Ideal Duration": "3 Days"}
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    """Fresh in-memory itinerary and precomputed stores for ai_service."""
+    monkeypatch.setattr(ai_service, "itinerary_cache", ItineraryCache(MemoryBackend()))
+    monkeypatch.setattr(ai_service, "precomputed_itineraries", ItineraryCache(MemoryBackend()))
+    return ai_service.itinerary_cache
+
+
+def _key(query: str) -> str:
+    args = TripAI._itinerary_args(query, JAIPUR)
+    return TripAI()._concierge_request(*args)[2]
+
+
+def test_concurrent_identical_requests_make_one_call(openai_stand_in, caches):
+    service = TripAI()
+    args = ("Jaipur", "Rajasthan", "Heritage", "forts and food", "3 Days")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: service._generate_itinerary(*args), range(8)))
+
+    assert openai_stand_in.request_count == 1
+    assert all(result == results[0] for result in results)
+    assert results[0]["header"].endswith("3-day itinerary for Jaipur.")
+    assert caches.stats()["misses"] == 1
+
+    service._generate_itinerary(*args)
+    assert openai_stand_in.request_count == 1
+
+
+def test_concurrent_identical_async_requests_make_one_call(openai_stand_in, caches):
+    service = TripAI()
+    args = ("Jaipur", "Rajasthan", "Heritage", "forts and food", "3 Days")
+
+    async def run():
+        return await asyncio.gather(*(service._generate_itinerary_async(*args) for _ in range(8)))
+
+    results = asyncio.run(run())
+    assert openai_stand_in.request_count == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_personalized_and_generic_queries_get_different_keys(openai_stand_in):
+    generic = _key("jaipur")
+    assert _key("Trip to Jaipur, Rajasthan") == generic
+    assert _key("jaipur weekend") == generic
+
+    personalized = _key("jaipur with kids")
+    assert personalized != generic
+    assert _key("  Jaipur WITH kids ") == personalized
+    assert _key("jaipur for a honeymoon") not in (generic, personalized)
+
+
+def test_entry_expires_after_ttl():
+    cache = ItineraryCache(MemoryBackend(), ttl=0.2)
+    calls = []
+
+    def generate():
+        calls.append(True)
+        return {"header": f"plan {len(calls)}"}, True
+
+    assert cache.get_or_generate("k", generate) == {"header": "plan 1"}
+    assert cache.get_or_generate("k", generate) == {"header": "plan 1"}
+    time.sleep(0.3)
+    assert cache.get_or_generate("k", generate) == {"header": "plan 2"}
+    assert len(calls) == 2
+
+
+def test_uncacheable_results_are_not_stored():
+    cache = ItineraryCache(MemoryBackend())
+    cache.get_or_generate("k", lambda: ({"header": "default"}, False))
+    assert cache.get("k") is None
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_store_stays_within_size_bound(backend, tmp_path):
+    store = MemoryBackend(3) if backend == "memory" else SQLiteBackend(str(tmp_path / "it.sqlite3"), 3, "itineraries")
+    cache = ItineraryCache(store)
+    for n in range(5):
+        cache.get_or_generate(f"k{n}", lambda: ({"header": "plan"}, True))
+    assert len(cache.backend) == 3
+    assert cache.get("k0") is None
+    assert cache.get("k4") is not None
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import ai_service
+import itinerary_stream
+import main
+from itinerary_cache import ItineraryCache
+from itinerary_stream import ItineraryStreamParser, itinerary_events
+from media_cache import MemoryBackend
+
+ITINERARY = {
+    "header": 'A "quoted" {braced} header, with commas ] and a backslash \\',
+    "days": [
+        {"day_label": "Day 1", "morning": ["Fort {east}", "Tea, then \"chai\""], "notes": {"spots": [1, 2]}},
+        {"day_label": "Day 2", "morning": [], "evening": ["Sunset ]["]},
+    ],
+    "budget": 12500.5,
+    "walkable": True,
+    "weather_note": None,
+    "packing_list": ["Hat", "Shoes"],
+    "footer": "Fin.",
+}
+
+
+def _feed(text: str, size: int) -> tuple:
+    parser = ItineraryStreamParser()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return parser, events
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 24, 10_000])
+def test_every_chunking_yields_the_complete_itinerary_events(size):
+    parser, events = _feed(json.dumps(ITINERARY, indent=2), size)
+
+    assert events == itinerary_events(ITINERARY)
+    assert parser.done
+    assert parser.result == ITINERARY
+
+
+def test_preamble_and_fences_are_ignored():
+    text = "Sure! Here is your plan:\n```json\n" + json.dumps(ITINERARY) + "\n```\nEnjoy."
+    parser, events = _feed(text, 5)
+
+    assert events == itinerary_events(ITINERARY)
+    assert parser.result == ITINERARY
+
+
+def test_days_are_emitted_before_the_object_closes():
+    text = json.dumps(ITINERARY)
+    first_day_end = text.index('"day_label": "Day 2"')
+    parser = ItineraryStreamParser()
+
+    events = parser.feed(text[:first_day_end])
+
+    assert events == [("header", ITINERARY["header"]), ("day", ITINERARY["days"][0])]
+    assert not parser.done
+
+
+def test_scalar_array_elements_are_streamed(monkeypatch):
+    monkeypatch.setitem(itinerary_stream.STREAMED_ARRAYS, "waypoints", "waypoint")
+    parser, events = _feed('{"waypoints": ["Old Fort", 3, null], "footer": "x"}', 1)
+
+    assert events == [("waypoint", "Old Fort"), ("waypoint", 3), ("waypoint", None), ("footer", "x")]
+
+
+def test_truncated_stream_is_not_done():
+    text = json.dumps(ITINERARY)
+    parser, events = _feed(text[:-20], 4)
+
+    assert not parser.done
+    assert ("day", ITINERARY["days"][1]) in events
+    assert "footer" not in parser.result
+
+
+def test_input_after_the_object_is_ignored():
+    parser = ItineraryStreamParser()
+    parser.feed('{"header": "h"}')
+
+    assert parser.feed('{"header": "again"}') == []
+    assert parser.result == {"header": "h"}
+
+
+def _sse(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def itinerary_cache(monkeypatch):
+    cache = ItineraryCache(MemoryBackend())
+    monkeypatch.setattr(ai_service, "itinerary_cache", cache)
+    return cache
+
+
+def test_stream_route_sends_days_then_done(openai_stand_in, itinerary_cache):
+    with TestClient(main.app) as client:
+        response = client.get("/api/generate-itinerary/stream", params={"destination": "Jaipur"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse(response.text)
+    names = [event for event, _ in events]
+    assert names[0] == "header"
+    assert names[-1] == "done"
+    assert names.count("day") == 3
+
+    itinerary = events[-1][1]
+    assert events[:-1] == itinerary_events(itinerary)
+    assert openai_stand_in.request_count == 1
+
+
+def test_stream_route_replays_cached_plans(openai_stand_in, itinerary_cache):
+    with TestClient(main.app) as client:
+        first = _sse(client.get("/api/generate-itinerary/stream", params={"destination": "Jaipur"}).text)
+        second = _sse(client.get("/api/generate-itinerary/stream", params={"destination": "Jaipur"}).text)
+
+    assert second == first
+    assert openai_stand_in.request_count == 1
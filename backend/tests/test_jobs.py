@@ -0,0 +1,80 @@
+import time
+import threading
+
+from jobs import DONE, RUNNING, TIMEOUT, JobQueue
+
+
+def test_running_job_is_not_resubmitted_past_its_deadline():
+    queue = JobQueue(workers=2, max_pending=2, timeout=0.1)
+    release = threading.Event()
+    calls = []
+
+    def slow(deadline):
+        calls.append(deadline)
+        release.wait(2)
+        return "plan"
+
+    job = queue.submit("goa|", slow)
+    time.sleep(0.3)   # overdue but still running
+    assert job.status == RUNNING
+    assert queue.submit("goa|", slow) is job
+    assert queue.pending() == 1
+    release.set()
+    job.finished.wait(1)
+    assert job.status == DONE
+    assert len(calls) == 1
+
+
+def test_job_gets_its_deadline_and_can_time_out():
+    queue = JobQueue(workers=1, timeout=0.2)
+
+    def bounded(deadline):
+        assert 0 < deadline - time.time() <= 0.2
+        time.sleep(max(deadline - time.time(), 0))
+        raise TimeoutError("no time left")
+
+    job = queue.submit("jaipur|", bounded)
+    assert job.finished.wait(1)
+    assert job.status == TIMEOUT
+    assert job.to_dict() == {"id": job.id, "status": TIMEOUT}
+
+    retry = queue.submit("jaipur|", lambda deadline: "plan")
+    assert retry is not job
+    retry.finished.wait(1)
+    assert retry.to_dict()["itinerary"] == "plan"
+
+
+def test_itinerary_job_stops_at_its_deadline(openai_stand_in, monkeypatch):
+    import ai_service
+    from itinerary_cache import ItineraryCache
+    from media_cache import MemoryBackend
+
+    monkeypatch.setattr(ai_service, "itinerary_cache", ItineraryCache(MemoryBackend()))
+    openai_stand_in.latency = 2.0
+    started = time.time()
+    plan = ai_service.TripAI()._generate_itinerary(
+        "Jaipur", "Rajasthan", "Heritage", "forts", "3 Days", deadline=time.time() + 0.3)
+    assert time.time() - started < 1.0
+    assert plan["header"].startswith("Here's a thoughtfully paced 3-day itinerary")
+
+
+def test_async_long_poll_holds_no_threads():
+    import asyncio
+
+    queue = JobQueue(workers=1)
+    release = threading.Event()
+    job = queue.submit("udaipur|", lambda deadline: release.wait(2) and "plan")
+
+    async def poll():
+        threads = threading.active_count()
+        timed_out = await queue.wait_async(job.id, 0.1)
+        assert timed_out.status == RUNNING
+        waiters = [asyncio.ensure_future(queue.wait_async(job.id, 5)) for _ in range(100)]
+        await asyncio.sleep(0.05)
+        assert threading.active_count() == threads
+        release.set()
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(poll())
+    assert all(result.to_dict() == {"id": job.id, "status": DONE, "itinerary": "plan"} for result in results)
+    assert job._callbacks == []
@@ -0,0 +1,75 @@
+import time
+
+from ai_service import _fetch_pexels_image
+from media_cache import MediaCache, MemoryBackend, SQLiteBackend
+
+
+def test_hit_skips_upstream(pexels):
+    cache = MediaCache(MemoryBackend())
+    first = cache.get_or_fetch("Goa beach", _fetch_pexels_image)
+    second = cache.get_or_fetch("  goa   BEACH ", _fetch_pexels_image)
+    assert first["image_url"].endswith("/goa-beach-0.jpeg")
+    assert second == first
+    assert pexels.request_count == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_entry_expires_after_ttl(pexels):
+    cache = MediaCache(MemoryBackend(), ttl=0.2)
+    cache.get_or_fetch("manali", _fetch_pexels_image)
+    cache.get_or_fetch("manali", _fetch_pexels_image)
+    assert pexels.request_count == 1
+    time.sleep(0.3)
+    cache.get_or_fetch("manali", _fetch_pexels_image)
+    assert pexels.request_count == 2
+
+
+def test_lru_evicts_least_recently_used(pexels):
+    cache = MediaCache(MemoryBackend(max_size=2))
+    for query in ("a", "b", "a", "c"):   # "a" is refreshed, so "b" is the one evicted
+        cache.get_or_fetch(query, _fetch_pexels_image)
+    assert len(cache.backend) == 2
+    assert pexels.request_count == 3
+
+    cache.get_or_fetch("a", _fetch_pexels_image)
+    assert pexels.request_count == 3
+    cache.get_or_fetch("b", _fetch_pexels_image)
+    assert pexels.request_count == 4
+
+
+def test_empty_results_are_negatively_cached(pexels):
+    cache = MediaCache(MemoryBackend(), ttl=60, negative_ttl=0.2)
+    assert cache.get_or_fetch("empty", _fetch_pexels_image) == {"image_url": None}
+    cache.get_or_fetch("empty", _fetch_pexels_image)
+    assert pexels.request_count == 1
+    assert cache.stats()["negative_hits"] == 1
+
+    time.sleep(0.3)
+    cache.get_or_fetch("empty", _fetch_pexels_image)
+    assert pexels.request_count == 2
+
+
+def test_failed_lookups_are_not_cached(pexels, monkeypatch):
+    monkeypatch.setenv("PEXELS_API_BASE", pexels.url + "/missing")   # stand-in answers 404
+    cache = MediaCache(MemoryBackend())
+    assert cache.get_or_fetch("jaipur", _fetch_pexels_image) == {"image_url": None}
+    cache.get_or_fetch("jaipur", _fetch_pexels_image)
+    assert pexels.request_count == 2
+    assert len(cache.backend) == 0
+
+
+def test_sqlite_entries_survive_restart(pexels, tmp_path):
+    path = str(tmp_path / "media.sqlite3")
+    first = MediaCache(SQLiteBackend(path)).get_or_fetch("udaipur", _fetch_pexels_image)
+
+    restarted = MediaCache(SQLiteBackend(path))
+    assert restarted.get_or_fetch("udaipur", _fetch_pexels_image) == first
+    assert pexels.request_count == 1
+    assert restarted.stats()["hits"] == 1
+
+
+def test_sqlite_store_stays_within_size_bound(pexels, tmp_path):
+    cache = MediaCache(SQLiteBackend(str(tmp_path / "media.sqlite3"), max_size=2))
+    for query in ("a", "b", "c"):
+        cache.get_or_fetch(query, _fetch_pexels_image)
+    assert len(cache.backend) == 2
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from ai_service import _fetch_background_videos
+from media_pool import MediaPool
+
+
+@pytest.fixture(autouse=True)
+def no_refresher(monkeypatch):
+    # Tests drive refresh_stale themselves.
+    monkeypatch.setattr(MediaPool, "_start_refresher", lambda self: None)
+
+
+def test_pick_fills_pool_once(pexels):
+    pool = MediaPool(_fetch_background_videos, size=5)
+    first = pool.pick("clouds moving")
+    assert first["video_url"].startswith("https://videos.pexels.test/clouds-moving-")
+    assert first["video_url"].endswith("-hd.mp4")
+    for _ in range(10):
+        pool.pick("  Clouds MOVING ")
+    assert pexels.request_count == 1
+    assert pool.stats()["candidates"] == 5
+
+
+def test_stale_pools_are_refreshed(pexels):
+    pool = MediaPool(_fetch_background_videos, size=2, refresh_interval=0.1)
+    pool.pick("timelapse")
+    pool.refresh_stale()
+    assert pexels.request_count == 1
+    time.sleep(0.2)
+    pool.refresh_stale()
+    assert pexels.request_count == 2
+
+
+def test_failed_refresh_keeps_serving_previous_pool(pexels, monkeypatch):
+    pool = MediaPool(_fetch_background_videos, size=2)
+    pool.pick("city lights")
+    monkeypatch.setenv("PEXELS_API_BASE", pexels.url + "/missing")
+    pool.refresh("city lights")
+    assert pool.pick("city lights") is not None
+    assert pool.stats()["candidates"] == 2
+
+
+def test_least_recently_picked_pool_is_evicted(pexels):
+    pool = MediaPool(_fetch_background_videos, size=1, max_pools=2)
+    for query in ("a", "b", "a", "c"):   # "a" is picked again, so "b" is the one evicted
+        pool.pick(query)
+    assert pool.stats()["pools"] == 2
+    assert pool.stats()["evicted"] == 1
+    assert pexels.request_count == 3
+
+    pool.pick("a")
+    assert pexels.request_count == 3
+    pool.pick("b")
+    assert pexels.request_count == 4
+
+
+def test_idle_pools_are_dropped_not_refreshed(pexels):
+    pool = MediaPool(_fetch_background_videos, size=1, refresh_interval=0.1, idle_ttl=0.1)
+    pool.pick("forgotten")
+    time.sleep(0.2)
+    pool.refresh_stale()
+    assert pexels.request_count == 1
+    assert pool.stats()["pools"] == 0
+
+
+def test_saved_pools_are_reloaded_within_bound(pexels, tmp_path):
+    path = str(tmp_path / "pools.json")
+    pool = MediaPool(_fetch_background_videos, size=1, path=path)
+    for query in ("a", "b", "c"):
+        pool.pick(query)
+        time.sleep(0.01)
+
+    restarted = MediaPool(_fetch_background_videos, size=1, max_pools=2, path=path)
+    assert restarted.stats()["pools"] == 2
+    restarted.pick("c")
+    assert pexels.request_count == 3
@@ -0,0 +1,122 @@
+import pytest
+
+import prompts
+from prompts import (
+    MAX_QUERY_TOKENS, clip_tokens, completion_budget, concierge_messages, cost_usd, count_tokens,
+    duration_days, llm_route, trip_days,
+)
+
+
+@pytest.mark.parametrize("duration, days", [
+    ("3 Days", 3),
+    ("2-3 Days", 3),
+    ("1 Day", 1),
+    ("Weekend (2 days)", 2),
+    ("7-10 Days", prompts.MAX_DAYS),
+    ("0 Days", prompts.DEFAULT_DAYS),
+    ("A few days", prompts.DEFAULT_DAYS),
+    ("", prompts.DEFAULT_DAYS),
+    (None, prompts.DEFAULT_DAYS),
+    (4, 4),
+])
+def test_trip_days(duration, days):
+    assert trip_days(duration) == days
+
+
+@pytest.mark.parametrize("duration, days", [
+    ("2-3 Days", [2, 3]),
+    ("3 Days", [3]),
+    ("4-8 Days", [4, 5]),
+    ("0-2 Days", [2]),
+    (None, [prompts.DEFAULT_DAYS]),
+])
+def test_duration_days(duration, days):
+    assert duration_days(duration) == days
+
+
+def test_completion_budget_grows_per_day(monkeypatch):
+    base, per_day = prompts.COMPLETION_BUDGETS["concierge"]
+    assert completion_budget("concierge", 1) == base + per_day
+    assert completion_budget("concierge", 4) - completion_budget("concierge", 3) == per_day
+
+    monkeypatch.setattr(prompts, "BUDGET_SCALE", 1.5)
+    assert completion_budget("concierge", 1) == int((base + per_day) * 1.5 + 0.999)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    def use(name):
+        monkeypatch.setattr(prompts, "get_provider", lambda: name)
+    use("openai")
+    return use
+
+
+def test_short_concierge_trips_use_the_short_route(provider):
+    short = llm_route("concierge", prompts.SHORT_TRIP_DAYS)
+    longer = llm_route("concierge", prompts.SHORT_TRIP_DAYS + 1)
+
+    assert short.models == prompts.MODEL_ROUTES["openai"]["short"]
+    assert longer.models == prompts.MODEL_ROUTES["openai"]["concierge"]
+    assert short.model == "gpt-4o-mini"
+    assert longer.max_tokens > short.max_tokens
+    assert longer.timeout > short.timeout
+
+
+def test_planner_route_and_timeout(provider):
+    route = llm_route("planner")
+
+    assert route.purpose == "planner"
+    assert route.models == ("gpt-4o", "gpt-4o-mini")
+    assert route.max_tokens == completion_budget("planner", prompts.PLANNER_DAYS)
+    assert route.timeout == pytest.approx(prompts.TIMEOUT_BASE + route.max_tokens / prompts.TOKENS_PER_SECOND)
+
+
+def test_routes_follow_the_provider(provider):
+    provider("grok")
+    assert llm_route("planner").models == ("grok-2-latest",)
+
+    provider(None)
+    route = llm_route("planner")
+    assert route.models == ()
+    assert route.model is None
+
+
+def test_environment_overrides_models(provider, monkeypatch):
+    monkeypatch.setenv("LLM_MODELS_SHORT", " local-small , , local-tiny")
+    monkeypatch.setenv("LLM_MODELS_PLANNER", "local-large")
+
+    assert llm_route("concierge", 1).models == ("local-small", "local-tiny")
+    assert llm_route("concierge", 5).models == prompts.MODEL_ROUTES["openai"]["concierge"]
+    assert llm_route("planner").models == ("local-large",)
+
+
+def test_cost_usd():
+    assert cost_usd("gpt-4o-mini", 1_000_000, 1_000_000) == pytest.approx(0.75)
+    assert cost_usd("unknown-model", 100, 100) is None
+
+
+def test_count_tokens():
+    assert count_tokens("") == 0
+    assert count_tokens(None) == 0
+    assert count_tokens("Goa beaches") == 3      # "Goa", "beache", "s"
+    assert count_tokens("12345, ok!") == 5       # "123", "45", ",", "ok", "!"
+
+
+def test_clip_tokens():
+    assert clip_tokens("  forts   and\nfood ") == "forts and food"
+    assert clip_tokens(None) == ""
+
+    long_query = " ".join(["temple"] * (MAX_QUERY_TOKENS + 30))
+    clipped = clip_tokens(long_query)
+    assert clipped.endswith("...")
+    assert count_tokens(clipped[:-3]) == MAX_QUERY_TOKENS
+    assert clip_tokens("one two three", limit=2) == "one two..."
+
+
+def test_prompts_clip_the_query_and_fill_defaults():
+    messages = concierge_messages("Jaipur", "Rajasthan", "Heritage", "", 3)
+    assert prompts.DEFAULT_PLAN_QUERY in messages[1]["content"]
+    assert "3-day trip to Jaipur, Rajasthan (Heritage)" in messages[1]["content"]
+
+    messages = concierge_messages("Jaipur", "Rajasthan", "Heritage", "forts " * 500, 3)
+    assert ("forts " * (MAX_QUERY_TOKENS - 1) + 'forts..."') in messages[1]["content"]
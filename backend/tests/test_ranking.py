@@ -0,0 +1,76 @@
+import pytest
+
+from catalogue import Catalogue
+from ranking import FUZZY_WEIGHT, PREFIX_WEIGHT, BM25Ranker, edit_distance, max_edits
+
+
+@pytest.fixture(scope="module")
+def ranker(catalogue):
+    return BM25Ranker(catalogue)
+
+
+@pytest.mark.parametrize("term, edits", [("goa", 0), ("yoga", 1), ("manali", 1), ("rishikesh", 2)])
+def test_edit_budget_grows_with_term_length(term, edits):
+    assert max_edits(term) == edits
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("manali", "manali", 0),
+    ("manalli", "manali", 1),
+    ("rishikseh", "rishikesh", 1),   # transposition
+    ("jaipur", "jiapru", 2),
+    ("goa", "delhi", 3),             # over the limit
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b, 2) == distance
+
+
+def test_name_hits_outweigh_description_hits():
+    ranker = BM25Ranker(Catalogue([
+        {"Destination": "Kodai", "Short Description": "A misty lake and pine forests."},
+        {"Destination": "Lake Pichola", "Short Description": "Palaces on the water."},
+    ]))
+    assert ranker.rank(["lake"]) == [1, 0]
+
+
+def test_equal_scores_break_ties_on_weekend_score():
+    ranker = BM25Ranker(Catalogue([
+        {"Destination": "A", "Type": "Beach", "weekend_score": 5},
+        {"Destination": "B", "Type": "Beach", "weekend_score": 9},
+        {"Destination": "C", "Type": "Beach"},
+    ]))
+    assert ranker.rank(["beach"]) == [1, 0, 2]
+
+
+@pytest.mark.parametrize("term, slug", [
+    ("manalli", "manali"),
+    ("rishikseh", "rishikesh"),
+    ("paraglidng", "manali"),
+    ("paragl", "manali"),            # prefix
+])
+def test_typos_and_prefixes_still_match(ranker, row, term, slug):
+    assert ranker.rank([term]) == [row(slug)]
+
+
+def test_expansion_weights(ranker):
+    assert ranker.expand("rafting") == {"rafting": 1.0}
+    assert ranker.expand("raftng") == {"rafting": FUZZY_WEIGHT[1]}
+    assert ranker.expand("paragl") == {"paragliding": PREFIX_WEIGHT}
+
+
+@pytest.mark.parametrize("term", ["goz", "yog", "paris", "shoreline"])
+def test_no_false_matches(ranker, term):
+    assert ranker.rank([term]) == []
+
+
+def test_fuzzy_matching_stays_within_the_edit_budget(ranker, row):
+    # "yoga" is two edits from "goa", over its budget of one.
+    assert ranker.rank(["yoga"]) == [row("rishikesh")]
+
+
+def test_exact_hits_outrank_fuzzy_ones():
+    ranker = BM25Ranker(Catalogue([
+        {"Destination": "A", "Famous For": "forts"},
+        {"Destination": "B", "Famous For": "fort"},
+    ]))
+    assert ranker.rank(["fort"]) == [1, 0]
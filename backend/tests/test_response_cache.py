@@ -0,0 +1,200 @@
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+import ai_service
+import main
+from media_cache import MediaCache, MemoryBackend
+from response_cache import (
+    NO_STORE, SUGGEST_CACHE_CONTROL, ResponseCache, _http_date, is_not_modified, request_key,
+)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "response_cache", ResponseCache())
+    monkeypatch.setattr(ai_service, "media_cache", MediaCache(MemoryBackend()))
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def pexels_enabled(pexels, monkeypatch):
+    monkeypatch.setattr(ai_service, "PEXELS_API_KEY", "test")
+    return pexels
+
+
+def _assert_cached_with_etag(client, response):
+    assert response.status_code == 200
+    assert response.headers["cache-control"] != NO_STORE
+    etag = response.headers["etag"]
+    revalidated = client.get("/api/destinations/jaipur", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+
+
+def test_destination_with_media_is_cached(client, pexels_enabled):
+    response = client.get("/api/destinations/jaipur")
+    assert response.json()["image_url"]
+    _assert_cached_with_etag(client, response)
+
+
+def test_destination_without_pexels_key_is_cached(client, monkeypatch):
+    monkeypatch.setattr(ai_service, "PEXELS_API_KEY", None)
+    response = client.get("/api/destinations/jaipur")
+    assert response.json()["image_url"] is None
+    _assert_cached_with_etag(client, response)
+
+
+def test_destination_with_negatively_cached_media_is_cached(client, pexels_enabled):
+    query = main.ai_service._media_query(main.ai_service._destination_record("jaipur"))
+    ai_service.media_cache.get_or_fetch(query, lambda q: ({"image_url": None}, True), namespace="image")
+    ai_service.media_cache.get_or_fetch(query, lambda q: ({"video_url": None}, True), namespace="video")
+    response = client.get("/api/destinations/jaipur")
+    assert response.json()["image_url"] is None
+    assert pexels_enabled.request_count == 0
+    _assert_cached_with_etag(client, response)
+
+
+def test_failed_media_lookup_is_not_stored_but_keeps_etag(client, pexels_enabled, monkeypatch):
+    monkeypatch.setenv("PEXELS_API_BASE", pexels_enabled.url + "/missing")
+    response = client.get("/api/destinations/jaipur")
+    assert response.headers["cache-control"] == NO_STORE
+    assert response.headers["etag"]
+
+    monkeypatch.setenv("PEXELS_API_BASE", pexels_enabled.url)
+    assert client.get("/api/destinations/jaipur").json()["image_url"]   # rebuilt, not served stale
+
+
+def _request(path="/api/test", query=b"", **headers) -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": path, "query_string": query,
+        "headers": [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+MODIFIED = 1_700_000_000
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"If_None_Match": 'W/"abc"'}, True),
+    ({"If_None_Match": '"abc"'}, True),                       # weak comparison
+    ({"If_None_Match": 'W/"xyz", W/"abc"'}, True),
+    ({"If_None_Match": "*"}, True),
+    ({"If_None_Match": 'W/"xyz"'}, False),
+    ({"If_None_Match": 'W/"xyz"', "If_Modified_Since": _http_date(MODIFIED)}, False),   # ETag wins
+    ({"If_Modified_Since": _http_date(MODIFIED)}, True),
+    ({"If_Modified_Since": _http_date(MODIFIED + 60)}, True),
+    ({"If_Modified_Since": _http_date(MODIFIED - 60)}, False),
+    ({"If_Modified_Since": "not a date"}, False),
+    ({}, False),
+])
+def test_is_not_modified(headers, expected):
+    assert is_not_modified(_request(**headers), 'W/"abc"', MODIFIED + 0.5) is expected
+
+
+def test_request_key_ignores_parameter_order():
+    assert request_key(_request(query=b"b=2&a=1&a=0")) == request_key(_request(query=b"a=1&a=0&b=2"))
+
+
+def test_versioned_conditional_request_is_answered_without_building():
+    cache = ResponseCache()
+    version = {"sha1": "v1", "modified": MODIFIED}
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"n": len(builds)}, True
+
+    first = cache.respond(_request(), build, "public", version=version)
+    assert first.headers["last-modified"] == _http_date(MODIFIED)
+
+    revalidated = cache.respond(_request(If_None_Match=first.headers["etag"]), build, "public", version=version)
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == first.headers["etag"]
+    assert revalidated.headers["cache-control"] == "public"
+    assert len(builds) == 1
+    assert cache.stats()["not_modified"] == 1
+
+
+def test_catalogue_version_change_invalidates_entries():
+    cache = ResponseCache()
+    version = {"sha1": "v1", "modified": MODIFIED}
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"n": len(builds)}, True
+
+    old = cache.respond(_request(), build, "public", version=version)
+    assert cache.respond(_request(), build, "public", version=version).body == old.body
+    assert len(builds) == 1
+
+    version = {"sha1": "v2", "modified": MODIFIED + 60}
+    new = cache.respond(_request(If_None_Match=old.headers["etag"]), build, "public", version=version)
+    assert new.status_code == 200
+    assert new.headers["etag"] != old.headers["etag"]
+    assert new.body != old.body
+    assert len(builds) == 2
+
+
+def test_versionless_routes_use_body_validators():
+    cache = ResponseCache()
+    payload = {"video_url": "a.mp4"}
+
+    first = cache.respond(_request(), lambda: (payload, True), "public")
+    same_body = ResponseCache().respond(_request(), lambda: (payload, True), "public")
+    assert first.headers["etag"] == same_body.headers["etag"]
+
+    revalidated = cache.respond(_request(If_None_Match=first.headers["etag"]), lambda: (payload, True), "public")
+    assert revalidated.status_code == 304
+    by_date = cache.respond(_request(If_Modified_Since=first.headers["last-modified"]), lambda: (payload, True),
+                            "public")
+    assert by_date.status_code == 304
+
+    other = ResponseCache().respond(_request(), lambda: ({"video_url": "b.mp4"}, True), "public")
+    assert other.headers["etag"] != first.headers["etag"]
+
+
+def test_uncacheable_versionless_responses_have_no_validators():
+    cache = ResponseCache()
+    response = cache.respond(_request(If_None_Match="*"), lambda: ({"error": "busy"}, False), "public")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == NO_STORE
+    assert "etag" not in response.headers
+    assert cache.backend.get(request_key(_request())) is None
+
+
+def test_expired_entries_are_rebuilt():
+    cache = ResponseCache(ttl=0)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {}, True
+
+    cache.respond(_request(), build, "public")
+    cache.respond(_request(), build, "public")
+    assert len(builds) == 2
+    assert cache.stats()["hits"] == 0
+
+
+def test_suggest_and_search_revalidate(client, monkeypatch):
+    version = {"sha1": "v1", "modified": MODIFIED}
+    monkeypatch.setattr(type(main.ai_service), "catalogue_version", property(lambda self: version))
+
+    for path in ("/api/destinations/suggest?q=ja", "/api/destinations/search?q=beach&type=Beach"):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == SUGGEST_CACHE_CONTROL
+        etag = response.headers["etag"]
+
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+        since = client.get(path, headers={"If-Modified-Since": response.headers["last-modified"]})
+        assert since.status_code == 304
+
+        version = {"sha1": "v2", "modified": MODIFIED + 60}
+        reloaded = client.get(path, headers={"If-None-Match": etag})
+        assert reloaded.status_code == 200
+        assert reloaded.headers["etag"] != etag
+        version = {"sha1": "v1", "modified": MODIFIED}
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from search_index import SearchIndex
+
+
+@pytest.fixture(scope="module")
+def index(catalogue):
+    return SearchIndex(catalogue)
+
+
+def test_destination_named_in_the_query_is_the_match(index, row):
+    assert index.match("manali trip") == [row("manali")]
+    assert index.match("long weekend in mount abu") == [row("mount-abu")]
+
+
+def test_keywords_rank_the_catalogue_when_no_name_matches(index, row):
+    assert index.match("river rafting")[0] == row("rishikesh")
+    assert set(index.match("temples")) == {row("mount-abu")}
+
+
+@pytest.mark.parametrize("query", ["", "weekend trip for 3 days", "paris", "a to z"])
+def test_stopwords_and_unknown_words_match_nothing(index, query):
+    assert index.match(query) == []
+
+
+def test_limit(index):
+    assert len(index.match("hill station", limit=1)) == 1
+
+
+def test_mask_restricts_matches(index, catalogue, row):
+    rajasthan = np.array([state == "Rajasthan" for state in catalogue.states])
+    assert index.match("forts", mask=rajasthan) == [row("jaipur")]
+    assert index.match("manali", mask=rajasthan) == []
+    # No terms: every masked destination, best weekend_score first.
+    assert index.match("", mask=rajasthan) == [row("jaipur"), row("mount-abu")]
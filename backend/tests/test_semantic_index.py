@@ -0,0 +1,27 @@
+import os
+import shutil
+
+import numpy as np
+
+from catalogue import Catalogue
+from semantic_index import SemanticIndex, build_index
+
+DATA_JSON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "destinations.json")
+
+
+def test_save_leaves_mapped_index_intact(tmp_path):
+    json_path = str(tmp_path / "destinations.json")
+    index_path = str(tmp_path / "destinations.vectors")
+    shutil.copy(DATA_JSON, json_path)
+    catalogue = Catalogue.from_json(json_path)
+    build_index(json_path, index_path)
+
+    mapped = SemanticIndex.load(index_path, catalogue)
+    assert isinstance(mapped.matrix, np.memmap)
+    before = np.array(mapped.matrix)
+    inode = os.stat(index_path + ".npy").st_ino
+
+    build_index(json_path, index_path)   # e.g. an import while the server is running
+    assert os.stat(index_path + ".npy").st_ino != inode
+    assert np.array_equal(mapped.matrix, before)
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
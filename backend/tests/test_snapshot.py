@@ -0,0 +1,64 @@
+import json
+import shutil
+import struct
+
+import pytest
+
+from snapshot import (DEFAULT_JSON_PATH, SNAPSHOT_FORMAT_VERSION, SnapshotError, build_snapshot,
+                      load_indexes, read_snapshot)
+
+
+@pytest.fixture
+def catalogue_files(tmp_path):
+    json_path = str(tmp_path / "destinations.json")
+    shutil.copy(DEFAULT_JSON_PATH, json_path)
+    build_snapshot(json_path)
+    return json_path, str(tmp_path / "destinations.snapshot")
+
+
+def test_snapshot_round_trips(catalogue_files):
+    json_path, snapshot_path = catalogue_files
+    indexes = load_indexes(json_path, snapshot_path)
+    assert len(indexes["catalogue"]) == len(read_snapshot(snapshot_path)["catalogue"]) > 0
+
+
+def test_other_format_version_is_rejected(catalogue_files):
+    _, snapshot_path = catalogue_files
+    with open(snapshot_path, "r+b") as f:
+        f.seek(8)
+        f.write(struct.pack("<I", SNAPSHOT_FORMAT_VERSION + 1))
+    with pytest.raises(SnapshotError):
+        read_snapshot(snapshot_path)
+
+
+def _corrupt_header(path):
+    with open(path, "r+b") as f:
+        f.seek(16)
+        f.write(b"{{{{")
+
+
+def _truncate_pickle(path):
+    with open(path, "rb") as f:
+        _, _, header_len = struct.unpack("<8sII", f.read(16))
+        f.seek(16)
+        header = json.loads(f.read(header_len))
+    with open(path, "r+b") as f:
+        f.truncate(16 + header_len + header["pickle"][1] // 2)
+
+
+def _break_pickle(path):
+    with open(path, "r+b") as f:
+        _, _, header_len = struct.unpack("<8sII", f.read(16))
+        f.seek(16 + header_len)
+        f.write(b"\x80\x05garbage")
+
+
+@pytest.mark.parametrize("corrupt", [_corrupt_header, _truncate_pickle, _break_pickle])
+def test_corrupt_snapshot_falls_back_to_json(catalogue_files, corrupt):
+    json_path, snapshot_path = catalogue_files
+    expected = len(load_indexes(json_path, snapshot_path)["catalogue"])
+    corrupt(snapshot_path)
+
+    with pytest.raises(SnapshotError):
+        read_snapshot(snapshot_path)
+    assert len(load_indexes(json_path, snapshot_path)["catalogue"]) == expected
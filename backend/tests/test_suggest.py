@@ -0,0 +1,54 @@
+import pytest
+
+from catalogue import Catalogue
+from suggest import MAX_LIMIT, SuggestIndex
+
+
+@pytest.fixture(scope="module")
+def index(catalogue):
+    return SuggestIndex(catalogue)
+
+
+def test_prefix_matches_rank_by_weekend_score(index):
+    assert index.suggest("m") == ["Manali", "Mount Abu"]
+    assert index.suggest("  MOUNT ") == ["Mount Abu"]
+
+
+def test_short_queries_match_later_words(index):
+    assert index.suggest("ab") == ["Mount Abu"]
+
+
+def test_trigrams_match_inside_names(index):
+    assert index.suggest("kala") == ["Varkala"]
+    assert index.suggest("shike") == ["Rishikesh"]
+
+
+def test_prefix_matches_come_before_infix_matches():
+    index = SuggestIndex(Catalogue([
+        {"Destination": "Kalimpong", "weekend_score": 9},
+        {"Destination": "Alibag", "weekend_score": 1},
+    ]))
+    assert index.suggest("ali") == ["Alibag", "Kalimpong"]
+
+
+@pytest.mark.parametrize("query", ["", "   ", "xyz", "goax", "ak"])
+def test_no_false_matches(index, query):
+    assert index.suggest(query) == []
+
+
+def test_limit_is_clamped():
+    index = SuggestIndex(Catalogue([{"Destination": f"Place {i:03d}"} for i in range(MAX_LIMIT + 20)]))
+    assert len(index.suggest("place", limit=0)) == 1
+    assert len(index.suggest("place", limit=-5)) == 1
+    assert len(index.suggest("place", limit=10_000)) == MAX_LIMIT
+    assert len(index.suggest("p", limit=10_000)) == MAX_LIMIT   # precomputed prefix
+    assert len(index.suggest("place", limit=3)) == 3
+
+
+def test_duplicate_names_are_suggested_once():
+    index = SuggestIndex(Catalogue([
+        {"Destination": "Goa", "weekend_score": 4},
+        {"Destination": "Goa", "weekend_score": 9},
+        {"Destination": "Gokarna", "weekend_score": 8},
+    ]))
+    assert index.suggest("go") == ["Goa", "Gokarna"]
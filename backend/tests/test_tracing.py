@@ -0,0 +1,116 @@
+import re
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+import tracing
+from response_cache import ResponseCache
+from tracing import Counter, Histogram, Registry, Trace, stage
+
+SERVER_TIMING = re.compile(r'^[\w-]+;(dur=\d+\.\d|desc="[^"]*")$')
+
+
+def test_counter_renders_labels_sorted_and_escaped():
+    counter = Counter("test_total", "Test counter.", ("model", "kind"))
+    counter.inc(2, "gpt", "prompt")
+    counter.inc(1, 'odd "name"\\\n', "completion")
+    counter.inc(3, "gpt", "prompt")
+
+    assert list(counter.samples()) == [
+        'test_total{model="gpt",kind="prompt"} 5',
+        'test_total{model="odd \\"name\\"\\\\\\n",kind="completion"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Test histogram.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, "match")
+
+    assert list(histogram.samples()) == [
+        'test_seconds_bucket{stage="match",le="0.1"} 2',
+        'test_seconds_bucket{stage="match",le="1.0"} 3',
+        'test_seconds_bucket{stage="match",le="+Inf"} 4',
+        'test_seconds_sum{stage="match"} 2.65',
+        'test_seconds_count{stage="match"} 4',
+    ]
+
+
+def test_registry_renders_metrics_and_collectors():
+    registry = Registry()
+    registry.register(Counter("plain_total", "No labels.")).inc()
+
+    @registry.register_collector
+    def sizes():
+        yield "cache_entries", "gauge", "Entries.", [({"cache": "media"}, 3), ({"cache": "unused"}, None)]
+
+    @registry.register_collector
+    def broken():
+        raise RuntimeError("collector down")
+
+    assert registry.render() == (
+        "# HELP plain_total No labels.\n"
+        "# TYPE plain_total counter\n"
+        "plain_total 1\n"
+        "# HELP cache_entries Entries.\n"
+        "# TYPE cache_entries gauge\n"
+        'cache_entries{cache="media"} 3\n'
+    )
+
+
+def test_server_timing_lists_stages_in_order_then_tokens():
+    trace = Trace()
+    trace.add("match", 0.0012)
+    trace.add("enrich", 0.25)
+    trace.add("match", 0.001)
+    trace.add_tokens(120, 0)
+    trace.add_tokens(0, 300)
+
+    parts = trace.server_timing().split(", ")
+    assert parts[:2] == ["match;dur=2.2", "enrich;dur=250.0"]
+    assert parts[2].startswith("total;dur=")
+    assert parts[3] == 'llm-tokens;desc="prompt=120 completion=300"'
+
+
+def test_stage_outside_a_request_only_records_the_histogram():
+    before = dict(tracing.stage_duration._series).get(("test-stage",), [None, 0.0, 0])[2]
+    with stage("test-stage"):
+        time.sleep(0.001)
+    assert tracing.stage_duration._series[("test-stage",)][2] == before + 1
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "response_cache", ResponseCache())
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_responses_carry_server_timing(client):
+    response = client.get("/api/destinations/search", params={"q": "beach"})
+
+    header = response.headers["server-timing"]
+    entries = header.split(", ")
+    assert all(SERVER_TIMING.match(entry) for entry in entries)
+    names = [entry.split(";")[0] for entry in entries]
+    assert names.index("match") < names.index("serialize")
+    assert names[-1] == "total"
+
+
+def test_metrics_endpoint_labels_routes_by_template(client):
+    client.get("/api/destinations/jaipur")
+    client.get("/api/destinations/goa")
+    client.get("/no/such/route")
+
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"] == tracing.PROMETHEUS_CONTENT_TYPE
+    body = response.text
+    assert "# TYPE tripai_http_request_duration_seconds histogram" in body
+    assert 'route="/api/destinations/{slug}",status="200"' in body
+    assert 'route="/api/destinations/jaipur"' not in body
+    assert 'route="unmatched",status="404"' in body
+    assert re.search(r'^tripai_cache_hits_total\{cache="response"\} \d+$', body, re.MULTILINE)
+    assert "# TYPE tripai_upstream_rejected_total counter" in body
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+import upstream
+from upstream import FairLimiter, UpstreamBusy, fair_flow, get_limiter
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_limit_caps_calls_in_flight():
+    limiter = FairLimiter("test", limit=2, max_queue=10)
+    in_flight, peak = 0, 0
+
+    async def call():
+        nonlocal in_flight, peak
+        async with limiter:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(7)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert limiter.stats() == {"limit": 2, "active": 0, "waiting": 0, "acquired": 7, "rejected": 0}
+
+
+def test_full_queue_rejects_new_callers():
+    limiter = FairLimiter("test", limit=1, max_queue=2)
+
+    async def run():
+        await limiter.acquire()
+        queued = [asyncio.create_task(limiter.acquire()) for _ in range(2)]
+        await _settle()
+        with pytest.raises(UpstreamBusy):
+            await limiter.acquire()
+        assert limiter.waiting == 2
+
+        for _ in range(3):
+            limiter.release()
+            await _settle()
+        await asyncio.gather(*queued)
+
+    asyncio.run(run())
+    assert limiter.stats() == {"limit": 1, "active": 0, "waiting": 0, "acquired": 3, "rejected": 1}
+
+
+def test_queued_flows_take_turns():
+    limiter = FairLimiter("test", limit=1, max_queue=20)
+    served = []
+
+    async def call(name):
+        async with limiter:
+            served.append(name)
+            await asyncio.sleep(0)
+
+    async def flow(name, calls):
+        with fair_flow():
+            await asyncio.gather(*(call(name) for _ in range(calls)))
+
+    async def run():
+        await limiter.acquire()   # everything below has to queue
+        tasks = [asyncio.create_task(flow("media", 6))]
+        await _settle()
+        tasks.append(asyncio.create_task(flow("other", 2)))
+        await _settle()
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert served == ["media", "other", "media", "other", "media", "media", "media", "media"]
+
+
+def test_nested_fair_flow_keeps_the_outer_flow():
+    with fair_flow():
+        outer = upstream._flow.get()
+        with fair_flow():
+            assert upstream._flow.get() is outer
+    assert upstream._flow.get() is None
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = FairLimiter("test", limit=1, max_queue=5)
+
+    async def run():
+        await limiter.acquire()
+        cancelled = asyncio.create_task(limiter.acquire())
+        waiting = asyncio.create_task(limiter.acquire())
+        await _settle()
+        cancelled.cancel()
+        await _settle()
+        assert limiter.waiting == 1
+
+        limiter.release()
+        await waiting
+        assert limiter.active == 1
+        limiter.release()
+
+    asyncio.run(run())
+    assert limiter.stats()["active"] == 0
+    assert limiter.stats()["waiting"] == 0
+
+
+def test_limits_come_from_the_environment(monkeypatch):
+    monkeypatch.setattr(upstream, "_limiters", {})
+    monkeypatch.setenv("PEXELS_CONCURRENCY", "3")
+    monkeypatch.setenv("PEXELS_QUEUE_LIMIT", "0")
+
+    limiter = get_limiter("pexels")
+    assert get_limiter("pexels") is limiter
+    assert (limiter.limit, limiter.max_queue) == (3, 0)
+    assert (get_limiter("llm").limit, get_limiter("llm").max_queue) == upstream.DEFAULT_LIMITS["llm"]
+    assert list(upstream.limiter_stats()) == ["llm", "pexels"]
@@ -0,0 +1,44 @@
+import json
+
+import ai_service
+from itinerary_cache import ItineraryCache, PlanFileBackend
+from media_cache import MemoryBackend
+from warm_itineraries import warm
+
+
+def _use_store(monkeypatch, path):
+    store = ItineraryCache(PlanFileBackend(str(path)))
+    monkeypatch.setattr(ai_service, "precomputed_itineraries", store)
+    monkeypatch.setattr(ai_service, "itinerary_cache", ItineraryCache(MemoryBackend()))
+    return store
+
+
+def test_warm_writes_plans_a_fresh_server_serves(openai_stand_in, monkeypatch, tmp_path):
+    path = tmp_path / "precomputed_itineraries.json"
+    _use_store(monkeypatch, path)
+    counts = warm(top=3, rate=0)
+    assert counts["generated"] == 3
+    assert len(json.loads(path.read_text())["plans"]) == 3
+
+    # Reruns keep what is there.
+    _use_store(monkeypatch, path)
+    assert warm(top=3, rate=0)["stored"] == 3
+    calls = openai_stand_in.request_count
+
+    # A server started from the file answers generic searches without the LLM.
+    _use_store(monkeypatch, path)
+    service = ai_service.TripAI()
+    top = service.indexes["catalogue"].record(int(service.indexes["top_rated"][0]))
+    response = service.generate_trips(top["Destination"], defer_itinerary=True)
+    assert response["itinerary_job"]["status"] == "done"
+    assert response["trips"][0]["itinerary"]["header"].startswith("I've curated")
+    service.generate_trips(f"trip to {top['Destination']}")
+    assert openai_stand_in.request_count == calls
+
+
+def test_warm_drops_plans_outside_the_run(openai_stand_in, monkeypatch, tmp_path):
+    path = tmp_path / "precomputed_itineraries.json"
+    path.write_text(json.dumps({"plans": {"old-prompt-key": {"header": "stale"}}}))
+    _use_store(monkeypatch, path)
+    warm(top=1, rate=0)
+    assert "old-prompt-key" not in json.loads(path.read_text())["plans"]
@@ -0,0 +1,326 @@
+import os
+import time
+import threading
+import contextvars
+from bisect import bisect_left
+
+# TRACING_ENABLED=0 turns stage timing, Server-Timing and metric recording
+# into no-ops (stage() hands back a shared null context).
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+
+# Seconds; covers sub-millisecond index lookups up to slow LLM calls.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labels, label_values)} {_number(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels (Prometheus semantics)."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            series = {key: ([*counts], total, n) for key, (counts, total, n) in self._series.items()}
+        for label_values, (counts, total, n) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labels, label_values, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, label_values)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labels, label_values)} {n}"
+
+
+class Registry:
+    """
+    Metrics rendered in the Prometheus text format. Collectors are callables
+    run at scrape time that yield `(name, type, help, [(labels, value)])`,
+    for values that already live elsewhere (cache stats, rate limits).
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        self.collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        for collector in self.collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+                continue
+            for name, metric_type, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    names, values = tuple(labels), tuple(labels.values())
+                    lines.append(f"{name}{_labels(names, values)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+request_duration = registry.register(Histogram(
+    "tripai_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")))
+stage_duration = registry.register(Histogram(
+    "tripai_stage_duration_seconds", "Time spent per request stage.", ("stage",)))
+upstream_duration = registry.register(Histogram(
+    "tripai_upstream_request_duration_seconds", "Outbound call latency by upstream.", ("upstream", "outcome")))
+llm_tokens = registry.register(Counter(
+    "tripai_llm_tokens_total", "LLM tokens used, by model and kind (prompt/completion).", ("model", "kind")))
+llm_duration = registry.register(Histogram(
+    "tripai_llm_call_duration_seconds", "LLM call latency by model, purpose and outcome.",
+    ("model", "purpose", "outcome")))
+llm_cost = registry.register(Counter(
+    "tripai_llm_cost_usd_total", "Estimated LLM spend by model and purpose.", ("model", "purpose")))
+llm_budget_used = registry.register(Histogram(
+    "tripai_llm_completion_budget_ratio", "Completion tokens / max_tokens per call.", ("purpose",),
+    buckets=(0.25, 0.5, 0.75, 0.9, 1.0)))
+llm_truncated = registry.register(Counter(
+    "tripai_llm_truncated_total", "Completions cut off at max_tokens.", ("model", "purpose")))
+llm_fallbacks = registry.register(Counter(
+    "tripai_llm_fallbacks_total", "Calls moved on to a fallback model.", ("model", "fallback")))
+
+
+class Trace:
+    """Per-request stage timings and LLM tokens; may be recorded from worker threads."""
+
+    __slots__ = ("started", "stages", "tokens", "_lock")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.tokens = [0, 0]   # prompt, completion
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_tokens(self, prompt: int, completion: int):
+        with self._lock:
+            self.tokens[0] += prompt
+            self.tokens[1] += completion
+
+    def server_timing(self) -> str:
+        """
+        `Server-Timing` header value, stages in the order they were first
+        recorded, plus total and, if the request called the LLM, its tokens.
+        """
+        with self._lock:
+            stages = list(self.stages.items())
+            prompt, completion = self.tokens
+        stages.append(("total", time.perf_counter() - self.started))
+        value = ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages)
+        if prompt or completion:
+            value += f', llm-tokens;desc="prompt={prompt} completion={completion}"'
+        return value
+
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+
+
+def current_trace() -> Trace:
+    return _current_trace.get()
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        stage_duration.observe(seconds, self.name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(self.name, seconds)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str):
+    """
+    Time a block as one stage of the current request:
+
+        with stage("match"):
+            rows = search_index.match(query)
+    """
+    return _Stage(name) if TRACING_ENABLED else _NULL_STAGE
+
+
+def submit(pool, fn, *args):
+    """`pool.submit` that carries the current trace into the worker thread."""
+    if not TRACING_ENABLED:
+        return pool.submit(fn, *args)
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def observe_upstream(upstream: str, seconds: float, outcome):
+    """Record one outbound call; `outcome` is the HTTP status, "ok" or "error"."""
+    if TRACING_ENABLED:
+        upstream_duration.observe(seconds, upstream, str(outcome))
+
+
+def record_llm_call(model: str, purpose: str, seconds: float, outcome: str, prompt_tokens: int = 0,
+                    completion_tokens: int = 0, max_tokens: int = None, cost: float = None):
+    """
+    Account one LLM call: latency by outcome ("ok", "truncated", "timeout",
+    "error"), tokens and estimated cost, both globally and on the current
+    request's trace, and how much of the completion budget it used.
+    """
+    if not TRACING_ENABLED:
+        return
+    model = model or "unknown"
+    llm_duration.observe(seconds, model, purpose, outcome)
+    if outcome == "truncated":
+        llm_truncated.inc(1, model, purpose)
+    if prompt_tokens:
+        llm_tokens.inc(prompt_tokens, model, "prompt")
+    if completion_tokens:
+        llm_tokens.inc(completion_tokens, model, "completion")
+        if max_tokens:
+            llm_budget_used.observe(completion_tokens / max_tokens, purpose)
+    if cost:
+        llm_cost.inc(cost, model, purpose)
+    trace = _current_trace.get()
+    if trace is not None and (prompt_tokens or completion_tokens):
+        trace.add_tokens(prompt_tokens, completion_tokens)
+
+
+def record_fallback(model: str, fallback: str):
+    if TRACING_ENABLED:
+        llm_fallbacks.inc(1, model, fallback)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: one Trace per HTTP request, reported in a `Server-Timing`
+    header and the request latency histogram. Routes are labelled by their
+    path template (e.g. /api/destinations/{slug}) to keep label sets small.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        token = _current_trace.set(trace)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            route = scope.get("route")
+            request_duration.observe(
+                time.perf_counter() - trace.started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            )
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
@@ -0,0 +1,151 @@
+"""Per-upstream concurrency limits with fair queuing for the async request path."""
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from tracing import Histogram, registry
+
+# upstream -> (max in flight, max queued)
+DEFAULT_LIMITS = {"pexels": (16, 256), "llm": (8, 64)}
+
+queue_wait = registry.register(Histogram(
+    "tripai_upstream_queue_wait_seconds", "Time spent waiting for an upstream slot.", ("upstream",)))
+
+
+class UpstreamBusy(Exception):
+    """Raised instead of queueing once an upstream's wait queue is full."""
+
+
+_flow = contextvars.ContextVar("upstream_flow", default=None)
+
+
+@contextmanager
+def fair_flow():
+    """
+    Group the upstream calls made inside the block (including tasks spawned
+    from it) into one flow for fair queuing. Nested blocks keep the outer flow.
+    """
+    if _flow.get() is not None:
+        yield
+        return
+    token = _flow.set(object())
+    try:
+        yield
+    finally:
+        _flow.reset(token)
+
+
+class FairLimiter:
+    """
+    Async semaphore with a bounded, per-flow round-robin wait queue: one
+    request's dozen media lookups take turns with another's two. Once
+    `max_queue` callers wait, new ones get UpstreamBusy and fall back.
+
+    Must be used from the event loop; slots are handed directly to the next
+    waiter on release, so a newcomer can't overtake the queue.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+        self._queues = OrderedDict()   # flow -> deque of waiter futures
+
+    async def acquire(self):
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            self.acquired += 1
+            return
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise UpstreamBusy(f"{self.name}: {self.waiting} calls already queued")
+
+        waiter = asyncio.get_running_loop().create_future()
+        flow = _flow.get()
+        self._queues.setdefault(flow, deque()).append(waiter)
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()   # the slot was handed over just as we were cancelled
+            else:
+                self._forget(flow, waiter)
+            raise
+        queue_wait.observe(time.perf_counter() - started, self.name)
+        self.acquired += 1
+
+    def _forget(self, flow, waiter):
+        queue = self._queues.get(flow)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self.waiting -= 1
+            if not queue:
+                del self._queues[flow]
+
+    def release(self):
+        # Round-robin: serve the flow at the front, then move it to the back.
+        while self._queues:
+            flow, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self.waiting -= 1
+            if queue:
+                self._queues.move_to_end(flow)
+            else:
+                del self._queues[flow]
+            if not waiter.done():
+                waiter.set_result(None)   # the slot passes on; `active` is unchanged
+                return
+        self.active -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+        }
+
+
+_limiters = {}
+_lock = threading.Lock()
+
+
+def get_limiter(upstream: str) -> FairLimiter:
+    """The shared limiter for an upstream, sized from the environment on first use."""
+    limiter = _limiters.get(upstream)
+    if limiter is None:
+        with _lock:
+            limiter = _limiters.get(upstream)
+            if limiter is None:
+                limit, max_queue = DEFAULT_LIMITS.get(upstream, (8, 64))
+                prefix = upstream.upper()
+                limiter = _limiters[upstream] = FairLimiter(
+                    upstream,
+                    max(int(os.getenv(f"{prefix}_CONCURRENCY", limit)), 1),
+                    max(int(os.getenv(f"{prefix}_QUEUE_LIMIT", max_queue)), 0),
+                )
+    return limiter
+
+
+def limiter_stats() -> dict:
+    """Stats of every limiter used so far, by upstream (for /metrics)."""
+    return {name: limiter.stats() for name, limiter in sorted(_limiters.items())}
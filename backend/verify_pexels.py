@@ -1,7 +1,8 @@
 import os
-import requests
 from dotenv import load_dotenv
 
+from http_client import pexels_get
+
 load_dotenv()
 
 PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
@@ -11,11 +12,8 @@ if not PEXELS_API_KEY:
     print("Error: PEXELS_API_KEY not found in environment variables.")
     exit(1)
 
-headers = {"Authorization": PEXELS_API_KEY}
-url = "https://api.pexels.com/v1/curated?per_page=1"
-
 try:
-    response = requests.get(url, headers=headers, timeout=10)
+    response = pexels_get("/v1/curated", params={"per_page": 1}, timeout=10, api_key=PEXELS_API_KEY)
     print(f"Status Code: {response.status_code}")
     if response.status_code == 200:
         print("Success! Pexels API key is working.")
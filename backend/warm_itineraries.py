@@ -0,0 +1,120 @@
+"""
+Precompute default itineraries for the top destinations into data/precomputed_itineraries.json.
+
+    python warm_itineraries.py [--top 50] [--slugs goa,manali] [--days 2,3]
+                               [--workers 4] [--rate 30] [--force]
+
+Commit the file; the server loads it at startup.
+"""
+import sys
+import time
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_TOP = 50
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 30.0   # LLM calls per minute
+
+
+class RateLimiter:
+    """Spaces calls at least 60 / per_minute seconds apart, across threads."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def select_destinations(service, top: int, slugs: list) -> list:
+    """Records of the `top` best-rated destinations followed by `slugs` not already among them."""
+    indexes = service.indexes
+    catalogue = indexes["catalogue"]
+    rows = [int(row) for row in indexes["top_rated"][:top]]
+    for slug in slugs:
+        row = catalogue.by_slug.get(slug)
+        if row is None:
+            print(f"Unknown destination: {slug}")
+        elif int(row) not in rows:
+            rows.append(int(row))
+    return [catalogue.record(row) for row in rows]
+
+
+def warm(top: int = DEFAULT_TOP, slugs: list = (), days: list = None, workers: int = DEFAULT_WORKERS,
+         rate: float = DEFAULT_RATE, force: bool = False) -> Counter:
+    """Generate the missing default plans and save the file; returns counts by outcome."""
+    from ai_service import TripAI, precomputed_itineraries
+    from prompts import duration_days
+
+    service = TripAI()
+    tasks = [
+        (dest, num_days)
+        for dest in select_destinations(service, top, slugs)
+        for num_days in (days or duration_days(dest.get("Ideal Duration")))
+    ]
+    limiter = RateLimiter(rate)
+    started = time.perf_counter()
+
+    def run(task):
+        dest, num_days = task
+        status, key = service.precompute_itinerary(dest, num_days, force=force, throttle=limiter.wait)
+        print(f"{status:<9} {dest.get('Destination')}, {num_days}-day plan")
+        return status, key
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="warm") as pool:
+        results = list(pool.map(run, tasks))
+
+    counts = Counter(status for status, _ in results)
+    backend = precomputed_itineraries.backend
+    saved = backend.save(key for _, key in results)
+    print(f"{len(tasks)} plans in {time.perf_counter() - started:.1f}s: "
+          + ", ".join(f"{counts[s]} {s}" for s in ("generated", "stored", "failed"))
+          + f"; {saved} written to {backend.path}")
+    return counts
+
+
+def _days(value: str) -> list:
+    from prompts import MAX_DAYS
+
+    days = sorted({int(d) for d in value.split(",") if d.strip()})
+    if not days or days[0] < 1 or days[-1] > MAX_DAYS:
+        raise argparse.ArgumentTypeError(f"day counts must be between 1 and {MAX_DAYS}")
+    return days
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute default itineraries for the top destinations.")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="best-rated destinations to warm")
+    parser.add_argument("--slugs", default="", help="comma-separated extra destinations (e.g. most searched)")
+    parser.add_argument("--days", type=_days, default=None,
+                        help="comma-separated day counts (default: each destination's Ideal Duration)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="max LLM calls per minute (0: no limit)")
+    parser.add_argument("--force", action="store_true", help="regenerate plans that are already stored")
+    args = parser.parse_args(argv)
+
+    from ai_service import precomputed_itineraries
+    from llm import get_llm_client
+
+    if not precomputed_itineraries.backend.path:
+        sys.exit("PRECOMPUTED_ITINERARIES_PATH is empty; nowhere to write the plans.")
+    if get_llm_client() is None:
+        sys.exit("No LLM provider configured (OPENAI_API_KEY / GROK_API_KEY).")
+
+    slugs = [s.strip() for s in args.slugs.split(",") if s.strip()]
+    counts = warm(args.top, slugs, args.days, args.workers, args.rate, args.force)
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()